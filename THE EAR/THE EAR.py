@@ -2,17 +2,135 @@ import whisper
 import os
 import warnings
 import time
+import argparse
+import hashlib
+import json
+import multiprocessing
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
 
 # --- CONFIGURATION ---
 # "base" is fast. Use "medium" if you have a good GPU for higher accuracy.
 MODEL_TYPE = "base" 
 EVIDENCE_DIR = "Evidence_Transcripts"
+TASK = "translate"
+
+# Transcript cache: audio content hash -> transcript file + metadata (language, duration, segments)
+TRANSCRIPT_INDEX = os.path.join(EVIDENCE_DIR, ".transcript_index.json")
+TRANSCRIPT_CACHE_MAX_ENTRIES = 500
+
+# Segment-level transcripts (JSON lines) are saved next to each .txt transcript
+SEGMENTS_SUFFIX = ".segments.jsonl"
+
+# Batch/daemon mode: audio dropped in INBOX_DIR is transcribed and moved to done/ or failed/
+INBOX_DIR = "Evidence_Inbox"
+AUDIO_EXTENSIONS = (".m4a", ".mp3", ".wav", ".flac", ".ogg", ".opus", ".aac", ".wma", ".mp4", ".webm")
+POLL_SECONDS = 2.0
+TORCH_THREADS = 2  # per worker process; workers default to cores // TORCH_THREADS
+
+# Long-audio mode: recordings longer than LONG_AUDIO_SECONDS are decoded once to 16 kHz PCM,
+# cut at pauses into segments of at most SEGMENT_MAX_SECONDS and transcribed in parallel
+SAMPLE_RATE = 16000
+LONG_AUDIO_SECONDS = 600
+SEGMENT_MAX_SECONDS = 240
+SEGMENT_MIN_SECONDS = 30
+SILENCE_MIN_SECONDS = 0.4
+FRAME_SECONDS = 0.03
 
 # Suppress warnings to keep your terminal clean
 warnings.filterwarnings("ignore")
 
+class TranscriptCache:
+    """
+    Sidecar index over Evidence_Transcripts keyed by audio content hash.
+    Entries hold the transcript path, a hash of its text and Whisper metadata;
+    the least recently used entries are dropped beyond max_entries.
+    """
+    def __init__(self, index_path=TRANSCRIPT_INDEX, max_entries=TRANSCRIPT_CACHE_MAX_ENTRIES):
+        self.index_path = index_path
+        self.max_entries = max_entries
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self, entries):
+        # Atomic replace; concurrent workers may drop each other's updates, which only costs a re-decode
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.index_path)
+
+    def get(self, key):
+        """Cached entry plus its transcript "text", or None if missing or the transcript file changed."""
+        entries = self._load()
+        entry = entries.get(key)
+        if entry is None:
+            return None
+        try:
+            with open(entry["transcript"], "r", encoding="utf-8") as f:
+                text = f.read().split("\n", 2)[2]
+        except (OSError, IndexError):
+            return None
+        if hashlib.sha256(text.encode("utf-8")).hexdigest() != entry["text_sha256"]:
+            return None
+        entry["last_used"] = time.time()
+        self._save(entries)
+        return dict(entry, text=text)
+
+    def put(self, key, transcript_path, text, **metadata):
+        entries = self._load()
+        entries[key] = dict(metadata, transcript=transcript_path, last_used=time.time(),
+                            text_sha256=hashlib.sha256(text.encode("utf-8")).hexdigest())
+        if len(entries) > self.max_entries:
+            for old_key in sorted(entries, key=lambda k: entries[k]["last_used"])[:len(entries) - self.max_entries]:
+                del entries[old_key]
+        self._save(entries)
+
+def split_on_silence(audio, max_seconds=SEGMENT_MAX_SECONDS, min_seconds=SEGMENT_MIN_SECONDS):
+    """
+    Cut 16 kHz PCM into (start, end) sample ranges of at most max_seconds, preferring the
+    middle of a pause. Pauses are runs of low-energy frames, relative to the file's noise floor.
+    """
+    frame = int(FRAME_SECONDS * SAMPLE_RATE)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return [(0, len(audio))]
+
+    rms = np.sqrt(np.mean(np.square(audio[:n_frames * frame].reshape(n_frames, frame)), axis=1))
+    threshold = max(0.005, 1.5 * float(np.percentile(rms, 10)))
+    quiet = np.concatenate(([False], rms < threshold, [False]))
+    edges = np.flatnonzero(np.diff(quiet.astype(np.int8)))
+    min_frames = int(SILENCE_MIN_SECONDS / FRAME_SECONDS)
+    cuts = [int((a + b) // 2) * frame for a, b in zip(edges[::2], edges[1::2]) if b - a >= min_frames]
+
+    max_len = int(max_seconds * SAMPLE_RATE)
+    min_len = int(min_seconds * SAMPLE_RATE)
+    ranges = []
+    start = 0
+    while len(audio) - start > max_len:
+        lo = bisect_left(cuts, start + min_len)
+        hi = bisect_right(cuts, start + max_len)
+        end = cuts[hi - 1] if hi > lo else start + max_len
+        ranges.append((start, end))
+        start = end
+    ranges.append((start, len(audio)))
+    return ranges
+
+def _recorded_at(file_path):
+    # File modification time as the case file writes timestamps; None if the file is gone
+    try:
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(os.path.getmtime(file_path)))
+    except OSError:
+        return None
+
 class ForensicInvestigator:
-    def __init__(self):
+    def __init__(self, workers=1, torch_threads=TORCH_THREADS):
         print(f"🕵️  Initializing AI Investigator ({MODEL_TYPE})...")
         # Load the model ONCE (Cached)
         try:
@@ -24,43 +142,349 @@ class ForensicInvestigator:
         # Create a folder for your evidence if it doesn't exist
         if not os.path.exists(EVIDENCE_DIR):
             os.makedirs(EVIDENCE_DIR)
+        self.cache = TranscriptCache()
+        self._content_keys = {}
+        self._analyses = {}
+        self.workers = workers
+        self.torch_threads = torch_threads
+        self._pool = None
         print("✅ System Ready. Awaiting evidence files.")
 
-    def process_evidence(self, file_path):
+    def content_key(self, file_path):
         """
-        Handles hearing, fixing punctuation, and translating to English.
+        SHA-256 of the audio bytes plus model and task (memoised per path, size and mtime).
+        """
+        stat = os.stat(file_path)
+        memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._content_keys:
+            digest = hashlib.sha256(f"{MODEL_TYPE}\0{TASK}\0".encode("utf-8"))
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            self._content_keys[memo_key] = digest.hexdigest()
+        return self._content_keys[memo_key]
+
+    def analyse(self, file_path, on_segment=None):
+        """
+        Full analysis of one file: transcript, language, segments and timings.
+        Returns a dict with text, language, segments, audio_seconds, processing_seconds and cached.
+        Audio already transcribed with this model (same bytes, any file name) is served from the cache.
+        on_segment(segment) is called for every segment, in order, as soon as it is available
+        (e.g. the Brain's SegmentQueue.put), so downstream work can start before the file is done;
+        those segments carry a "source" key naming the file, so the Brain can label their chunks.
         """
         start_time = time.time()
-        print(f"\n🎧 Analyzing: {os.path.basename(file_path)}...")
+        if on_segment is not None:
+            emit, source = on_segment, os.path.basename(file_path)
+            on_segment = lambda seg: emit(dict(seg, source=source))
+        key = self.content_key(file_path)
+
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = self._adopt_transcript(file_path, key)
+        if entry is not None:
+            for seg in entry["segments"] if on_segment else ():
+                on_segment(seg)
+            analysis = {
+                "text": entry["text"],
+                "language": entry["language"],
+                "segments": entry["segments"],
+                "audio_seconds": entry["audio_seconds"],
+                "processing_seconds": time.time() - start_time,
+                "cached": True,
+            }
+            self._analyses[key] = analysis
+            return analysis
 
         # Transcribe & Translate in one go
         # task="translate" ensures output is always English (Rules req this)
-        result = self.model.transcribe(file_path, task="translate")
-        
-        text = result["text"].strip()
-        language = result.get("language", "unknown")
-        
-        duration = time.time() - start_time
-        
-        return text, language, duration
+        # Decoded up front (transcribe would decode it anyway) so the duration includes trailing silence
+        audio = whisper.load_audio(file_path)
+        if self.workers > 1 and len(audio) > LONG_AUDIO_SECONDS * SAMPLE_RATE:
+            # Decoded once; long recordings are split and fanned out to the worker pool
+            parts = self._transcribe_long(audio, on_segment)
+        else:
+            parts = [_transcription_part(self.model.transcribe(audio, task=TASK), 0.0)]
+            for seg in parts[0]["segments"] if on_segment else ():
+                on_segment(seg)
+
+        segments = [seg for part in parts for seg in part["segments"]]
+        # Most of the audio decides the language when segments disagree
+        languages = Counter()
+        for part in parts:
+            languages[part["language"]] += part["seconds"]
+
+        analysis = {
+            "text": " ".join(part["text"] for part in parts if part["text"]),
+            "language": languages.most_common(1)[0][0] if languages else "unknown",
+            "segments": segments,
+            "audio_seconds": len(audio) / SAMPLE_RATE,
+            "processing_seconds": time.time() - start_time,
+            "cached": False,
+        }
+        # Indexed and saved as segments once save_log has written the transcript
+        self._analyses[key] = analysis
+        return analysis
+
+    def _adopt_transcript(self, file_path, key):
+        """
+        Index a transcript saved before the cache existed (or whose index entry was lost):
+        Evidence_Transcripts/<name>.txt, adopted only when the .segments.jsonl next to it
+        records this model, task and content key (the audio's bytes), so a transcript of
+        other audio or from another model is never reused. Returns a cache entry, or None.
+        """
+        base_name = os.path.basename(file_path)
+        txt_path = os.path.join(EVIDENCE_DIR, f"{base_name}.txt")
+        try:
+            with open(os.path.join(EVIDENCE_DIR, f"{base_name}{SEGMENTS_SUFFIX}"), "r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if (header.get("model"), header.get("task"), header.get("content_key")) != (MODEL_TYPE, TASK, key):
+                    return None
+                segments = [json.loads(line) for line in f if line.strip()]
+            with open(txt_path, "r", encoding="utf-8") as f:
+                source_line, _, text = f.read().split("\n", 2)
+        except (OSError, ValueError):
+            return None
+        if source_line != f"SOURCE FILE: {base_name}":
+            return None
+
+        metadata = {
+            "source": base_name,
+            "language": header.get("language", "unknown"),
+            "audio_seconds": float(header.get("audio_seconds", 0.0)),
+            "segments": segments,
+        }
+        print(f"♻️  Reusing existing transcript {txt_path}")
+        self.cache.put(key, txt_path, text, **metadata)
+        return dict(metadata, transcript=txt_path, text=text)
+
+    def _transcribe_long(self, audio, on_segment=None):
+        ranges = split_on_silence(audio)
+        print(f"✂️  Long recording ({len(audio) / SAMPLE_RATE / 60:.0f} min): "
+              f"{len(ranges)} segments on {self.workers} workers")
+        if self._pool is None:
+            self._pool = _worker_pool(self.workers, self.torch_threads)
+        futures = [self._pool.submit(_transcribe_pcm, audio[start:end], start / SAMPLE_RATE)
+                   for start, end in ranges]
+        # Collected in submission order, so segments stay chronological
+        parts = []
+        for future in futures:
+            parts.append(future.result())
+            for seg in parts[-1]["segments"] if on_segment else ():
+                on_segment(seg)
+        return parts
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def process_evidence(self, file_path):
+        """
+        Handles hearing, fixing punctuation, and translating to English.
+        """
+        print(f"\n🎧 Analyzing: {os.path.basename(file_path)}...")
+        analysis = self.analyse(file_path)
+        if analysis["cached"]:
+            print("♻️  Same audio already transcribed, using the saved transcript.")
+        return analysis["text"], analysis["language"], analysis["processing_seconds"]
+
+    def save_segments(self, filename, analysis):
+        """
+        Saves the segment-level transcript as JSON lines: a header line (source, recorded, model,
+        task, content_key, language, audio_seconds), then one line per segment with start, end, text,
+        avg_logprob, no_speech_prob and language. Read back with
+        detective_data_loader.load_transcript_segments.
+        "recorded" is the audio file's modification time ("YYYY-MM-DD HH:MM:SS", local time),
+        the closest thing to a recording time the file carries.
+        """
+        base_name = os.path.basename(filename)
+        save_path = os.path.join(EVIDENCE_DIR, f"{base_name}{SEGMENTS_SUFFIX}")
+        tmp_path = f"{save_path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            header = {"source": base_name, "recorded": _recorded_at(filename), "model": MODEL_TYPE, "task": TASK,
+                      "content_key": self.content_key(filename) if os.path.exists(filename) else None,
+                      "language": analysis["language"], "audio_seconds": round(analysis["audio_seconds"], 3)}
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            for seg in analysis["segments"]:
+                line = {k: round(v, 3) if isinstance(v, float) else v for k, v in seg.items()}
+                line["text"] = line.get("text", "").strip()
+                line.setdefault("language", analysis["language"])
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, save_path)
+
+        return save_path
 
     def save_log(self, filename, text):
         """
         Saves the evidence to a text file for Stage 2 usage.
+        Written to a temp file first, so readers never see a half-written transcript.
+        When the text comes from analyse(), the segment-level transcript is saved next to it.
         """
         base_name = os.path.basename(filename)
         save_path = os.path.join(EVIDENCE_DIR, f"{base_name}.txt")
-        
-        with open(save_path, "w", encoding="utf-8") as f:
+        tmp_path = f"{save_path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
             f.write(f"SOURCE FILE: {base_name}\n")
             f.write("-" * 30 + "\n")
             f.write(text)
-        
+        os.replace(tmp_path, save_path)
+
+        if os.path.exists(filename):
+            key = self.content_key(filename)
+            analysis = self._analyses.pop(key, None)
+            if analysis is not None and analysis["text"] == text:
+                self.save_segments(filename, analysis)
+                if not analysis["cached"]:
+                    self.cache.put(key, save_path, text, source=base_name, language=analysis["language"],
+                                   audio_seconds=analysis["audio_seconds"], segments=analysis["segments"])
+
         return save_path
 
+# --- BATCH / DAEMON MODE ---
+# Each worker process keeps its own resident model for its whole lifetime.
+_worker_investigator = None
+
+def _worker_pool(workers, torch_threads):
+    # Spawned, not forked: torch's OpenMP runtime is not fork-safe once the parent has used it
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker, initargs=(torch_threads,))
+
+def _init_worker(torch_threads):
+    global _worker_investigator
+    import torch
+    torch.set_num_threads(torch_threads)
+    _worker_investigator = ForensicInvestigator()
+
+def _transcription_part(result, offset_seconds):
+    """Trim a Whisper result to what we keep, shifting segment times by offset_seconds."""
+    language = result.get("language", "unknown")
+    segments = []
+    for seg in result.get("segments", []):
+        seg = {k: seg[k] for k in ("start", "end", "text", "avg_logprob", "no_speech_prob") if k in seg}
+        seg["start"] += offset_seconds
+        seg["end"] += offset_seconds
+        seg["language"] = language
+        segments.append(seg)
+    return {
+        "text": result["text"].strip(),
+        "language": language,
+        "segments": segments,
+        "seconds": (segments[-1]["end"] - segments[0]["start"]) if segments else 0.0,
+    }
+
+def _transcribe_pcm(audio, offset_seconds):
+    return _transcription_part(_worker_investigator.model.transcribe(audio, task=TASK), offset_seconds)
+
+def _transcribe_in_worker(file_path):
+    analysis = _worker_investigator.analyse(file_path)
+    saved_loc = _worker_investigator.save_log(file_path, analysis["text"])
+    return saved_loc, analysis["language"], analysis["audio_seconds"], analysis["processing_seconds"]
+
+def _pending_audio(inbox, sizes):
+    """
+    Audio files in the inbox whose size did not change since the last poll (upload finished).
+    `sizes` is rebuilt from this listing, so files that disappeared are forgotten.
+    """
+    ready = []
+    seen = {}
+    for name in sorted(os.listdir(inbox)):
+        path = os.path.join(inbox, name)
+        try:
+            if not os.path.isfile(path) or not name.lower().endswith(AUDIO_EXTENSIONS):
+                continue
+            size = os.path.getsize(path)
+        except OSError:  # removed between listing and stat
+            continue
+        if sizes.get(path) == size:
+            ready.append(path)
+        seen[path] = size
+    sizes.clear()
+    sizes.update(seen)
+    return ready
+
+def _file_away(path, inbox, folder):
+    target_dir = os.path.join(inbox, folder)
+    os.makedirs(target_dir, exist_ok=True)
+    try:
+        os.replace(path, os.path.join(target_dir, os.path.basename(path)))
+    except FileNotFoundError:
+        print(f"⚠️  {os.path.basename(path)} left the inbox before it could be filed")
+
+def watch_inbox(inbox=INBOX_DIR, workers=None, torch_threads=TORCH_THREADS, once=False):
+    """
+    Transcribe every audio file that lands in `inbox` with a pool of resident-model workers.
+    With once=True, stops when the inbox is empty instead of polling forever.
+    """
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 1) // torch_threads)
+    os.makedirs(inbox, exist_ok=True)
+    os.makedirs(EVIDENCE_DIR, exist_ok=True)
+    print(f"📥 Watching {inbox} with {workers} worker(s) x {torch_threads} torch thread(s)")
+
+    sizes = {}
+    running = {}
+    totals = {"files": 0, "audio": 0.0, "busy": 0.0}
+    started = time.time()
+
+    with _worker_pool(workers, torch_threads) as pool:
+        while True:
+            for path in _pending_audio(inbox, sizes):
+                if path not in running.values():
+                    running[pool.submit(_transcribe_in_worker, path)] = path
+
+            if not running:
+                if once and not sizes:
+                    break
+                time.sleep(POLL_SECONDS)
+                continue
+
+            done, _ = wait(running, timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = running.pop(future)
+                sizes.pop(path, None)
+                name = os.path.basename(path)
+                try:
+                    saved_loc, lang, audio_seconds, seconds = future.result()
+                except Exception as e:
+                    print(f"❌ {name}: {e}")
+                    _file_away(path, inbox, "failed")
+                    continue
+                _file_away(path, inbox, "done")
+                totals["files"] += 1
+                totals["audio"] += audio_seconds
+                totals["busy"] += seconds
+                rtf = seconds / audio_seconds if audio_seconds else float("nan")
+                print(f"✅ {name} [{lang.upper()}] {audio_seconds:.0f}s audio in {seconds:.1f}s "
+                      f"(RTF {rtf:.2f}) -> {saved_loc}")
+
+    wall = time.time() - started
+    if totals["files"]:
+        print(f"📊 {totals['files']} file(s), {totals['audio']:.0f}s audio in {wall:.1f}s wall "
+              f"(aggregate RTF {wall / totals['audio'] if totals['audio'] else float('nan'):.2f}, "
+              f"per-worker RTF {totals['busy'] / totals['audio'] if totals['audio'] else float('nan'):.2f})")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="THE EAR: forensic audio transcription")
+    parser.add_argument("--watch", nargs="?", const=INBOX_DIR, metavar="DIR",
+                        help=f"Non-interactive: transcribe audio dropped into DIR (default {INBOX_DIR})")
+    parser.add_argument("--once", action="store_true", help="With --watch: exit when the inbox is empty")
+    parser.add_argument("--workers", type=int,
+                        help="Worker processes for --watch files or long-recording segments (default: cores // threads)")
+    parser.add_argument("--threads", type=int, default=TORCH_THREADS, help="Torch threads per worker")
+    return parser.parse_args()
+
 # --- MAIN LOOP ---
 if __name__ == "__main__":
-    investigator = ForensicInvestigator()
+    args = parse_args()
+    if args.watch:
+        watch_inbox(args.watch, args.workers, args.threads, args.once)
+        raise SystemExit(0)
+
+    investigator = ForensicInvestigator(args.workers or max(1, (os.cpu_count() or 1) // args.threads),
+                                        args.threads)
 
     while True:
         print("\n" + "="*50)
@@ -69,6 +493,7 @@ if __name__ == "__main__":
 
         if raw_input.lower() == "exit":
             print("Shutting down investigation.")
+            investigator.close()
             break
 
         # --- FIX FOR POWERSHELL DRAG & DROP ---
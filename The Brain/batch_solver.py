@@ -0,0 +1,226 @@
+"""
+Batch entry point: solve many case files in one process.
+
+Every case runs as its own task on one event loop, and all of their LLM calls
+(extraction chunks and later phases) share one PrioritySemaphore. Calls for
+later phases of started cases are served before new extraction work, and
+within a stage cases are served in manifest priority order. Throughput is then
+bounded by the global cap and the rate limiter in config.py (i.e. the API
+quota) rather than by solving cases one after another.
+
+Finished verdicts and a checkpoint file are written to the output directory.
+Re-running with the same output directory skips cases that already finished.
+Cases interrupted part-way resume from the extraction cache and artifact store.
+
+Usage:
+    python batch_solver.py cases/                  # every *.json in a directory
+    python batch_solver.py manifest.json -o out/   # [{"path": ..., "id": ..., "priority": ...}, ...]
+    python batch_solver.py manifest.txt            # one case path per line
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from config import EXTRACTION_CONFIG
+from detective_data_loader import CaseFile
+from engine import asolve_mystery
+from streaming import StreamSink
+from utils import CASE_PRIORITY, PrioritySemaphore, run_sync
+
+logger = logging.getLogger(__name__)
+
+
+class CaseSpec(NamedTuple):
+    case_id: str
+    path: Path
+    priority: int
+
+
+def load_manifest(source: str) -> List[CaseSpec]:
+    """
+    Resolve the cases to solve.
+
+    Args:
+        source: A directory (every *.json inside, by name), a .json manifest
+            (list of paths or {"path", "id", "priority"} objects) or a text
+            file with one case path per line
+
+    Returns:
+        CaseSpecs in manifest order; priority defaults to that order
+    """
+    source = Path(source)
+    if source.is_dir():
+        entries = [str(p) for p in sorted(source.glob("*.json"))]
+        base = source
+    elif source.suffix == ".json":
+        entries = json.loads(source.read_text(encoding="utf-8"))
+        base = source.parent
+    else:
+        entries = [line.strip() for line in source.read_text(encoding="utf-8").splitlines()
+                   if line.strip() and not line.lstrip().startswith("#")]
+        base = source.parent
+
+    specs = []
+    seen = set()
+    for order, entry in enumerate(entries):
+        if isinstance(entry, str):
+            entry = {"path": entry}
+        path = Path(entry["path"])
+        if not path.is_absolute() and not path.exists():
+            path = base / path
+        case_id = entry.get("id") or path.stem
+        if case_id in seen:
+            raise ValueError(f"Duplicate case id {case_id!r} in {source}")
+        seen.add(case_id)
+        specs.append(CaseSpec(case_id, path, int(entry.get("priority", order))))
+    return specs
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class BatchCheckpoint:
+    """Per-case status persisted as JSON after every change, so a batch can be resumed."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.cases = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+    def is_done(self, case_id: str) -> bool:
+        return self.cases.get(case_id, {}).get("status") == "done"
+
+    def update(self, case_id: str, **fields) -> None:
+        self.cases.setdefault(case_id, {}).update(fields)
+        _write_atomic(self.path, json.dumps(self.cases, indent=2))
+
+
+class _ProgressSink(StreamSink):
+    """Logs each phase of a case as it completes; discards the streamed text."""
+
+    def __init__(self, label: str, phases: int = 3):
+        super().__init__()
+        self.label = label
+        self.phases = phases
+        self.completed = 0
+
+    def write(self, phase: str, text: str) -> None:
+        pass
+
+    def end(self, phase: str) -> None:
+        super().end(phase)
+        self.completed += 1
+        logger.info("%s: %s done (%d/%d, %.1fs)", self.label, phase, self.completed, self.phases,
+                    self.metrics[phase]["total"])
+
+
+async def _solve_case(spec: CaseSpec, label: str, output_dir: Path, checkpoint: BatchCheckpoint,
+                      semaphore: PrioritySemaphore, case_slots: asyncio.Semaphore,
+                      use_cache: Optional[bool]) -> bool:
+    async with case_slots:
+        CASE_PRIORITY.set(spec.priority)
+        checkpoint.update(spec.case_id, status="running", path=str(spec.path))
+        start = time.perf_counter()
+        try:
+            case = CaseFile(str(spec.path))
+            logger.info("%s: extracting", label)
+            verdict = await asolve_mystery(
+                case.audio_text, case.documents_text, case.clues_text, use_cache=use_cache,
+                critical_window=case.metadata.get("time_of_death"), sink=_ProgressSink(label),
+                semaphore=semaphore, victim=case.metadata.get("victim")
+            )
+        except Exception as e:
+            logger.exception("%s: failed", label)
+            checkpoint.update(spec.case_id, status="failed", error=f"{type(e).__name__}: {e}",
+                              seconds=round(time.perf_counter() - start, 2))
+            return False
+
+        verdict_path = output_dir / f"{spec.case_id}.verdict.txt"
+        _write_atomic(verdict_path, verdict)
+        checkpoint.update(spec.case_id, status="done", verdict=str(verdict_path),
+                          seconds=round(time.perf_counter() - start, 2))
+        logger.info("%s: verdict written to %s", label, verdict_path)
+        return True
+
+
+async def asolve_batch(specs: List[CaseSpec], output_dir: str, max_concurrency: int = None,
+                       max_active_cases: int = 32, use_cache: bool = None, resume: bool = True) -> dict:
+    """
+    Solve every case in `specs`, sharing one prioritised concurrency limit.
+
+    Args:
+        specs: Cases from `load_manifest`
+        output_dir: Where verdicts and checkpoint.json are written
+        max_concurrency: Global cap on in-flight LLM calls across all cases
+            (default: EXTRACTION_CONFIG["max_workers"])
+        max_active_cases: Cases loaded and in progress at once (bounds memory)
+        use_cache: Passed to asolve_mystery (default: CACHE_CONFIG["enabled"])
+        resume: Skip cases the checkpoint records as done
+
+    Returns:
+        The checkpoint's per-case status dict
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint = BatchCheckpoint(output_dir / "checkpoint.json")
+
+    pending = [s for s in specs if not (resume and checkpoint.is_done(s.case_id))]
+    if len(pending) < len(specs):
+        logger.info("Resuming: %d of %d cases already done", len(specs) - len(pending), len(specs))
+
+    semaphore = PrioritySemaphore(max_concurrency or EXTRACTION_CONFIG["max_workers"])
+    case_slots = asyncio.Semaphore(max_active_cases)
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(
+        _solve_case(spec, f"[{n}/{len(pending)} {spec.case_id}]", output_dir, checkpoint,
+                    semaphore, case_slots, use_cache)
+        for n, spec in enumerate(sorted(pending, key=lambda s: s.priority), 1)
+    ))
+    logger.info("Batch finished: %d solved, %d failed in %.1fs",
+                sum(outcomes), len(outcomes) - sum(outcomes), time.perf_counter() - start)
+    return checkpoint.cases
+
+
+def solve_batch(specs: List[CaseSpec], output_dir: str, max_concurrency: int = None,
+                max_active_cases: int = 32, use_cache: bool = None, resume: bool = True) -> dict:
+    """Synchronous wrapper around asolve_batch."""
+    return run_sync(asolve_batch(specs, output_dir, max_concurrency, max_active_cases, use_cache, resume))
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Solve a batch of case files with one shared worker pool.")
+    parser.add_argument("source", help="Directory of case JSON files, or a .json/.txt manifest")
+    parser.add_argument("-o", "--output", default="batch_output", help="Directory for verdicts and checkpoint")
+    parser.add_argument("--max-concurrency", type=int, help="Global cap on in-flight LLM calls")
+    parser.add_argument("--max-active-cases", type=int, default=32, help="Cases in progress at once")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the extraction cache and artifact store")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and solve every case again")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    specs = load_manifest(args.source)
+    logger.info("Loaded %d cases from %s", len(specs), args.source)
+    results = solve_batch(specs, args.output, args.max_concurrency, args.max_active_cases,
+                          use_cache=False if args.no_cache else None, resume=not args.restart)
+    failed = [case_id for case_id, info in results.items() if info.get("status") != "done"]
+    if failed:
+        logger.warning("Unfinished cases: %s", ", ".join(failed))
+    return results
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        logger.exception("Error running batch: %s", e)
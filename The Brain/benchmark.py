@@ -0,0 +1,473 @@
+"""
+Offline benchmark harness for the Brain pipeline.
+
+Replaces the SMART/FAST LLM clients with a deterministic ReplayLLM (recorded or
+synthesised responses, configurable latency, error rate and 429 bursts) and
+drives `solve_mystery` over synthetic case files scaled from
+detective_test_data.json. No network access or API key is needed: the real
+Groq clients are built lazily by config.get_smart_llm/get_fast_llm, and the
+benchmark replaces those factories before any are constructed.
+
+Usage:
+    python benchmark.py                          # 1x, 10x, 100x with default settings
+    python benchmark.py --scales 1 10 --repeat 5
+    python benchmark.py --sweep chunk_size=8000,16000 --sweep max_workers=4,16
+    python benchmark.py --scales 1 10 --latency 0.5 --sweep speculative=0,1   # serial vs speculative verdict
+    python benchmark.py --malformed-rate 0.3 --sweep salvage=0,1                # strict JSON vs salvage + re-ask
+    python benchmark.py --stall-rate 0.03 --stall-seconds 3 --sweep hedge=0,1   # extraction p99 with/without hedging
+    python benchmark.py --compare .cache/benchmarks/<earlier>.json
+"""
+
+import argparse
+import ast
+import asyncio
+import copy
+import hashlib
+import itertools
+import json
+import logging
+import random
+import re
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable
+
+import engine
+from config import EXTRACTION_CONFIG, TIMELINE_CONFIG, CONTRADICTION_CONFIG, VERDICT_CONFIG
+from detective_data_loader import CaseFile, load_case_data
+from rate_limit import AdaptiveConcurrency, RateLimitedLLM, RateLimiter
+from tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = Path(__file__).parent / ".cache" / "benchmarks"
+
+# Config dicts whose keys --sweep may override (keys are unique across them)
+SWEEPABLE_CONFIGS = (EXTRACTION_CONFIG, TIMELINE_CONFIG, CONTRADICTION_CONFIG, VERDICT_CONFIG)
+
+_TIME_RE = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)\b")
+_NAME_RE = re.compile(r"\b(?:Dr\. )?([A-Z][a-z]+ [A-Z][a-z]+)\b")
+_CONTINUE_RE = re.compile(r"YOUR PREVIOUS ANSWER WAS CUT OFF\. You already returned (\d+) items")
+
+
+class SimulatedRateLimitError(Exception):
+    """Stand-in for the provider's HTTP 429 response."""
+    status_code = 429
+
+
+def prompt_key(text: str) -> str:
+    """Key used to look up a recorded response for a prompt."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def synthesize_response(prompt: str) -> str:
+    """
+    Produce a plausible response for a pipeline prompt without an LLM.
+
+    Extraction prompts get one JSON item per clock time found in the raw text,
+    attributed to the nearest capitalised name on the same line; other phases
+    get short canned text. An extraction re-ask after a cut-off answer gets
+    only the items after the ones already returned.
+    """
+    if "Extract the JSON list" in prompt:
+        dtype = "CLAIMS" if "DATA TYPE: CLAIMS" in prompt else "FACTS"
+        raw_text = prompt.split("RAW TEXT:", 1)[-1]
+        already = _CONTINUE_RE.search(raw_text)
+        if already:
+            raw_text = raw_text[:already.start()]
+        items = []
+        for line in raw_text.splitlines():
+            names = _NAME_RE.findall(line)
+            for n, match in enumerate(_TIME_RE.finditer(line)):
+                items.append({
+                    "time": f"{int(match.group(1)):02d}:{match.group(2)}",
+                    "entity": names[0] if names else "Unknown",
+                    "action": line.strip()[:60],
+                    "location": f"Location {len(line) % 7}",
+                    "type": dtype,
+                })
+        return json.dumps(items[int(already.group(1)):] if already else items)
+    if "Write ONLY the SUSPECT ANALYSIS" in prompt:
+        return "SUSPECT ANALYSIS:\nNobody:\n- Final Score: 0\n- VERDICT: INSUFFICIENT"
+    if "SUSPECT UNDER REVIEW" in prompt:
+        name = prompt.split("SUSPECT:", 1)[-1].splitlines()[0].strip()
+        return (f"{name}:\n- Means: 5 - synthetic\n- Motive: 5 - synthetic\n- Opportunity: 5 - synthetic\n"
+                "- Physical Evidence: None\n- Contradictions: None\n- Final Score: 5\n- VERDICT: INSUFFICIENT")
+    if "Identify the lies" in prompt or "CANDIDATE CONTRADICTIONS" in prompt:
+        return "Contradiction #1: [Severity: 7/10]\n- CLAIM: synthetic\n- FACT: synthetic\n- IMPACT: benchmark"
+    if "Who is the killer" in prompt:
+        return "CASE SUMMARY:\nSynthetic benchmark verdict.\n\nKILLER: Nobody\nConfidence Score: 0%"
+    return "Synthetic response."
+
+
+class ReplayLLM(BaseChatModel):
+    """
+    Deterministic offline chat model.
+
+    Responses come from `recordings` (prompt hash -> text) when present, else
+    from `synthesize_response`. Latency is lognormal around `median_latency`;
+    `error_rate` raises transient errors and every `burst_every` calls a burst
+    of `burst_length` simulated 429s is returned. With `malformed_rate`, that
+    share of extraction answers comes back fenced with a trailing comma,
+    wrapped in prose, or cut off mid-list. A `stall_rate` share of calls
+    hangs for an extra `stall_seconds`, like a stuck HTTP connection.
+    """
+
+    model_name: str = "replay"
+    recordings: dict = {}
+    median_latency: float = 0.05
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    stall_rate: float = 0.0
+    stall_seconds: float = 0.0
+    burst_every: int = 0
+    burst_length: int = 0
+    seed: int = 0
+    calls: int = 0
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _plan_call(self, messages) -> tuple:
+        prompt = "\n".join(str(m.content) for m in messages)
+        self.calls += 1
+        latency = self.median_latency * self._rng.lognormvariate(0, self.latency_sigma)
+        if self.stall_rate and self._rng.random() < self.stall_rate:
+            latency += self.stall_seconds
+        if self.burst_every and (self.calls % self.burst_every) < self.burst_length:
+            return prompt, latency * 0.1, SimulatedRateLimitError("429 Too Many Requests (simulated)")
+        if self._rng.random() < self.error_rate:
+            return prompt, latency, RuntimeError("Simulated transient provider error")
+        return prompt, latency, None
+
+    def _malform(self, text: str) -> str:
+        """Damage an extraction answer the way real models do."""
+        kind = self._rng.randrange(3)
+        if kind == 0:
+            return "```json\n" + re.sub(r"\}\s*\]$", "},\n]", text) + "\n```"
+        if kind == 1:
+            return "Here are the extracted items:\n" + text + "\nLet me know if you need anything else."
+        # Output limit hit: cut somewhere in the second half of the list
+        return text[:int(len(text) * self._rng.uniform(0.5, 0.95))]
+
+    def _result(self, prompt: str, latency: float) -> ChatResult:
+        text = self.recordings.get(prompt_key(prompt)) or synthesize_response(prompt)
+        if self.malformed_rate and "Extract the JSON list" in prompt and self._rng.random() < self.malformed_rate:
+            text = self._malform(text)
+        message = AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": len(prompt) // 4,
+                "output_tokens": len(text) // 4,
+                "total_tokens": (len(prompt) + len(text)) // 4,
+            },
+            response_metadata={"model_name": self.model_name, "latency": latency},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt, latency, error = self._plan_call(messages)
+        time.sleep(latency)
+        if error is not None:
+            raise error
+        return self._result(prompt, latency)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt, latency, error = self._plan_call(messages)
+        await asyncio.sleep(latency)
+        if error is not None:
+            raise error
+        return self._result(prompt, latency)
+
+
+class RecordingLLM(Runnable):
+    """Wraps a real chat model and stores each response under its prompt hash for later replay."""
+
+    def __init__(self, llm, recordings: dict):
+        self.llm = llm
+        self.recordings = recordings
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.llm, "model_name", "recording")
+
+    def invoke(self, input: Any, config=None, **kwargs):
+        result = self.llm.invoke(input, config, **kwargs)
+        self.recordings[prompt_key("\n".join(str(m.content) for m in input.to_messages()))] = result.content
+        return result
+
+    async def ainvoke(self, input: Any, config=None, **kwargs):
+        result = await self.llm.ainvoke(input, config, **kwargs)
+        self.recordings[prompt_key("\n".join(str(m.content) for m in input.to_messages()))] = result.content
+        return result
+
+
+def scale_case(case: dict, factor: int) -> dict:
+    """
+    Build a synthetic case with `factor` copies of every document and interview.
+
+    Copies get distinct ids and their clock times shifted by a few minutes so
+    that chunks are not byte-identical.
+    """
+    if factor <= 1:
+        return copy.deepcopy(case)
+
+    def _shift(text: str, minutes: int) -> str:
+        def _sub(match):
+            total = (int(match.group(1)) * 60 + int(match.group(2)) + minutes) % (24 * 60)
+            return f"{total // 60:02d}:{total % 60:02d}"
+        return _TIME_RE.sub(_sub, text)
+
+    scaled = copy.deepcopy(case)
+    for section, field in (("documents", "content"), ("audio_transcripts", "transcript")):
+        originals = case[section]
+        scaled[section] = {}
+        for copy_idx in range(factor):
+            for key, value in originals.items():
+                item = copy.deepcopy(value)
+                item[field] = _shift(item[field], copy_idx % 7)
+                scaled[section][f"{key}_copy_{copy_idx}" if copy_idx else key] = item
+    return scaled
+
+
+def _case_texts(case: dict) -> tuple:
+    """Render a case dict with the same layout as detective_data_loader."""
+    case_file = CaseFile.from_data(case)
+    return (case_file.audio_text, case_file.documents_text, case_file.clues_text,
+            case_file.metadata.get("time_of_death"), case_file.metadata.get("victim"))
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def install_replay_llms(args, recordings: dict) -> List[ReplayLLM]:
+    """Point engine's client factories at rate-limited ReplayLLMs; returns the fakes for call counts."""
+    fakes = []
+    for attr, name in (("get_smart_llm", "replay-smart"), ("get_fast_llm", "replay-fast")):
+        fake = ReplayLLM(
+            model_name=name,
+            recordings=recordings,
+            median_latency=args.latency,
+            latency_sigma=args.latency_sigma,
+            error_rate=args.error_rate,
+            malformed_rate=args.malformed_rate,
+            stall_rate=args.stall_rate,
+            stall_seconds=args.stall_seconds,
+            burst_every=args.burst_every,
+            burst_length=args.burst_length,
+            seed=args.seed,
+        )
+        limiter = RateLimiter(
+            args.rpm, args.tpm,
+            concurrency=AdaptiveConcurrency(initial=4, maximum=EXTRACTION_CONFIG["max_workers"]),
+        )
+        llm = RateLimitedLLM(fake, limiter)
+        setattr(engine, attr, lambda llm=llm: llm)
+        fakes.append(fake)
+    return fakes
+
+
+def run_once(texts: tuple) -> dict:
+    """
+    Solve one case with tracing and memory tracking; returns raw measurements.
+
+    A run that fails (e.g. injected errors outlasting the retries) is
+    recorded with its error rather than aborting the sweep.
+    """
+    audio, docs, clues, window, victim = texts
+    TRACER.reset()
+    tracemalloc.start()
+    start = time.perf_counter()
+    error = None
+    try:
+        engine.solve_mystery(audio, docs, clues, use_cache=False, critical_window=window, victim=victim)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        logger.warning("Run failed: %s", error)
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    records = TRACER.records()
+    phases = {}
+    for r in records:
+        if r["category"] == "phase":
+            phases[r["name"]] = r["duration"]
+    calls = [r["duration"] for r in records if r["category"] == "chunk"]
+    retries = sum(r.get("retries", 0) for r in records)
+    reasks = sum(r.get("reasks", 0) for r in records)
+    tokens = sum(r.get("prompt_tokens", 0) + r.get("completion_tokens", 0) for r in records)
+    hedges = sum(r.get("hedges", 0) for r in records)
+    return {"wall": wall, "peak_mb": peak / 1e6, "phases": phases, "chunk_latencies": calls,
+            "retries": retries, "reasks": reasks, "tokens": tokens, "hedges": hedges, "error": error}
+
+
+def _sweep_value(text: str):
+    """Python literal of a --sweep value (0.1, None, True, 8000); anything else stays a string."""
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def benchmark(args) -> dict:
+    """Run every (scale, config) combination `args.repeat` times and aggregate the results."""
+    case = load_case_data(args.case)
+    recordings = json.loads(Path(args.recordings).read_text()) if args.recordings else {}
+
+    sweep = {}
+    for spec in args.sweep or []:
+        key, values = spec.split("=", 1)
+        sweep[key] = [_sweep_value(v) for v in values.split(",")]
+    combos = [dict(zip(sweep, values)) for values in itertools.product(*sweep.values())] or [{}]
+
+    base_configs = [(config, dict(config)) for config in SWEEPABLE_CONFIGS]
+    for key in sweep:
+        if not any(key in config for config in SWEEPABLE_CONFIGS):
+            raise ValueError(f"Unknown sweep key {key!r}")
+    results = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "settings": vars(args).copy(), "runs": []}
+    try:
+        for overrides, factor in itertools.product(combos, args.scales):
+            for config, base in base_configs:
+                config.clear()
+                config.update(base, **{k: v for k, v in overrides.items() if k in base})
+            fakes = install_replay_llms(args, recordings)
+            scaled = scale_case(case, factor)
+            texts = _case_texts(scaled)
+            documents = len(scaled["documents"]) + len(scaled["audio_transcripts"])
+
+            measurements = [run_once(texts) for _ in range(args.repeat)]
+            walls = [m["wall"] for m in measurements]
+            phase_names = sorted({p for m in measurements for p in m["phases"]})
+            chunk_latencies = [lat for m in measurements for lat in m["chunk_latencies"]]
+            extract_times = [seconds for m in measurements for name, seconds in m["phases"].items()
+                             if name.startswith("extract")]
+            row = {
+                "scale": factor,
+                "config": overrides,
+                "documents": documents,
+                "wall_p50": statistics.median(walls),
+                "docs_per_sec": documents / statistics.median(walls),
+                "peak_mb": max(m["peak_mb"] for m in measurements),
+                "llm_calls": sum(f.calls for f in fakes) / args.repeat,
+                "retries": sum(m["retries"] for m in measurements) / args.repeat,
+                "failures": [m["error"] for m in measurements if m["error"]],
+                "reasks": sum(m["reasks"] for m in measurements) / args.repeat,
+                "tokens": sum(m["tokens"] for m in measurements) / args.repeat,
+                "hedges": sum(m["hedges"] for m in measurements) / args.repeat,
+                "chunk_p50": _percentile(chunk_latencies, 50),
+                "chunk_p99": _percentile(chunk_latencies, 99),
+                "extract_p50": _percentile(extract_times, 50),
+                "extract_p99": _percentile(extract_times, 99),
+                "phases": {
+                    name: {
+                        "p50": _percentile([m["phases"][name] for m in measurements if name in m["phases"]], 50),
+                        "p99": _percentile([m["phases"][name] for m in measurements if name in m["phases"]], 99),
+                    }
+                    for name in phase_names
+                },
+            }
+            results["runs"].append(row)
+            print(_format_row(row))
+    finally:
+        for config, base in base_configs:
+            config.clear()
+            config.update(base)
+    return results
+
+
+def _format_row(row: dict) -> str:
+    config = ",".join(f"{k}={v}" for k, v in row["config"].items()) or "default"
+    phases = "  ".join(f"{name}={stats['p50']:.2f}/{stats['p99']:.2f}s" for name, stats in row["phases"].items())
+    failed = f"FAILED={len(row['failures'])} ({row['failures'][0]}) " if row["failures"] else ""
+    return (
+        f"x{row['scale']:<4} [{config}] docs={row['documents']:<5} wall={row['wall_p50']:.2f}s "
+        f"thru={row['docs_per_sec']:.1f} docs/s peak={row['peak_mb']:.1f}MB calls={row['llm_calls']:.0f} "
+        f"{failed}retries={row['retries']:.0f} reasks={row['reasks']:.0f} tokens={row['tokens']:.0f} "
+        f"hedges={row['hedges']:.0f} chunk p50/p99={row['chunk_p50']:.2f}/{row['chunk_p99']:.2f}s "
+        f"extract p50/p99={row['extract_p50']:.2f}/{row['extract_p99']:.2f}s\n"
+        f"       phases p50/p99: {phases}"
+    )
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.10) -> List[str]:
+    """List runs whose median wall time regressed by more than `threshold` against `baseline`."""
+    def _key(row):
+        return row["scale"], json.dumps(row["config"], sort_keys=True)
+
+    previous = {_key(row): row for row in baseline.get("runs", [])}
+    lines = []
+    for row in current["runs"]:
+        old = previous.get(_key(row))
+        if old is None:
+            continue
+        change = (row["wall_p50"] - old["wall_p50"]) / old["wall_p50"] if old["wall_p50"] else 0.0
+        flag = "REGRESSION" if change > threshold else "ok"
+        lines.append(f"x{row['scale']} {row['config'] or 'default'}: "
+                     f"{old['wall_p50']:.2f}s -> {row['wall_p50']:.2f}s ({change:+.0%}) {flag}")
+    return lines
+
+
+def parse_args(argv: Optional[list] = None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Offline benchmark of the Brain pipeline with a replayed LLM.")
+    parser.add_argument("--case", default="detective_test_data.json", help="Seed case file")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="Document multipliers")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scale/config")
+    parser.add_argument("--sweep", action="append", metavar="KEY=V1,V2",
+                        help="Extraction, timeline, contradiction or verdict config values to sweep (repeatable)")
+    parser.add_argument("--recordings", help="JSON file of recorded responses (prompt hash -> text)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Median simulated call latency (s)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal sigma of call latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a transient error per call")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="Probability that an extraction answer is fenced, prose-wrapped or truncated")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Probability that a call stalls")
+    parser.add_argument("--stall-seconds", type=float, default=0.0, help="Extra latency of a stalled call (s)")
+    parser.add_argument("--burst-every", type=int, default=0, help="Start a 429 burst every N calls (0 = never)")
+    parser.add_argument("--burst-length", type=int, default=0, help="Calls per 429 burst")
+    parser.add_argument("--rpm", type=float, default=100000, help="Simulated requests/minute quota")
+    parser.add_argument("--tpm", type=float, default=10 ** 9, help="Simulated tokens/minute quota")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Where to save results (default: .cache/benchmarks/<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier results file to check for regressions")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> dict:
+    args = parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = benchmark(args)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        for line in compare(results, json.loads(Path(args.compare).read_text())):
+            print(line)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Persistent, content-addressed cache for per-chunk extraction results."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(*parts: str) -> str:
+    """
+    Build a content-addressed key from an ordered sequence of strings.
+
+    Args:
+        *parts: Strings that together identify a result (chunk text, data type, prompt, model)
+
+    Returns:
+        Hex SHA-256 digest of the length-prefixed parts
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = str(part).encode("utf-8")
+        # Length prefix keeps ("ab", "c") and ("a", "bc") distinct
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    SQLite-backed LRU cache mapping chunk keys to parsed extraction results.
+
+    The cache is safe to share between the worker threads of
+    `process_chunk_in_parallel`; all access goes through a single lock.
+    """
+
+    def __init__(self, path, max_entries: int = 5000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries(last_access)")
+        self._conn.commit()
+
+    def get(self, key: str):
+        """Return the cached value for `key`, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value) -> None:
+        """Store a JSON-serialisable value and evict least-recently-used entries over the bound."""
+        payload = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, last_access) VALUES (?, ?, ?)",
+                (key, payload, time.time())
+            )
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM entries ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every cached entry and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+        logger.info("Extraction cache cleared (%s)", self.path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current entry count."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class ArtifactStore(ExtractionCache):
+    """
+    On-disk store of pipeline artifacts (timeline, contradictions, verdict).
+
+    Each artifact is addressed by a fingerprint of its inputs, and those inputs
+    include the fingerprints of upstream artifacts. The artifacts therefore form
+    a Merkle-style dependency graph: a change anywhere only invalidates the
+    artifacts downstream of it.
+    """
+
+    async def aget_or_compute(self, name: str, fingerprint: str, compute):
+        """
+        Return the stored artifact for `fingerprint`, or await `compute()` and store it.
+
+        Args:
+            name: Artifact name, used for logging
+            fingerprint: `make_cache_key` of the artifact name and its inputs
+            compute: Zero-argument callable returning an awaitable of a JSON-serialisable value
+
+        Returns:
+            The artifact value
+        """
+        stored = self.get(fingerprint)
+        if stored is not None:
+            logger.info("Artifact '%s' unchanged (%s), reusing stored result", name, fingerprint[:12])
+            return stored
+        logger.info("Artifact '%s' changed (%s), recomputing", name, fingerprint[:12])
+        value = await compute()
+        self.put(fingerprint, value)
+        return value
@@ -1,32 +1,162 @@
 """Configuration and LLM initialization."""
 
 import logging
+from functools import lru_cache
 from pathlib import Path
-from dotenv import load_dotenv
-from langchain_groq import ChatGroq
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
-# Load environment
+# Environment file read when the first LLM client is built
 env_path = Path(__file__).parent / ".env"
-load_dotenv(dotenv_path=env_path)
 
-logger.info("Loading the LLMs...")
+# --- RATE LIMITS ---
+# Per-model quotas from the Groq console. Each client gets its own limiter;
+# the AIMD controller raises concurrency until it sees 429s or latency spikes.
+RATE_LIMIT_CONFIG = {
+    "llama-3.3-70b-versatile": {"requests_per_minute": 30, "tokens_per_minute": 12000},
+    "llama-3.1-8b-instant": {"requests_per_minute": 30, "tokens_per_minute": 6000},
+    "completion_tokens": 1024,   # Estimated completion size reserved per request
+    "initial_concurrency": 4,
+    "max_concurrency": 16,
+}
+
+
+def _rate_limited(llm):
+    """Wrap a chat model in a limiter built from RATE_LIMIT_CONFIG."""
+    from rate_limit import RateLimiter, RateLimitedLLM, AdaptiveConcurrency
+
+    limits = RATE_LIMIT_CONFIG[llm.model_name]
+    limiter = RateLimiter(
+        limits["requests_per_minute"],
+        limits["tokens_per_minute"],
+        completion_tokens=RATE_LIMIT_CONFIG["completion_tokens"],
+        concurrency=AdaptiveConcurrency(
+            initial=RATE_LIMIT_CONFIG["initial_concurrency"],
+            maximum=RATE_LIMIT_CONFIG["max_concurrency"],
+        ),
+    )
+    return RateLimitedLLM(llm, limiter)
+
+
+def _groq_client(model: str, temperature: float):
+    # LangChain, the Groq SDK and .env are only loaded when a client is first needed
+    from dotenv import load_dotenv
+    from langchain_groq import ChatGroq
+
+    load_dotenv(dotenv_path=env_path)
+    logger.info("Loading %s...", model)
+    # The request timeout ends a call abandoned at its deadline by hedging.call_with_deadline
+    return _rate_limited(ChatGroq(model=model, temperature=temperature,
+                                  timeout=EXTRACTION_CONFIG["call_timeout"]))
+
 
 # --- MODEL SPECIALIZATION ---
-# 1. THE SMART ONE (Llama 3.3 70B): For Logic, Extraction, and Verdicts.
-SMART_LLM = ChatGroq(model="llama-3.3-70b-versatile", temperature=0.1)
+# Clients are built on first use and memoised, so importing the engine (or
+# running --help / data statistics) never pays for LangChain or the Groq SDK.
+
+@lru_cache(maxsize=None)
+def get_smart_llm():
+    """THE SMART ONE (Llama 3.3 70B): For Logic, Extraction, and Verdicts."""
+    return _groq_client("llama-3.3-70b-versatile", temperature=0.1)
+
+
+@lru_cache(maxsize=None)
+def get_fast_llm():
+    """THE FAST ONE (Llama 3.1 8B): For Organizing, Sorting, and Summarizing."""
+    return _groq_client("llama-3.1-8b-instant", temperature=0)
 
-# 2. THE FAST ONE (Llama 3.1 8B): For Organizing, Sorting, and Summarizing.
-FAST_LLM = ChatGroq(model="llama-3.1-8b-instant", temperature=0)
+
+def __getattr__(name: str):
+    # Backwards compatible `config.SMART_LLM` / `config.FAST_LLM`, built on first access
+    if name == "SMART_LLM":
+        return get_smart_llm()
+    if name == "FAST_LLM":
+        return get_fast_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --- EXTRACTION CONFIGURATION ---
+# Whole documents/interviews are packed into chunks of up to chunk_tokens model
+# tokens; only a record larger than that is split (with overlap_tokens overlap).
+# Set chunk_tokens to None to use the character splitter (chunk_size/chunk_overlap).
 EXTRACTION_CONFIG = {
+    "chunk_tokens": 4000,
+    "overlap_tokens": 100,
+    "stream_overlap_segments": 1,   # Live transcript segments repeated at the start of the next chunk
     "chunk_size": 16000,
     "chunk_overlap": 400,
     "separators": ["\n\n", "\n", ".", " ", ""],
-    "max_workers": 6,
+    "max_workers": 16,        # Upper bound only; the rate limiter sets actual concurrency
     "retries": 3,
+    # Validate items against structured.ExtractedItem and keep every valid item of a
+    # fenced, prose-wrapped or truncated answer; False requires one clean JSON list
+    "salvage": True,
+    "reask_tail": True,       # Re-ask a truncated answer for the missing items only
+    "call_timeout": 120,      # Seconds before one chunk call is abandoned and retried (None: no limit)
+    # Hedging: a chunk call still running after the p`hedge_percentile` latency of
+    # recent calls gets one duplicate request; the first answer wins and the
+    # other is cancelled. At most `hedge_budget` extra requests per call started.
+    "hedge": False,
+    "hedge_percentile": 95,
+    "hedge_budget": 0.1,
+    "hedge_min_samples": 10,  # Completed calls needed before hedging starts
+}
+
+# --- CROSS-CHUNK MERGE ---
+# Items reported by several chunks (record overlap, repeated mentions) are
+# merged by normalised (time, entity, action, location); see merge.py.
+MERGE_CONFIG = {
+    "dedupe": True,
+    "action_similarity": 0.6,   # Jaccard similarity of action words to count as the same event
+    "provenance": True,         # Attach [{"chunk", "source"}] to each item
+}
+
+# --- TIMELINE CONFIGURATION ---
+# The timeline is merged, sorted, de-duplicated and gap-checked in pure Python
+# (timeline.py). FAST_LLM is only used to phrase the result when enabled.
+TIMELINE_CONFIG = {
+    "gap_minutes": 30,
+    "phrase_with_llm": False,
+    # Phrasing: a timeline longer than this is split into consecutive time
+    # windows (never splitting one timestamp) phrased in parallel and joined
+    # in order, so each call stays small however large the case is
+    "window_tokens": 2500,
+}
+
+# --- CONTRADICTION PRE-FILTER ---
+# Overlapping FACT/CLAIM pairs with different locations are found by an interval
+# index (contradictions.py); only those candidates go to SMART_LLM for scoring.
+CONTRADICTION_CONFIG = {
+    "prefilter": True,
+    "tolerance_minutes": 15,
+    "max_candidates": 50,
+}
+
+# --- VERDICT ---
+# Each suspect is assessed concurrently from a small evidence packet (their own
+# events plus BM25-retrieved passages, retrieval.py); a final call compares the
+# assessments. With per_suspect off, or no suspects found, one prompt gets the
+# whole timeline, contradictions and clues.
+VERDICT_CONFIG = {
+    "per_suspect": True,
+    # Draft the suspect analysis (timeline + clues) while the contradiction pass
+    # runs, then reconcile both in one short call instead of waiting for it
+    "speculative": False,
+    "max_suspects": 8,
+    "events_per_suspect": 40,
+    "passages_per_suspect": 6,
+    "passage_tokens": 300,
+    "index_path": Path(__file__).parent / ".cache" / "evidence_index.sqlite3",
+}
+
+# --- EXTRACTION CACHE ---
+# Per-chunk results keyed by chunk text, data type, prompt and model name.
+# Downstream artifacts (timeline, contradictions, verdict) are keyed by a
+# fingerprint of their inputs, so re-runs only recompute what changed.
+CACHE_CONFIG = {
+    "enabled": True,
+    "path": Path(__file__).parent / ".cache" / "extraction_cache.sqlite3",
+    "artifact_path": Path(__file__).parent / ".cache" / "artifacts.sqlite3",
+    "max_entries": 5000,
 }
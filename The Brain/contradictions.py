@@ -0,0 +1,155 @@
+"""Rule-based pre-filter that finds candidate FACT/CLAIM location conflicts."""
+
+import re
+from collections.abc import Mapping
+from bisect import bisect_right
+from typing import List, Optional
+
+from timeline import TimeAxis, parse_time
+
+_TITLE_RE = re.compile(r"\b(dr|mr|mrs|ms|miss|prof|professor|det|detective|officer|sgt)\b\.?", re.IGNORECASE)
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_WS_RE = re.compile(r"\s+")
+_UNKNOWN_LOCATIONS = {"", "unknown", "n/a", "na", "none", "not specified", "unspecified"}
+
+
+def normalise_entity(name) -> str:
+    """Canonical entity key: "Reid, Marcus" and "Dr. Marcus Reid" both become "marcus reid"."""
+    name = str(name or "")
+    if name.count(",") == 1:
+        last, first = name.split(",")
+        name = f"{first} {last}"
+    name = _TITLE_RE.sub(" ", name)
+    name = _PUNCT_RE.sub(" ", name)
+    return _WS_RE.sub(" ", name).strip().lower()
+
+
+def normalise_location(location) -> str:
+    """Canonical location key used to decide whether two places differ."""
+    location = _PUNCT_RE.sub(" ", str(location or "").lower())
+    location = _WS_RE.sub(" ", location).strip()
+    return "" if location in _UNKNOWN_LOCATIONS else location
+
+
+def _same_place(a: str, b: str) -> bool:
+    # "lab 1" vs "lab 1 building c": treat containment as the same place
+    return a == b or a in b or b in a
+
+
+class IntervalIndex:
+    """Per-entity interval index over FACT events, queried for overlaps with a claim."""
+
+    def __init__(self):
+        self._starts = {}
+        self._events = {}
+        self._max_len = {}
+
+    @classmethod
+    def build(cls, events: list) -> "IntervalIndex":
+        """Build from (entity_key, start, end, payload) tuples."""
+        index = cls()
+        by_entity = {}
+        for entity, start, end, payload in events:
+            by_entity.setdefault(entity, []).append((start, end, payload))
+        for entity, rows in by_entity.items():
+            rows.sort(key=lambda r: (r[0], r[1]))
+            index._starts[entity] = [r[0] for r in rows]
+            index._events[entity] = rows
+            index._max_len[entity] = max(r[1] - r[0] for r in rows)
+        return index
+
+    def overlapping(self, entity: str, start: int, end: int) -> list:
+        """Return payloads of events for `entity` whose interval intersects [start, end]."""
+        starts = self._starts.get(entity)
+        if not starts:
+            return []
+        rows = self._events[entity]
+        lo = bisect_right(starts, start - self._max_len[entity] - 1)
+        hi = bisect_right(starts, end)
+        return [payload for s, e, payload in rows[lo:hi] if e >= start]
+
+
+def find_candidate_contradictions(facts: list, claims: list, tolerance_minutes: int = 15,
+                                  critical_window: Optional[str] = None,
+                                  max_candidates: int = 50) -> List[dict]:
+    """
+    Find CLAIMS that put an entity somewhere other than where a FACT places them at the same time.
+
+    Args:
+        facts: Extracted FACT items
+        claims: Extracted CLAIM items
+        tolerance_minutes: Slack added around each claim (more for approximate times)
+        critical_window: Optional time string (e.g. time of death); conflicts inside it rank first
+        max_candidates: Keep only the highest-ranked candidates
+
+    Returns:
+        Ranked candidate dicts with entity, claim/fact items and FACTS[i]/CLAIMS[j] evidence pointers
+    """
+    parsed_facts = [(i, item, parse_time(str(item.get("time") or "")))
+                    for i, item in enumerate(facts) if isinstance(item, Mapping)]
+    parsed_claims = [(j, item, parse_time(str(item.get("time") or "")))
+                     for j, item in enumerate(claims) if isinstance(item, Mapping)]
+    axis = TimeAxis([pt for _, _, pt in parsed_facts + parsed_claims if pt is not None])
+
+    window = None
+    if critical_window:
+        pt = parse_time(critical_window)
+        if pt is not None:
+            window = axis.place(pt)
+
+    fact_rows = []
+    for i, item, pt in parsed_facts:
+        location = normalise_location(item.get("location"))
+        if pt is None or not location:
+            continue
+        entity = normalise_entity(item.get("entity"))
+        if entity in ("", "unknown"):
+            continue
+        start, end = axis.place(pt)
+        fact_rows.append((entity, start, end, (i, item, location, pt.approx, start, end)))
+    index = IntervalIndex.build(fact_rows)
+
+    candidates = []
+    for j, claim, pt in parsed_claims:
+        claim_location = normalise_location(claim.get("location"))
+        if pt is None or not claim_location:
+            continue
+        start, end = axis.place(pt)
+        slack = tolerance_minutes * (2 if pt.approx else 1)
+        entity = normalise_entity(claim.get("entity"))
+        for i, fact, fact_location, fact_approx, fact_start, fact_end in index.overlapping(
+                entity, start - slack, end + slack):
+            if _same_place(claim_location, fact_location):
+                continue
+            distance = max(0, fact_start - end, start - fact_end)
+            score = 1.0 - distance / (slack + 1)
+            if not (pt.approx or fact_approx):
+                score += 0.5
+            if window is not None and start <= window[1] and end >= window[0]:
+                score += 2.0
+            candidates.append({
+                "entity": claim.get("entity") or fact.get("entity"),
+                "claim": claim,
+                "fact": fact,
+                "claim_ref": f"CLAIMS[{j}]",
+                "fact_ref": f"FACTS[{i}]",
+                "score": round(score, 3),
+            })
+
+    candidates.sort(key=lambda c: (-c["score"], c["claim_ref"], c["fact_ref"]))
+    return candidates[:max_candidates]
+
+
+def render_candidates(candidates: List[dict]) -> str:
+    """Compact, one-block-per-candidate rendering for the severity-scoring prompt."""
+    if not candidates:
+        return "None"
+    blocks = []
+    for n, c in enumerate(candidates, 1):
+        claim, fact = c["claim"], c["fact"]
+        blocks.append(
+            f"Candidate #{n} [{c['claim_ref']} vs {c['fact_ref']}, rank score {c['score']}]\n"
+            f"- CLAIM: {claim.get('time')} | {claim.get('entity')} | {claim.get('action')} | {claim.get('location')}\n"
+            f"- FACT: {fact.get('time')} | {fact.get('entity')} | {fact.get('action')} | {fact.get('location')}"
+        )
+    return "\n".join(blocks)
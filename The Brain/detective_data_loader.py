@@ -13,54 +13,232 @@ Usage:
     audio = get_audio_text()
     documents = get_documents_text()
     clues = get_clues_text()
+    
+    # The file is parsed once and cached (re-read only when it changes on disk);
+    # use a CaseFile directly for lazy sections or streaming very large exports
+    case = open_case()
+    metadata = case.metadata
 """
 
 import json
+import os
+import re
+import threading
+from bisect import bisect_right
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
+try:
+    import ijson
+except ImportError:  # optional: the built-in incremental scanner is used instead
+    ijson = None
 
-def load_case_data(filepath: str = "detective_test_data.json") -> Dict[str, Any]:
-    """
-    Load the complete case data from JSON file.
-    
-    Args:
-        filepath: Path to the JSON file (default: detective_test_data.json)
-    
-    Returns:
-        Dictionary containing all case data
-    """
-    # Try to find the file
+
+DEFAULT_CASE_FILE = "detective_test_data.json"
+
+# Case files larger than this are read section by section instead of with json.load
+STREAMING_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+_READ_SIZE = 1024 * 1024
+
+# Characters _JsonScanner stops at while skipping a value without decoding it
+_STRUCTURE_RE = re.compile(r'[{}\[\]"]')
+_STRING_STOP_RE = re.compile(r'["\\]')
+_SCALAR_END_RE = re.compile(r"[,}\]\s]")
+
+# Segment-level transcripts written by THE EAR (one JSON header line, then one line per segment)
+TRANSCRIPT_DIR = Path(__file__).parent.parent / "THE EAR" / "Evidence_Transcripts"
+SEGMENTS_SUFFIX = ".segments.jsonl"
+
+# Whisper's own thresholds for a failed decode / a silent window
+MIN_AVG_LOGPROB = -1.0
+MAX_NO_SPEECH_PROB = 0.6
+
+
+def _resolve_path(filepath: str) -> Path:
     path = Path(filepath)
-    
     # If not found directly, try relative to this script
     if not path.exists():
-        script_dir = Path(__file__).parent
-        path = script_dir / filepath
-        
-    with open(path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+        path = Path(__file__).parent / filepath
+    return path
 
 
-def get_audio_text(filepath: str = "detective_test_data.json") -> str:
+class _JsonScanner:
     """
-    Extract and format all audio transcripts into a single text string.
-    
-    Args:
-        filepath: Path to the JSON file
-    
-    Returns:
-        Formatted string containing all audio interview transcripts
+    Incremental reader over a JSON file.
+
+    Values are delimited by a scanner that tracks nesting and strings without
+    decoding anything; only values the caller asks for are then decoded, once.
+    Skipped values are dropped from the buffer as they are read.
     """
-    data = load_case_data(filepath)
-    
+
+    def __init__(self, f):
+        self.f = f
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        chunk = self.f.read(_READ_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character (not consumed)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of case file")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Malformed case file: expected {char!r}, found {self.buffer[self.pos]!r}")
+        self.pos += 1
+
+    def _value_end(self, keep: bool) -> int:
+        """
+        Index in the buffer just past the value starting at `pos`, found without decoding it.
+
+        With `keep` the buffer grows to hold the whole value; otherwise text
+        already scanned is dropped on every read, so skipping takes constant memory.
+        """
+        self.peek()
+        i = self.pos
+        scalar = self.buffer[i] not in '{["'
+        depth = 0
+        in_string = False
+        while True:
+            buffer = self.buffer
+            n = len(buffer)
+            while i < n:
+                if scalar:
+                    match = _SCALAR_END_RE.search(buffer, i)
+                    if match is None:
+                        i = n
+                        break
+                    return match.start()
+                if in_string:
+                    match = _STRING_STOP_RE.search(buffer, i)
+                    if match is None:
+                        i = n
+                        break
+                    if match.group() == "\\":
+                        if match.end() >= n:
+                            # The escaped character is in the next read
+                            i = match.start()
+                            break
+                        i = match.end() + 1
+                        continue
+                    in_string = False
+                    i = match.end()
+                    if depth == 0:
+                        return i
+                    continue
+                match = _STRUCTURE_RE.search(buffer, i)
+                if match is None:
+                    i = n
+                    break
+                char = match.group()
+                i = match.end()
+                if char == '"':
+                    in_string = True
+                elif char in "{[":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        return i
+            if not keep:
+                self.pos = i
+            shift = self.pos
+            if not self._fill():
+                if scalar:
+                    return n
+                raise ValueError("Unexpected end of case file")
+            i -= shift
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        end = self._value_end(keep=True)
+        value, _ = self.decoder.raw_decode(self.buffer, self.pos)
+        self.pos = end
+        return value
+
+    def skip(self) -> None:
+        """Move past the next JSON value without decoding it."""
+        self.pos = self._value_end(keep=False)
+
+    def keys(self) -> Iterator[str]:
+        """Walk an object, yielding each key; the caller must consume its value before resuming."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+def _iter_json_object(path: Path, section: Optional[str] = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield (key, value) pairs of the top-level object, or of `section` inside it,
+    decoding one value at a time so the whole file is never held in memory.
+
+    Uses ijson when it is installed, otherwise `_JsonScanner`.
+    """
+    if ijson is not None:
+        found = section is None
+
+        def _events(events):
+            nonlocal found
+            for event in events:
+                if not found and event[0] == "" and event[1] == "map_key" and event[2] == section:
+                    found = True
+                yield event
+
+        with open(path, "rb") as f:
+            yield from ijson.kvitems(_events(ijson.parse(f)), section or "")
+        if not found:
+            raise KeyError(section)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        scanner = _JsonScanner(f)
+        for key in scanner.keys():
+            if section is None:
+                yield key, scanner.value()
+            elif key == section:
+                for item_key in scanner.keys():
+                    yield item_key, scanner.value()
+                return
+            else:
+                scanner.skip()
+    if section is not None:
+        raise KeyError(section)
+
+
+def _render_audio(transcripts) -> str:
     audio_sections = []
     audio_sections.append("=" * 80)
     audio_sections.append("AUDIO TRANSCRIPTS - WITNESS INTERVIEWS")
     audio_sections.append("=" * 80)
     audio_sections.append("")
-    
-    for interview_id, interview_data in data["audio_transcripts"].items():
+
+    for interview_id, interview_data in transcripts:
         audio_sections.append("-" * 80)
         audio_sections.append(f"INTERVIEW: {interview_id.replace('_', ' ').upper()}")
         audio_sections.append(f"Timestamp: {interview_data['timestamp']}")
@@ -72,29 +250,18 @@ def get_audio_text(filepath: str = "detective_test_data.json") -> str:
         if "notes" in interview_data:
             audio_sections.append(f"[DETECTIVE NOTES: {interview_data['notes']}]")
             audio_sections.append("")
-    
+
     return "\n".join(audio_sections)
 
 
-def get_documents_text(filepath: str = "detective_test_data.json") -> str:
-    """
-    Extract and format all document texts into a single string.
-    
-    Args:
-        filepath: Path to the JSON file
-    
-    Returns:
-        Formatted string containing all document contents
-    """
-    data = load_case_data(filepath)
-    
+def _render_documents(documents) -> str:
     doc_sections = []
     doc_sections.append("=" * 80)
     doc_sections.append("DOCUMENTS AND RECORDS")
     doc_sections.append("=" * 80)
     doc_sections.append("")
-    
-    for doc_id, doc_data in data["documents"].items():
+
+    for doc_id, doc_data in documents:
         doc_sections.append("-" * 80)
         doc_sections.append(f"DOCUMENT: {doc_id.replace('_', ' ').upper()}")
         doc_sections.append(f"Document ID: {doc_data.get('document_id', 'N/A')}")
@@ -103,74 +270,262 @@ def get_documents_text(filepath: str = "detective_test_data.json") -> str:
         doc_sections.append("")
         doc_sections.append(doc_data["content"])
         doc_sections.append("")
-    
+
     return "\n".join(doc_sections)
 
 
-def get_clues_text(filepath: str = "detective_test_data.json") -> str:
-    """
-    Extract and format all final clues into a single string.
-    
-    Args:
-        filepath: Path to the JSON file
-    
-    Returns:
-        Formatted string containing all final clues
-    """
-    data = load_case_data(filepath)
-    
+def _render_clues(clues) -> str:
     clue_sections = []
     clue_sections.append("=" * 80)
     clue_sections.append("FINAL CLUES AND EVIDENCE")
     clue_sections.append("=" * 80)
     clue_sections.append("")
-    
-    for clue_id, clue_data in data["final_clues"].items():
+
+    for clue_id, clue_data in clues:
         clue_sections.append("-" * 80)
         clue_sections.append(f"EVIDENCE: {clue_id.replace('_', ' ').upper()}")
         clue_sections.append("-" * 80)
         clue_sections.append("")
         clue_sections.append(clue_data["content"])
         clue_sections.append("")
-    
+
     return "\n".join(clue_sections)
 
 
-def get_all_text_combined(filepath: str = "detective_test_data.json") -> str:
+_RENDERERS = {
+    "audio_transcripts": _render_audio,
+    "documents": _render_documents,
+    "final_clues": _render_clues,
+}
+
+
+class CaseFile:
     """
-    Get all case data (audio, documents, clues) as one combined text.
+    A case file parsed at most once per on-disk version.
+
+    The file is re-read only when its mtime or size changes. Formatted
+    sections are rendered on first access and memoised. Files above
+    STREAMING_THRESHOLD_BYTES (or with streaming=True) are read section by
+    section with an incremental parser instead of json.load.
+
+    The dicts returned by `data` and `section` are shared; copy them before
+    mutating.
+    """
+
+    def __init__(self, filepath: str = DEFAULT_CASE_FILE, streaming: Optional[bool] = None):
+        self.path = _resolve_path(filepath)
+        self.streaming = streaming
+        self._lock = threading.RLock()
+        self._stamp = None
+        self._data = None
+        self._sections = {}
+        self._rendered = {}
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "CaseFile":
+        """Wrap an in-memory case dict (e.g. a synthetic case) with the same rendering API."""
+        case = cls.__new__(cls)
+        case.path = None
+        case.streaming = False
+        case._lock = threading.RLock()
+        case._stamp = None
+        case._data = data
+        case._sections = dict(data)
+        case._rendered = {}
+        return case
+
+    def _check(self) -> None:
+        # Drop everything memoised if the file changed since it was read
+        if self.path is None:
+            return
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self._data = None
+            self._sections = {}
+            self._rendered = {}
+
+    def _is_streaming(self) -> bool:
+        if self.streaming is not None:
+            return self.streaming
+        return self._stamp[1] > STREAMING_THRESHOLD_BYTES
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """The complete case dict."""
+        with self._lock:
+            self._check()
+            if self._data is None:
+                if self._is_streaming():
+                    self._data = dict(_iter_json_object(self.path))
+                else:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._data = json.load(f)
+                self._sections.update(self._data)
+            return self._data
+
+    def section(self, name: str) -> Any:
+        """One top-level section; in streaming mode only that section is decoded."""
+        with self._lock:
+            self._check()
+            if name not in self._sections:
+                if self._data is None and self._is_streaming():
+                    self._sections[name] = dict(_iter_json_object(self.path, name))
+                else:
+                    self._sections[name] = self.data[name]
+            return self._sections[name]
+
+    def items(self, name: str) -> Iterator[Tuple[str, Any]]:
+        """Iterate a section's entries; streams from disk when the section is not loaded."""
+        with self._lock:
+            self._check()
+            cached = self._sections.get(name)
+            streaming = cached is None and self._data is None and self._is_streaming()
+        if streaming:
+            return _iter_json_object(self.path, name)
+        return iter(self.section(name).items())
+
+    def text(self, name: str) -> str:
+        """Formatted text for 'audio_transcripts', 'documents' or 'final_clues' (memoised)."""
+        with self._lock:
+            self._check()
+            if name not in self._rendered:
+                self._rendered[name] = _RENDERERS[name](self.items(name))
+            return self._rendered[name]
+
+    @property
+    def metadata(self) -> Dict[str, str]:
+        return self.section("case_metadata")
+
+    @property
+    def audio_text(self) -> str:
+        return self.text("audio_transcripts")
+
+    @property
+    def documents_text(self) -> str:
+        return self.text("documents")
+
+    @property
+    def clues_text(self) -> str:
+        return self.text("final_clues")
+
+    @property
+    def combined_text(self) -> str:
+        """Metadata plus every section, as returned by `get_all_text_combined`."""
+        with self._lock:
+            self._check()
+            if "combined" not in self._rendered:
+                sections = []
+                sections.append("=" * 80)
+                sections.append("CASE FILE - COMPLETE")
+                sections.append("=" * 80)
+                sections.append("")
+                sections.append("CASE METADATA:")
+                for key, value in self.metadata.items():
+                    sections.append(f"  {key}: {value}")
+                sections.append("")
+                sections.append("")
+                sections.append(self.audio_text)
+                sections.append("\n\n")
+                sections.append(self.documents_text)
+                sections.append("\n\n")
+                sections.append(self.clues_text)
+                self._rendered["combined"] = "\n".join(sections)
+            return self._rendered["combined"]
+
+
+_case_files: Dict[Path, CaseFile] = {}
+_case_files_lock = threading.Lock()
+
+
+def open_case(filepath: str = DEFAULT_CASE_FILE) -> CaseFile:
+    """
+    Return the shared CaseFile for `filepath` (one per resolved path).
+
+    Args:
+        filepath: Path to the JSON file
+
+    Returns:
+        CaseFile that parses the file once and re-reads it only after it changes
+    """
+    path = _resolve_path(filepath).resolve()
+    with _case_files_lock:
+        case = _case_files.get(path)
+        if case is None:
+            case = _case_files[path] = CaseFile(str(path))
+        return case
+
+
+def load_case_data(filepath: str = DEFAULT_CASE_FILE) -> Dict[str, Any]:
+    """
+    Load the complete case data from JSON file.
+    
+    The file is parsed once and cached until it changes on disk; the returned
+    dict is shared, so copy it before mutating.
+    
+    Args:
+        filepath: Path to the JSON file (default: detective_test_data.json)
+    
+    Returns:
+        Dictionary containing all case data
+    """
+    return open_case(filepath).data
+
+
+def get_audio_text(filepath: str = DEFAULT_CASE_FILE) -> str:
+    """
+    Extract and format all audio transcripts into a single text string.
     
     Args:
         filepath: Path to the JSON file
     
     Returns:
-        Complete case file as formatted text
+        Formatted string containing all audio interview transcripts
+    """
+    return open_case(filepath).audio_text
+
+
+def get_documents_text(filepath: str = DEFAULT_CASE_FILE) -> str:
     """
-    sections = []
+    Extract and format all document texts into a single string.
     
-    # Add case metadata
-    data = load_case_data(filepath)
-    sections.append("=" * 80)
-    sections.append("CASE FILE - COMPLETE")
-    sections.append("=" * 80)
-    sections.append("")
-    sections.append("CASE METADATA:")
-    for key, value in data["case_metadata"].items():
-        sections.append(f"  {key}: {value}")
-    sections.append("")
-    sections.append("")
+    Args:
+        filepath: Path to the JSON file
     
-    # Add all sections
-    sections.append(get_audio_text(filepath))
-    sections.append("\n\n")
-    sections.append(get_documents_text(filepath))
-    sections.append("\n\n")
-    sections.append(get_clues_text(filepath))
+    Returns:
+        Formatted string containing all document contents
+    """
+    return open_case(filepath).documents_text
+
+
+def get_clues_text(filepath: str = DEFAULT_CASE_FILE) -> str:
+    """
+    Extract and format all final clues into a single string.
+    
+    Args:
+        filepath: Path to the JSON file
     
-    return "\n".join(sections)
+    Returns:
+        Formatted string containing all final clues
+    """
+    return open_case(filepath).clues_text
 
 
-def get_case_metadata(filepath: str = "detective_test_data.json") -> Dict[str, str]:
+def get_all_text_combined(filepath: str = DEFAULT_CASE_FILE) -> str:
+    """
+    Get all case data (audio, documents, clues) as one combined text.
+    
+    Args:
+        filepath: Path to the JSON file
+    
+    Returns:
+        Complete case file as formatted text
+    """
+    return open_case(filepath).combined_text
+
+
+def get_case_metadata(filepath: str = DEFAULT_CASE_FILE) -> Dict[str, str]:
     """
     Get just the case metadata.
     
@@ -180,8 +535,99 @@ def get_case_metadata(filepath: str = "detective_test_data.json") -> Dict[str, s
     Returns:
         Dictionary with case metadata
     """
-    data = load_case_data(filepath)
-    return data["case_metadata"]
+    return open_case(filepath).metadata
+
+
+def load_transcript_segments(filepath: str, min_avg_logprob: float = MIN_AVG_LOGPROB,
+                             max_no_speech_prob: float = MAX_NO_SPEECH_PROB) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Load a segment-level transcript (.segments.jsonl) written by THE EAR.
+    
+    Segments Whisper was unsure about (avg_logprob below `min_avg_logprob`) or
+    that are probably silence (no_speech_prob above `max_no_speech_prob`) are
+    dropped here, before they cost any LLM tokens.
+    
+    Args:
+        filepath: Path to the .segments.jsonl file
+        min_avg_logprob: Lowest average log-probability kept (None keeps all)
+        max_no_speech_prob: Highest no-speech probability kept (None keeps all)
+    
+    Returns:
+        (header, segments): the header dict (source, recorded, model, task, language,
+        audio_seconds, plus the number of "skipped" segments) and the kept
+        segment dicts (start, end, text, avg_logprob, no_speech_prob, language)
+        sorted by start time
+    """
+    with open(filepath, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        segments = []
+        skipped = 0
+        for line in f:
+            if not line.strip():
+                continue
+            segment = json.loads(line)
+            if (min_avg_logprob is not None and segment.get("avg_logprob", 0.0) < min_avg_logprob) or \
+                    (max_no_speech_prob is not None and segment.get("no_speech_prob", 0.0) > max_no_speech_prob) or \
+                    not segment.get("text"):
+                skipped += 1
+                continue
+            segments.append(segment)
+
+    segments.sort(key=lambda s: s["start"])
+    header["skipped"] = skipped
+    return header, segments
+
+
+class SegmentTimeIndex:
+    """Time index over transcript segments: which segments overlap a window of the recording."""
+
+    def __init__(self, segments: List[Dict[str, Any]]):
+        self.segments = sorted(segments, key=lambda s: s["start"])
+        self._starts = [s["start"] for s in self.segments]
+        self._max_len = max((s["end"] - s["start"] for s in self.segments), default=0.0)
+
+    def between(self, start: float, end: float) -> List[Dict[str, Any]]:
+        """Segments overlapping [start, end] seconds into the recording, in order."""
+        lo = bisect_right(self._starts, start - self._max_len) - 1
+        hi = bisect_right(self._starts, end)
+        return [s for s in self.segments[max(lo, 0):hi] if s["end"] >= start]
+
+
+def format_offset(seconds: float) -> str:
+    """Offset into a recording as "t+MM:SS", so it is not mistaken for a clock time."""
+    minutes, secs = divmod(int(seconds), 60)
+    return f"t+{minutes:02d}:{secs:02d}"
+
+
+def get_transcripts_text(directory: str = TRANSCRIPT_DIR, min_avg_logprob: float = MIN_AVG_LOGPROB,
+                         max_no_speech_prob: float = MAX_NO_SPEECH_PROB) -> str:
+    """
+    Format every segment-level transcript in `directory` like `get_audio_text`.
+    
+    Each kept segment becomes one line prefixed with its offset into the
+    recording ("[t+MM:SS]"), so the text can replace the case file's
+    audio_transcripts as CLAIMS input.
+    
+    Args:
+        directory: Folder holding THE EAR's .segments.jsonl files
+        min_avg_logprob: Passed to load_transcript_segments
+        max_no_speech_prob: Passed to load_transcript_segments
+    
+    Returns:
+        Formatted string containing all interview transcripts
+    """
+    interviews = []
+    for path in sorted(Path(directory).glob(f"*{SEGMENTS_SUFFIX}")):
+        header, segments = load_transcript_segments(str(path), min_avg_logprob, max_no_speech_prob)
+        interview = {
+            "timestamp": header.get("recorded") or "N/A",
+            "duration": f"{header.get('audio_seconds', 0.0):.0f}s ({header.get('language', 'unknown')})",
+            "transcript": "\n".join(f"[{format_offset(s['start'])}] {s['text']}" for s in segments),
+        }
+        if header["skipped"]:
+            interview["notes"] = f"{header['skipped']} low-confidence or silent segments omitted"
+        interviews.append((Path(header.get("source", path.name)).stem, interview))
+    return _render_audio(interviews)
 
 
 def print_data_statistics(filepath: str = "detective_test_data.json") -> None:
@@ -191,7 +637,8 @@ def print_data_statistics(filepath: str = "detective_test_data.json") -> None:
     Args:
         filepath: Path to the JSON file
     """
-    data = load_case_data(filepath)
+    case = open_case(filepath)
+    data = case.data
     
     print("=" * 60)
     print("DETECTIVE TEST DATA STATISTICS")
@@ -201,9 +648,9 @@ def print_data_statistics(filepath: str = "detective_test_data.json") -> None:
     print(f"Number of final clues: {len(data['final_clues'])}")
     print()
     
-    audio_text = get_audio_text(filepath)
-    docs_text = get_documents_text(filepath)
-    clues_text = get_clues_text(filepath)
+    audio_text = case.audio_text
+    docs_text = case.documents_text
+    clues_text = case.clues_text
     
     print(f"Total audio text length: {len(audio_text):,} characters")
     print(f"Total documents text length: {len(docs_text):,} characters")
@@ -211,7 +658,7 @@ def print_data_statistics(filepath: str = "detective_test_data.json") -> None:
     print(f"TOTAL DATA SIZE: {len(audio_text) + len(docs_text) + len(clues_text):,} characters")
     print()
     
-    all_text = get_all_text_combined(filepath)
+    all_text = case.combined_text
     word_count = len(all_text.split())
     print(f"Approximate word count: {word_count:,} words")
     print(f"Estimated tokens (rough): {int(word_count * 1.3):,} tokens")
@@ -1,89 +1,398 @@
 """Core forensic analysis engine."""
 
+import asyncio
 import json
 import logging
+from typing import Optional
 
-from utils import build_chain, split_text_into_chunks, process_chunk_in_parallel
+from utils import (
+    build_chain, split_text_into_chunks, split_into_record_chunks, count_tokens, process_chunk_in_parallel,
+    aprocess_chunks, aprocess_chunk_stream, accumulate_chunks, aretry, run_sync, CALL_STAGE
+)
 from prompts import (
-    EXTRACTION_SYSTEM_PROMPT, EXTRACTION_TEMPLATE,
-    TIMELINE_SYSTEM_PROMPT, TIMELINE_TEMPLATE,
-    CONTRADICTION_SYSTEM_PROMPT, CONTRADICTION_TEMPLATE,
-    VERDICT_SYSTEM_PROMPT, VERDICT_TEMPLATE
+    EXTRACTION_SYSTEM_PROMPT, EXTRACTION_TEMPLATE, EXTRACTION_CONTINUE_NOTE,
+    TIMELINE_SYSTEM_PROMPT, TIMELINE_TEMPLATE, TIMELINE_WINDOW_TEMPLATE,
+    CONTRADICTION_SYSTEM_PROMPT, CONTRADICTION_TEMPLATE, CONTRADICTION_CANDIDATES_TEMPLATE,
+    VERDICT_SYSTEM_PROMPT, VERDICT_TEMPLATE,
+    SUSPECT_VERDICT_SYSTEM_PROMPT, SUSPECT_VERDICT_TEMPLATE, VERDICT_MERGE_SYSTEM_PROMPT, VERDICT_MERGE_TEMPLATE,
+    VERDICT_DRAFT_TEMPLATE, VERDICT_RECONCILE_SYSTEM_PROMPT, VERDICT_RECONCILE_TEMPLATE
+)
+from config import (
+    get_smart_llm, get_fast_llm, EXTRACTION_CONFIG, MERGE_CONFIG, CACHE_CONFIG, TIMELINE_CONFIG,
+    CONTRADICTION_CONFIG, VERDICT_CONFIG
 )
-from config import SMART_LLM, FAST_LLM, EXTRACTION_CONFIG
+from timeline import build_timeline, split_timeline_windows
+from contradictions import find_candidate_contradictions, render_candidates
+from merge import merge_chunk_items
+from events import EventTable
+from retrieval import EvidenceIndex, evidence_passages, identify_suspects, suspect_packet
+from streaming import StreamSink, astream_chain, emit_text
+from tracing import TRACER
+from cache import ExtractionCache, ArtifactStore, make_cache_key
+from hedging import HedgePolicy
 
 logger = logging.getLogger(__name__)
 
+# PrioritySemaphore stage of each post-extraction phase (extraction is CALL_STAGE's default, 3)
+PHASE_STAGES = {"timeline": 2, "contradictions": 1, "verdict draft": 1, "verdict": 0}
+
+
+def open_extraction_cache() -> ExtractionCache:
+    """Open the on-disk extraction cache described by CACHE_CONFIG."""
+    return ExtractionCache(CACHE_CONFIG["path"], CACHE_CONFIG["max_entries"])
+
+
+def open_artifact_store() -> ArtifactStore:
+    """Open the on-disk store of timeline/contradiction/verdict artifacts."""
+    return ArtifactStore(CACHE_CONFIG["artifact_path"], CACHE_CONFIG["max_entries"])
+
+
+def _model_name(llm) -> str:
+    """Best-effort model identifier for cache keys."""
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+
+def _extraction_chain(data_type: str):
+    """Build the extraction chain, input mapping and cache namespace for `data_type`."""
+    chain = build_chain(EXTRACTION_SYSTEM_PROMPT, EXTRACTION_TEMPLATE, get_smart_llm())
+    input_mapping = {"text": lambda chunk: chunk, "dtype": data_type}
+    namespace = (data_type, EXTRACTION_SYSTEM_PROMPT, EXTRACTION_TEMPLATE, _model_name(get_smart_llm()))
+    return chain, input_mapping, namespace
+
+
+def _extraction_parsing(data_type: str) -> dict:
+    """Keyword arguments selecting how chunk answers are parsed and repaired, per EXTRACTION_CONFIG."""
+    if not EXTRACTION_CONFIG["salvage"]:
+        return {}
+    # Imported here: pydantic is only needed once extraction actually runs
+    from structured import parse_extraction
+
+    def parse(text):
+        return parse_extraction(text, data_type)
 
-def extract_structured_data(raw_text: str, data_type: str) -> str:
+    def reask(chunk_text, items):
+        return chunk_text + EXTRACTION_CONTINUE_NOTE.format(
+            count=len(items), last=json.dumps(items[-1], ensure_ascii=False)
+        )
+
+    return {"parse": parse, "reask": reask if EXTRACTION_CONFIG["reask_tail"] else None}
+
+
+def new_hedge_policy() -> Optional[HedgePolicy]:
+    """A fresh hedging policy per EXTRACTION_CONFIG, or None when hedging is off."""
+    if not EXTRACTION_CONFIG["hedge"]:
+        return None
+    return HedgePolicy(EXTRACTION_CONFIG["hedge_percentile"], EXTRACTION_CONFIG["hedge_budget"],
+                       EXTRACTION_CONFIG["hedge_min_samples"])
+
+
+def _call_limits(hedge: HedgePolicy = None) -> dict:
+    """
+    Keyword arguments for the per-call deadline and hedging policy of chunk calls.
+
+    `hedge` is the policy of the current run, so latency history and the
+    hedging budget are shared by its phases but not across runs; without
+    one, a fresh policy is made per EXTRACTION_CONFIG.
+    """
+    limits = {"deadline": EXTRACTION_CONFIG["call_timeout"]}
+    if hedge is None:
+        hedge = new_hedge_policy()
+    if hedge is not None:
+        limits["hedge"] = hedge
+    return limits
+
+
+def _merge_extracted(per_chunk: list, chunks: list) -> list:
+    """Combine per-chunk extraction results in chunk order, de-duplicating if MERGE_CONFIG allows."""
+    if not MERGE_CONFIG["dedupe"]:
+        return [item for items in per_chunk for item in items]
+    merged = merge_chunk_items(per_chunk, chunks, MERGE_CONFIG["action_similarity"],
+                               MERGE_CONFIG["provenance"])
+    logger.info("Merged %d extracted items into %d", sum(len(items) for items in per_chunk), len(merged))
+    return merged
+
+
+def _prepare_extraction(raw_text: str, data_type: str):
+    """Split text and build the extraction chain, input mapping and cache namespace."""
+    # Split into chunks
+    if EXTRACTION_CONFIG["chunk_tokens"]:
+        logger.info("Processing %s (chunk_tokens=%s)...", data_type, EXTRACTION_CONFIG["chunk_tokens"])
+        chunks = split_into_record_chunks(
+            raw_text,
+            EXTRACTION_CONFIG["chunk_tokens"],
+            EXTRACTION_CONFIG["overlap_tokens"],
+            EXTRACTION_CONFIG["separators"]
+        )
+    else:
+        logger.info("Processing %s (chunk_size=%s)...", data_type, EXTRACTION_CONFIG["chunk_size"])
+        chunks = split_text_into_chunks(
+            raw_text,
+            EXTRACTION_CONFIG["chunk_size"],
+            EXTRACTION_CONFIG["chunk_overlap"],
+            EXTRACTION_CONFIG["separators"]
+        )
+    logger.info("Split into %d chunks", len(chunks))
+
+    chain, input_mapping, namespace = _extraction_chain(data_type)
+    return chunks, chain, input_mapping, namespace
+
+
+def extract_structured_data(raw_text: str, data_type: str, cache: ExtractionCache = None) -> EventTable:
     """
     Extract structured forensic data from raw text using parallel chunk processing.
     
     Args:
         raw_text: Full text to extract from
         data_type: 'FACTS' or 'CLAIMS'
+        cache: Optional ExtractionCache; unchanged chunks are served from it
     
     Returns:
-        JSON string of extracted items
+        EventTable of extracted items
     """
-    logger.info("Processing %s (chunk_size=%s)...", data_type, EXTRACTION_CONFIG["chunk_size"])
+    phase = f"extract {data_type}"
+    with TRACER.span(phase, "phase") as span:
+        chunks, chain, input_mapping, namespace = _prepare_extraction(raw_text, data_type)
+
+        # Process chunks in parallel
+        all_extracted = process_chunk_in_parallel(
+            chunks,
+            chain,
+            input_mapping,
+            EXTRACTION_CONFIG["max_workers"],
+            EXTRACTION_CONFIG["retries"],
+            cache=cache,
+            cache_namespace=namespace,
+            trace_phase=phase,
+            merge=_merge_extracted,
+            **_extraction_parsing(data_type),
+            **_call_limits()
+        )
+        span.set(chunks=len(chunks), items=len(all_extracted))
+
+    logger.info("Total Extracted Items: %d", len(all_extracted))
+    return EventTable.from_items(all_extracted, data_type)
+
+
+async def aextract_structured_data(raw_text: str, data_type: str, semaphore: asyncio.Semaphore = None,
+                                   cache: ExtractionCache = None, hedge: HedgePolicy = None) -> EventTable:
+    """
+    Async variant of extract_structured_data built on `chain.ainvoke`.
+    
+    Args:
+        raw_text: Full text to extract from
+        data_type: 'FACTS' or 'CLAIMS'
+        semaphore: Shared concurrency limit (default: a fresh one sized by EXTRACTION_CONFIG["max_workers"])
+        cache: Optional ExtractionCache; unchanged chunks are served from it
+        hedge: Hedging policy of the run (default: a fresh one, see new_hedge_policy)
+    
+    Returns:
+        EventTable of extracted items
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(EXTRACTION_CONFIG["max_workers"])
+
+    phase = f"extract {data_type}"
+    with TRACER.span(phase, "phase", tid=phase) as span:
+        chunks, chain, input_mapping, namespace = _prepare_extraction(raw_text, data_type)
+
+        all_extracted = await aprocess_chunks(
+            chunks,
+            chain,
+            input_mapping,
+            semaphore,
+            EXTRACTION_CONFIG["retries"],
+            cache=cache,
+            cache_namespace=namespace,
+            trace_phase=phase,
+            merge=_merge_extracted,
+            **_extraction_parsing(data_type),
+            **_call_limits(hedge)
+        )
+        span.set(chunks=len(chunks), items=len(all_extracted))
+
+    logger.info("Total Extracted %s Items: %d", data_type, len(all_extracted))
+    return EventTable.from_items(all_extracted, data_type)
 
-    # Split into chunks
-    chunks = split_text_into_chunks(
-        raw_text,
-        EXTRACTION_CONFIG["chunk_size"],
-        EXTRACTION_CONFIG["chunk_overlap"],
-        EXTRACTION_CONFIG["separators"]
-    )
-    logger.info("Split into %d chunks", len(chunks))
 
-    # Build extraction chain
-    chain = build_chain(EXTRACTION_SYSTEM_PROMPT, EXTRACTION_TEMPLATE, SMART_LLM)
+async def aextract_structured_stream(segments, data_type: str = "CLAIMS",
+                                     semaphore: asyncio.Semaphore = None,
+                                     cache: ExtractionCache = None, hedge: HedgePolicy = None) -> EventTable:
+    """
+    Extract structured data from text that arrives incrementally, e.g. live
+    transcript segments from a SegmentQueue.
 
-    # Process chunks in parallel
-    all_extracted = process_chunk_in_parallel(
-        chunks,
-        chain,
-        {"text": lambda chunk: chunk, "dtype": data_type},
-        EXTRACTION_CONFIG["max_workers"],
-        EXTRACTION_CONFIG["retries"]
+    A chunk is dispatched whenever EXTRACTION_CONFIG["chunk_tokens"] tokens
+    have accumulated, so LLM calls overlap with transcription instead of
+    waiting for it to finish. Chunks keep each segment's "[t+MM:SS]" offset
+    and open with its recording's "INTERVIEW: ..." header, as the batch
+    transcript text does.
+    
+    Args:
+        segments: Async iterable of strings or {"text", "start", "end", "source"} dicts
+        data_type: 'FACTS' or 'CLAIMS'
+        semaphore: Shared concurrency limit (default: a fresh one sized by EXTRACTION_CONFIG["max_workers"])
+        cache: Optional ExtractionCache; unchanged chunks are served from it
+        hedge: Hedging policy of the run (default: a fresh one, see new_hedge_policy)
+    
+    Returns:
+        EventTable of extracted items, in chunk order
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(EXTRACTION_CONFIG["max_workers"])
+
+    phase = f"extract {data_type}"
+    if EXTRACTION_CONFIG["chunk_tokens"]:
+        budget, length_function = EXTRACTION_CONFIG["chunk_tokens"], count_tokens
+    else:
+        budget, length_function = EXTRACTION_CONFIG["chunk_size"], len
+    logger.info("Processing %s from stream (chunk budget %s)...", data_type, budget)
+    with TRACER.span(phase, "phase", tid=phase, streamed=True) as span:
+        chain, input_mapping, namespace = _extraction_chain(data_type)
+        chunks = accumulate_chunks(segments, budget, EXTRACTION_CONFIG["stream_overlap_segments"],
+                                   length_function)
+
+        all_extracted = await aprocess_chunk_stream(
+            chunks,
+            chain,
+            input_mapping,
+            semaphore,
+            EXTRACTION_CONFIG["retries"],
+            cache=cache,
+            cache_namespace=namespace,
+            trace_phase=phase,
+            merge=_merge_extracted,
+            **_extraction_parsing(data_type),
+            **_call_limits(hedge)
+        )
+        span.set(items=len(all_extracted))
+
+    logger.info("Total Extracted %s Items: %d", data_type, len(all_extracted))
+    return EventTable.from_items(all_extracted, data_type)
+
+
+def _merge_timeline(facts, claims, critical_window: str = None) -> str:
+    """Deterministically merge extracted events into the master timeline text."""
+    timeline = build_timeline(
+        EventTable.coerce(facts),
+        EventTable.coerce(claims),
+        gap_minutes=TIMELINE_CONFIG["gap_minutes"],
+        critical_window=critical_window
     )
+    logger.info("Merged timeline: %d lines", timeline.count("\n") + 1)
+    return timeline
 
-    logger.info("Total Extracted Items: %d", len(all_extracted))
-    return json.dumps(all_extracted, indent=2)
 
+def _timeline_windows(timeline: str):
+    """
+    Plan the phrasing calls for `timeline` from its token count.
+
+    Returns:
+        (window texts, gaps section); a single window means one call over the whole timeline
+    """
+    windows, gaps = split_timeline_windows(timeline, TIMELINE_CONFIG["window_tokens"], count_tokens)
+    if len(windows) > 1:
+        logger.info("Timeline: phrasing %d time windows in parallel", len(windows))
+    return windows, gaps
+
+
+def _window_inputs(windows: list) -> list:
+    return [{"timeline": window, "part": n, "parts": len(windows)} for n, window in enumerate(windows, 1)]
 
-def create_timeline(facts: str, claims: str) -> str:
+
+def _join_windows(parts: list, gaps: str) -> str:
+    """Reduce step: windows are disjoint and time-ordered, so they join in order; gaps stay deterministic."""
+    return "\n".join(part.strip() for part in parts) + "\n\n" + gaps
+
+
+def create_timeline(facts: EventTable, claims: EventTable, critical_window: str = None) -> str:
     """
     Merge facts and claims into a chronological timeline.
+
+    Sorting, time normalisation, de-duplication and gap detection are done in
+    pure Python; FAST_LLM only rephrases the result if
+    TIMELINE_CONFIG["phrase_with_llm"] is set, one call per time window of
+    up to TIMELINE_CONFIG["window_tokens"] tokens.
     
     Args:
-        facts: JSON string of facts
-        claims: JSON string of claims
+        facts: EventTable of facts (a JSON string of extracted items also works)
+        claims: EventTable of claims (a JSON string of extracted items also works)
+        critical_window: Optional time string (e.g. time of death); gaps overlapping it are EXTREME
     
     Returns:
         Timeline as a formatted string
     """
     logger.info("Constructing Master Timeline...")
-    
-    chain = build_chain(TIMELINE_SYSTEM_PROMPT, TIMELINE_TEMPLATE, FAST_LLM)
-    return chain.invoke({"facts": facts, "claims": claims})
 
+    with TRACER.span("timeline", "phase") as span:
+        timeline = _merge_timeline(facts, claims, critical_window)
+        if not TIMELINE_CONFIG["phrase_with_llm"]:
+            return timeline
+
+        windows, gaps = _timeline_windows(timeline)
+        if len(windows) <= 1:
+            chain = build_chain(TIMELINE_SYSTEM_PROMPT, TIMELINE_TEMPLATE, get_fast_llm())
+            return chain.invoke({"timeline": timeline}, config={"callbacks": span.callbacks()})
 
-def find_contradictions(timeline: str) -> str:
+        chain = build_chain(TIMELINE_SYSTEM_PROMPT, TIMELINE_WINDOW_TEMPLATE, get_fast_llm())
+        parts = chain.batch(_window_inputs(windows), config={
+            "callbacks": span.callbacks(), "max_concurrency": EXTRACTION_CONFIG["max_workers"]
+        })
+        return _join_windows(parts, gaps)
+
+
+NO_CONTRADICTIONS = "No contradictions found: no CLAIM conflicts with a FACT on location at the same time."
+
+
+def _contradiction_request(timeline: str, facts: EventTable = None, claims: EventTable = None,
+                           critical_window: str = None):
+    """
+    Choose what the contradiction pass sends to SMART_LLM.
+
+    With the pre-filter on and structured items available, only the ranked
+    candidate conflicts are sent; otherwise the full timeline is.
+
+    Returns:
+        (template, inputs), or (None, None) if the pre-filter found nothing to score
+    """
+    if not CONTRADICTION_CONFIG["prefilter"] or facts is None or claims is None:
+        return CONTRADICTION_TEMPLATE, {"timeline": timeline}
+
+    candidates = find_candidate_contradictions(
+        EventTable.coerce(facts),
+        EventTable.coerce(claims),
+        tolerance_minutes=CONTRADICTION_CONFIG["tolerance_minutes"],
+        critical_window=critical_window,
+        max_candidates=CONTRADICTION_CONFIG["max_candidates"]
+    )
+    logger.info("Pre-filter found %d candidate contradictions", len(candidates))
+    if not candidates:
+        return None, None
+    return CONTRADICTION_CANDIDATES_TEMPLATE, {"candidates": render_candidates(candidates)}
+
+
+def find_contradictions(timeline: str, facts: EventTable = None, claims: EventTable = None,
+                        critical_window: str = None) -> str:
     """
     Analyze timeline for lies and contradictions.
     
     Args:
         timeline: Formatted timeline string
+        facts: Optional EventTable of facts; enables the rule-based pre-filter
+        claims: Optional EventTable of claims; enables the rule-based pre-filter
+        critical_window: Optional time string (e.g. time of death); conflicts inside it rank first
     
     Returns:
         Analysis of contradictions found
     """
     logger.info("Detecting inconsistencies...")
-    
-    chain = build_chain(CONTRADICTION_SYSTEM_PROMPT, CONTRADICTION_TEMPLATE, SMART_LLM)
-    return chain.invoke({"timeline": timeline})
+
+    with TRACER.span("contradictions", "phase") as span:
+        template, inputs = _contradiction_request(timeline, facts, claims, critical_window)
+        if template is None:
+            return NO_CONTRADICTIONS
+
+        chain = build_chain(CONTRADICTION_SYSTEM_PROMPT, template, get_smart_llm())
+        return chain.invoke(inputs, config={"callbacks": span.callbacks()})
 
 
 def get_final_verdict(contradictions: str, clues: str, timeline: str) -> str:
@@ -100,43 +409,519 @@ def get_final_verdict(contradictions: str, clues: str, timeline: str) -> str:
     """
     logger.info("Delivering final verdict...")
     
-    chain = build_chain(VERDICT_SYSTEM_PROMPT, VERDICT_TEMPLATE, SMART_LLM)
-    return chain.invoke({
+    with TRACER.span("verdict", "phase") as span:
+        chain = build_chain(VERDICT_SYSTEM_PROMPT, VERDICT_TEMPLATE, get_smart_llm())
+        return chain.invoke({
+            "contradictions": contradictions,
+            "clues": clues,
+            "timeline": timeline
+        }, config={"callbacks": span.callbacks()})
+
+
+async def _ainvoke(chain, inputs: dict, phase: str, sink: StreamSink = None, lane: str = None,
+                   semaphore=None) -> str:
+    """
+    Invoke a chain inside a trace span, streaming its tokens into `sink` when one is given.
+
+    Failed calls are retried with backoff (EXTRACTION_CONFIG["retries"] attempts),
+    each attempt taking a `semaphore` slot, unless part of the answer was already
+    streamed. Concurrent calls of one phase pass distinct `lane` names so their
+    spans do not overlap in the trace viewer.
+    """
+    lane = lane or phase
+    with TRACER.span(f"{lane} call", "llm", tid=lane, phase=phase) as span:
+        config = {"callbacks": span.callbacks()}
+
+        async def attempt():
+            if sink is None:
+                return await chain.ainvoke(inputs, config=config)
+            return await astream_chain(chain, inputs, phase, sink, config)
+
+        return await aretry(lambda: _alimited(semaphore, attempt), EXTRACTION_CONFIG["retries"], span,
+                            lambda: sink is None or not sink.metrics.get(phase, {}).get("chars"))
+
+
+async def _alimited(semaphore, call):
+    """Await `call()` holding a `semaphore` slot, if there is one."""
+    if semaphore is None:
+        return await call()
+    async with semaphore:
+        return await call()
+
+
+async def acreate_timeline(facts: EventTable, claims: EventTable, critical_window: str = None,
+                           sink: StreamSink = None, semaphore=None) -> str:
+    """
+    Async variant of create_timeline; streams into `sink` if given.
+
+    Time windows are phrased concurrently, each call taking a `semaphore`
+    slot, and streamed in time order.
+    """
+    logger.info("Constructing Master Timeline...")
+
+    timeline = _merge_timeline(facts, claims, critical_window)
+    if not TIMELINE_CONFIG["phrase_with_llm"]:
+        return timeline if sink is None else emit_text(timeline, "timeline", sink)
+
+    windows, gaps = _timeline_windows(timeline)
+    if len(windows) <= 1:
+        chain = build_chain(TIMELINE_SYSTEM_PROMPT, TIMELINE_TEMPLATE, get_fast_llm())
+        return await _ainvoke(chain, {"timeline": timeline}, "timeline", sink, semaphore=semaphore)
+
+    chain = build_chain(TIMELINE_SYSTEM_PROMPT, TIMELINE_WINDOW_TEMPLATE, get_fast_llm())
+    tasks = [
+        asyncio.ensure_future(_ainvoke(
+            chain, inputs, "timeline", lane=f"timeline {inputs['part']}", semaphore=semaphore
+        ))
+        for inputs in _window_inputs(windows)
+    ]
+    if sink is not None:
+        sink.begin("timeline")
+    try:
+        parts = []
+        for task in tasks:
+            parts.append(await task)
+            if sink is not None:
+                sink.feed("timeline", parts[-1].strip() + "\n")
+        if sink is not None:
+            sink.feed("timeline", "\n" + gaps)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if sink is not None:
+            sink.end("timeline")
+    return _join_windows(parts, gaps)
+
+
+async def afind_contradictions(timeline: str, facts: EventTable = None, claims: EventTable = None,
+                               critical_window: str = None, sink: StreamSink = None) -> str:
+    """Async variant of find_contradictions; streams into `sink` if given."""
+    logger.info("Detecting inconsistencies...")
+
+    template, inputs = _contradiction_request(timeline, facts, claims, critical_window)
+    if template is None:
+        return NO_CONTRADICTIONS if sink is None else emit_text(NO_CONTRADICTIONS, "contradictions", sink)
+
+    chain = build_chain(CONTRADICTION_SYSTEM_PROMPT, template, get_smart_llm())
+    return await _ainvoke(chain, inputs, "contradictions", sink)
+
+
+def build_suspect_packets(facts: EventTable, claims: EventTable, doc_text: str, audio_text: str,
+                          clue_text: str, contradictions: str, victim: str = None,
+                          index_path=None) -> dict:
+    """
+    Build one evidence packet per suspect from a local BM25 index of the case.
+
+    Args:
+        facts: Extracted FACTS
+        claims: Extracted CLAIMS
+        doc_text: Formatted documents, indexed in passages
+        audio_text: Formatted transcripts, indexed in passages
+        clue_text: Formatted clues, indexed in passages
+        contradictions: Output of the contradiction phase, indexed per block
+        victim: Victim's name, excluded from the suspects
+        index_path: On-disk index location (None: in memory)
+
+    Returns:
+        {suspect name: packet text}, in suspect order; empty if no suspects were found
+    """
+    events = EventTable.coerce(facts) + EventTable.coerce(claims)
+    suspects = identify_suspects(events, victim, VERDICT_CONFIG["max_suspects"])
+    if not suspects:
+        return {}
+
+    passages = evidence_passages(doc_text, audio_text, clue_text, contradictions, events,
+                                 VERDICT_CONFIG["passage_tokens"])
+    corpus = make_cache_key(*(f"{p.kind}\n{p.ref}\n{p.text}" for p in passages))
+    index = EvidenceIndex(index_path)
+    try:
+        index.build(corpus, passages)
+        packets = {
+            suspect: suspect_packet(index, corpus, suspect, events, VERDICT_CONFIG["events_per_suspect"],
+                                    VERDICT_CONFIG["passages_per_suspect"])
+            for suspect in suspects
+        }
+    finally:
+        index.close()
+    logger.info("Built evidence packets for %d suspects: %s", len(packets), ", ".join(packets))
+    return packets
+
+
+def _case_summary(victim: str = None, critical_window: str = None) -> str:
+    return f"Victim: {victim or 'Unknown'}. Time of death: {critical_window or 'Unknown'}."
+
+
+async def _aassess_suspects(packets: dict, case: str, phase: str = "verdict", sink: StreamSink = None,
+                            semaphore=None) -> str:
+    """
+    Assess every suspect from their packet concurrently.
+
+    Returns:
+        "SUSPECT ANALYSIS:" followed by the assessments in suspect order; with a
+        `sink` (whose phase has begun), each is fed as soon as it and all before it are done
+    """
+    chain = build_chain(SUSPECT_VERDICT_SYSTEM_PROMPT, SUSPECT_VERDICT_TEMPLATE, get_smart_llm())
+    tasks = [
+        asyncio.ensure_future(_ainvoke(
+            chain, {"case": case, "packet": packet}, phase, lane=f"{phase} {name}", semaphore=semaphore
+        ))
+        for name, packet in packets.items()
+    ]
+    try:
+        assessments = []
+        for task in tasks:
+            assessments.append((await task).strip())
+            if sink is not None:
+                sink.feed(phase, ("SUSPECT ANALYSIS:\n" if len(assessments) == 1 else "")
+                          + assessments[-1] + "\n\n")
+    finally:
+        for task in tasks:
+            task.cancel()
+    return "SUSPECT ANALYSIS:\n" + "\n\n".join(assessments)
+
+
+async def _aconclude(chain, inputs: dict, sink: StreamSink = None, semaphore=None) -> str:
+    """The closing verdict call; streams into the already-begun "verdict" phase of `sink`."""
+    with TRACER.span("verdict conclusion call", "llm", tid="verdict", phase="verdict") as span:
+        config = {"callbacks": span.callbacks()}
+        parts = []
+
+        async def attempt():
+            if sink is None:
+                return await chain.ainvoke(inputs, config=config)
+            async for token in chain.astream(inputs, config=config):
+                parts.append(token)
+                sink.feed("verdict", token)
+            return "".join(parts)
+
+        return await aretry(lambda: _alimited(semaphore, attempt), EXTRACTION_CONFIG["retries"], span,
+                            lambda: not parts)
+
+
+async def _averdict_per_suspect(packets: dict, case: str, clues: str = "", sink: StreamSink = None,
+                                semaphore=None) -> str:
+    """Assess every suspect concurrently, then compare the assessments (and the clues) in one small call."""
+    merge_chain = build_chain(VERDICT_MERGE_SYSTEM_PROMPT, VERDICT_MERGE_TEMPLATE, get_smart_llm())
+    if sink is not None:
+        sink.begin("verdict")
+    try:
+        analysis = await _aassess_suspects(packets, case, "verdict", sink, semaphore)
+        assessments = analysis.split("\n", 1)[1]
+        conclusion = await _aconclude(merge_chain, {"case": case, "assessments": assessments, "clues": clues}, sink, semaphore)
+    finally:
+        if sink is not None:
+            sink.end("verdict")
+    return f"{analysis}\n\n{conclusion}"
+
+
+async def adraft_verdict(timeline: str, clues: str, packets: dict = None, case: str = "",
+                         semaphore=None) -> str:
+    """
+    Speculative suspect analysis written while the contradiction pass is still running.
+
+    With `packets` (built without contradictions), every suspect is assessed
+    from their own packet concurrently; otherwise one call scores all suspects
+    from the timeline and clues.
+
+    Returns:
+        The "SUSPECT ANALYSIS:" section
+    """
+    logger.info("Drafting suspect analysis...")
+    if packets:
+        return await _aassess_suspects(packets, case, "verdict draft", semaphore=semaphore)
+
+    chain = build_chain(VERDICT_SYSTEM_PROMPT, VERDICT_DRAFT_TEMPLATE, get_smart_llm())
+    return await _ainvoke(chain, {"timeline": timeline, "clues": clues}, "verdict draft", semaphore=semaphore)
+
+
+async def areconcile_verdict(draft: str, contradictions: str, case: str = "", sink: StreamSink = None,
+                             semaphore=None, clues: str = "") -> str:
+    """
+    Merge a speculative draft with the contradiction analysis (and the clues) in one short call.
+
+    The call takes a `semaphore` slot, like every other verdict call.
+
+    Returns:
+        The draft followed by the adjustments and the named killer
+    """
+    logger.info("Reconciling draft verdict with contradictions...")
+    chain = build_chain(VERDICT_RECONCILE_SYSTEM_PROMPT, VERDICT_RECONCILE_TEMPLATE, get_smart_llm())
+    if sink is not None:
+        sink.begin("verdict")
+        sink.feed("verdict", draft.strip() + "\n\n")
+    try:
+        conclusion = await _aconclude(chain, {"case": case, "draft": draft, "contradictions": contradictions,
+                                                  "clues": clues}, sink, semaphore)
+    finally:
+        if sink is not None:
+            sink.end("verdict")
+    return f"{draft.strip()}\n\n{conclusion}"
+
+
+async def aget_final_verdict(contradictions: str, clues: str, timeline: str,
+                             sink: StreamSink = None, packets: dict = None, case: str = "",
+                             semaphore=None) -> str:
+    """
+    Async variant of get_final_verdict; streams into `sink` if given.
+
+    With `packets` (from build_suspect_packets), each suspect is assessed
+    from their own packet concurrently, each call taking a `semaphore` slot,
+    and a final call names the killer from the assessments and clues. Otherwise one
+    prompt gets the whole timeline, contradictions and clues.
+    """
+    logger.info("Delivering final verdict...")
+
+    if packets:
+        return await _averdict_per_suspect(packets, case, clues, sink, semaphore)
+
+    chain = build_chain(VERDICT_SYSTEM_PROMPT, VERDICT_TEMPLATE, get_smart_llm())
+    return await _ainvoke(chain, {
         "contradictions": contradictions,
         "clues": clues,
         "timeline": timeline
-    })
+    }, "verdict", sink)
 
 
-def solve_mystery(audio_text: str, doc_text: str, clue_text: str) -> str:
+async def _run_phase(store: ArtifactStore, name: str, fingerprint: str, compute,
+                     sink: StreamSink = None, semaphore=None, hold_slot: bool = True):
     """
-    Main orchestration function to solve a mystery case.
+    Run a traced phase through the artifact store, or directly when caching is off.
+
+    With a `semaphore`, the computation holds one of its slots at the phase's
+    PHASE_STAGES priority; cached phases never take a slot. Phases that make
+    several calls themselves pass `hold_slot=False` and only get the priority.
+    """
+    if semaphore is not None:
+        unlimited = compute
+
+        async def compute():
+            stage = CALL_STAGE.set(PHASE_STAGES.get(name, CALL_STAGE.get()))
+            try:
+                if not hold_slot:
+                    return await unlimited()
+                async with semaphore:
+                    return await unlimited()
+            finally:
+                CALL_STAGE.reset(stage)
+
+    with TRACER.span(name, "phase", tid=name) as span:
+        if store is None:
+            value = await compute()
+        else:
+            computed = False
+
+            async def _compute():
+                nonlocal computed
+                computed = True
+                return await compute()
+
+            value = await store.aget_or_compute(name, fingerprint, _compute)
+            span.set(cache_hit=not computed)
+            if sink is not None and not computed:
+                emit_text(value, name, sink)
+        span.set(chars=len(value))
+    return value
+
+
+def _log_phase_output(title: str, text: str, sink: StreamSink = None) -> None:
+    """Log a phase's output; when streaming, the sink already showed it, so only log its size."""
+    rule = "-" * (len(title) + 8)
+    if sink is None:
+        logger.info("--- %s ---\n%s\n%s", title, text, rule)
+    else:
+        logger.info("--- %s --- (%d chars streamed)", title, len(text))
+
+
+async def asolve_mystery(audio_text: str, doc_text: str, clue_text: str, use_cache: bool = None,
+                         critical_window: str = None, sink: StreamSink = None, semaphore=None,
+                         audio_stream=None, victim: str = None) -> str:
+    """
+    Async orchestration of a mystery case.
+
+    FACTS and CLAIMS extraction run concurrently on one event loop and share a
+    single concurrency limit (EXTRACTION_CONFIG["max_workers"]), so phase 1
+    takes as long as its slowest chunk rather than the sum of both passes.
+
+    With caching on, the run is incremental: chunks are served from the
+    extraction cache, and the timeline, contradictions and verdict are stored
+    under fingerprints of their inputs. Only phases downstream of a change are
+    re-run; e.g. editing a clue re-runs just the verdict.
+
+    With a `sink`, the timeline, contradiction and verdict phases stream their
+    output as it is generated, and each phase starts as soon as the previous
+    one's output is complete instead of after it has been logged in full.
+
+    With VERDICT_CONFIG["speculative"], a draft suspect analysis is written
+    alongside the contradiction pass, and the verdict phase is one short
+    reconcile call.
     
     Args:
         audio_text: Transcribed audio/witness statements
         doc_text: Document/log data
         clue_text: Additional clues
+        use_cache: Reuse unchanged chunks and artifacts from disk (default: CACHE_CONFIG["enabled"])
+        critical_window: Optional time string (e.g. time of death) used to rank timeline gaps
+        sink: Optional StreamSink receiving phase output token by token
+        semaphore: Concurrency limit shared by every LLM call of the run, e.g. a
+            PrioritySemaphore shared across cases (default: a fresh one sized by
+            EXTRACTION_CONFIG["max_workers"])
+        audio_stream: Optional async iterable of transcript segments (e.g. a
+            SegmentQueue fed by THE EAR); when given, CLAIMS are extracted from
+            it as it arrives and `audio_text` is ignored
+        victim: Optional victim name, excluded from the per-suspect verdict calls
     
     Returns:
         Final verdict string
     """
-    # Phase 1: Extract structured data
-    logger.info("=== PHASE 1: EXTRACTING DATA ===")
-    facts = extract_structured_data(doc_text, "FACTS")
-    claims = extract_structured_data(audio_text, "CLAIMS")
+    if use_cache is None:
+        use_cache = CACHE_CONFIG["enabled"]
+    cache = open_extraction_cache() if use_cache else None
+    store = open_artifact_store() if use_cache else None
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(EXTRACTION_CONFIG["max_workers"])
+    # One hedging policy per run: its latency history and budget cover both extraction phases
+    hedge = new_hedge_policy()
 
-    # Phase 2: Build timeline
-    logger.info("=== PHASE 2: BUILDING TIMELINE ===")
-    master_timeline = create_timeline(facts, claims)
-    logger.info("--- MASTER TIMELINE ---\n%s\n-----------------------", master_timeline)
+    try:
+        # Phase 1: Extract structured data
+        logger.info("=== PHASE 1: EXTRACTING DATA ===")
+        if audio_stream is not None:
+            claims_task = aextract_structured_stream(audio_stream, "CLAIMS", semaphore, cache, hedge)
+        else:
+            claims_task = aextract_structured_data(audio_text, "CLAIMS", semaphore, cache, hedge)
+        facts, claims = await asyncio.gather(
+            aextract_structured_data(doc_text, "FACTS", semaphore, cache, hedge),
+            claims_task
+        )
+        if cache is not None:
+            stats = cache.stats()
+            logger.info("Extraction cache: %d hits, %d misses (%d entries)",
+                        stats["hits"], stats["misses"], stats["entries"])
 
-    # Phase 3: Detect contradictions
-    logger.info("=== PHASE 3: DETECTING CONTRADICTIONS ===")
-    logic_analysis = find_contradictions(master_timeline)
-    logger.info("--- DETECTIVE'S NOTES ---\n%s\n-------------------------", logic_analysis)
+        # Phase 2: Build timeline
+        logger.info("=== PHASE 2: BUILDING TIMELINE ===")
+        # The FAST client is only built (and part of the key) when it phrases the timeline
+        timeline_model = _model_name(get_fast_llm()) if TIMELINE_CONFIG["phrase_with_llm"] else ""
+        timeline_fp = make_cache_key(
+            "timeline", facts.fingerprint(), claims.fingerprint(), str(critical_window), json.dumps(TIMELINE_CONFIG, sort_keys=True),
+            TIMELINE_SYSTEM_PROMPT, TIMELINE_TEMPLATE, TIMELINE_WINDOW_TEMPLATE, timeline_model
+        )
+        master_timeline = await _run_phase(
+            store, "timeline", timeline_fp,
+            lambda: acreate_timeline(facts, claims, critical_window, sink, semaphore), sink,
+            semaphore, hold_slot=False
+        )
+        _log_phase_output("MASTER TIMELINE", master_timeline, sink)
+
+        # Phase 3: Detect contradictions
+        logger.info("=== PHASE 3: DETECTING CONTRADICTIONS ===")
+        contradictions_fp = make_cache_key(
+            "contradictions", timeline_fp, json.dumps(CONTRADICTION_CONFIG, sort_keys=True),
+            CONTRADICTION_SYSTEM_PROMPT, CONTRADICTION_TEMPLATE, CONTRADICTION_CANDIDATES_TEMPLATE,
+            _model_name(get_smart_llm())
+        )
+        case = _case_summary(victim, critical_window)
+
+        def contradictions_phase():
+            return _run_phase(
+                store, "contradictions", contradictions_fp,
+                lambda: afind_contradictions(master_timeline, facts, claims, critical_window, sink), sink,
+                semaphore
+            )
+
+        def suspect_packets(contradictions: str) -> dict:
+            if not VERDICT_CONFIG["per_suspect"]:
+                return {}
+            with TRACER.span("retrieval", "phase", tid="verdict") as span:
+                packets = build_suspect_packets(
+                    facts, claims, doc_text, audio_text or "", clue_text, contradictions, victim,
+                    VERDICT_CONFIG["index_path"] if use_cache else None
+                )
+                span.set(suspects=len(packets))
+            return packets
+
+        if VERDICT_CONFIG["speculative"]:
+            # Phases 3 and 4a: contradictions and a draft suspect analysis run side by side
+            logger.info("=== PHASE 3: DETECTING CONTRADICTIONS + DRAFTING VERDICT ===")
+            # Contradictions start at once; the packets (BM25 index build) are made off the event loop
+            contradictions_task = asyncio.ensure_future(contradictions_phase())
+            try:
+                packets = await asyncio.to_thread(suspect_packets, "")
+            except BaseException:
+                contradictions_task.cancel()
+                raise
+            draft_fp = make_cache_key(
+                "verdict draft", timeline_fp, clue_text, json.dumps(packets), case, VERDICT_SYSTEM_PROMPT,
+                VERDICT_DRAFT_TEMPLATE, SUSPECT_VERDICT_SYSTEM_PROMPT, SUSPECT_VERDICT_TEMPLATE,
+                _model_name(get_smart_llm())
+            )
+            logic_analysis, draft = await asyncio.gather(
+                contradictions_task,
+                _run_phase(store, "verdict draft", draft_fp,
+                           lambda: adraft_verdict(master_timeline, clue_text, packets, case, semaphore),
+                           None, semaphore, hold_slot=False)
+            )
+            _log_phase_output("DETECTIVE'S NOTES", logic_analysis, sink)
+
+            # Phase 4b: one short call reconciles the draft with the contradictions
+            logger.info("=== PHASE 4: FINAL VERDICT (RECONCILE) ===")
+            verdict_fp = make_cache_key(
+                "verdict", draft_fp, contradictions_fp, clue_text, VERDICT_RECONCILE_SYSTEM_PROMPT,
+                VERDICT_RECONCILE_TEMPLATE, _model_name(get_smart_llm())
+            )
+            final_result = await _run_phase(
+                store, "verdict", verdict_fp,
+                lambda: areconcile_verdict(draft, logic_analysis, case, sink, semaphore, clue_text), sink, semaphore,
+                hold_slot=False
+            )
+        else:
+            logic_analysis = await contradictions_phase()
+            _log_phase_output("DETECTIVE'S NOTES", logic_analysis, sink)
+
+            # Phase 4: Deliver verdict
+            logger.info("=== PHASE 4: FINAL VERDICT ===")
+            packets = await asyncio.to_thread(suspect_packets, logic_analysis)
+            verdict_fp = make_cache_key(
+                "verdict", contradictions_fp, clue_text, VERDICT_SYSTEM_PROMPT, VERDICT_TEMPLATE,
+                json.dumps(packets), case, SUSPECT_VERDICT_SYSTEM_PROMPT, SUSPECT_VERDICT_TEMPLATE,
+                VERDICT_MERGE_SYSTEM_PROMPT, VERDICT_MERGE_TEMPLATE, _model_name(get_smart_llm())
+            )
+            final_result = await _run_phase(
+                store, "verdict", verdict_fp,
+                lambda: aget_final_verdict(logic_analysis, clue_text, master_timeline, sink, packets, case,
+                                           semaphore),
+                sink, semaphore, hold_slot=not packets
+            )
+    finally:
+        if cache is not None:
+            cache.close()
+        if store is not None:
+            store.close()
 
-    # Phase 4: Deliver verdict
-    logger.info("=== PHASE 4: FINAL VERDICT ===")
-    final_result = get_final_verdict(logic_analysis, clue_text, master_timeline)
-    
     return final_result
+
+
+def solve_mystery(audio_text: str, doc_text: str, clue_text: str, use_cache: bool = None,
+                  critical_window: str = None, sink: StreamSink = None, audio_stream=None,
+                  victim: str = None) -> str:
+    """
+    Main orchestration function to solve a mystery case.
+
+    Synchronous wrapper around asolve_mystery.
+    
+    Args:
+        audio_text: Transcribed audio/witness statements
+        doc_text: Document/log data
+        clue_text: Additional clues
+        use_cache: Reuse unchanged chunks and artifacts from disk (default: CACHE_CONFIG["enabled"])
+        critical_window: Optional time string (e.g. time of death) used to rank timeline gaps
+        sink: Optional StreamSink receiving phase output token by token
+        audio_stream: Optional async iterable of transcript segments (e.g. a SegmentQueue)
+            used for CLAIMS extraction instead of `audio_text`
+        victim: Optional victim name, excluded from the per-suspect verdict calls
+    
+    Returns:
+        Final verdict string
+    """
+    return run_sync(asolve_mystery(audio_text, doc_text, clue_text, use_cache, critical_window, sink,
+                                   audio_stream=audio_stream, victim=victim))
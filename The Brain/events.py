@@ -0,0 +1,179 @@
+"""Compact in-memory table of extracted forensic events, with compact serialisers."""
+
+import hashlib
+import json
+import sys
+from collections.abc import Mapping
+from typing import Iterable, List, Union
+
+FIELDS = ("time", "entity", "action", "location", "type")
+
+_intern = sys.intern
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value).strip()
+
+
+class Event(Mapping):
+    """
+    One extracted item: time, entity, action, location, type and provenance.
+
+    Stored in slots instead of a dict. It is a read-only Mapping, so code
+    written for extracted dicts (`item.get("time")`, `item["entity"]`) works
+    unchanged. Provenance is a tuple of (chunk, source) pairs.
+    """
+
+    __slots__ = FIELDS + ("provenance",)
+
+    def __init__(self, time: str, entity: str, action: str, location: str, type: str,
+                 provenance: tuple = ()):
+        self.time = time
+        self.entity = entity
+        self.action = action
+        self.location = location
+        self.type = type
+        self.provenance = provenance
+
+    # Empty fields read as missing keys, as they were absent from the extracted dict
+    def __getitem__(self, key):
+        if key in FIELDS:
+            value = getattr(self, key)
+            if value:
+                return value
+        elif key == "provenance" and self.provenance:
+            return [{"chunk": c, "source": s} if s else {"chunk": c} for c, s in self.provenance]
+        raise KeyError(key)
+
+    def __iter__(self):
+        for key in FIELDS:
+            if getattr(self, key):
+                yield key
+        if self.provenance:
+            yield "provenance"
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Event({self.time!r}, {self.entity!r}, {self.action!r}, {self.location!r}, {self.type!r})"
+
+    def __reduce__(self):
+        return Event, (self.time, self.entity, self.action, self.location, self.type, self.provenance)
+
+
+class EventTable:
+    """
+    Extracted events of one run, passed between the engine phases.
+
+    Entity, location, type, time and source strings are interned, so repeats
+    (the same suspect or room in hundreds of events) share one object. The
+    table serialises to minified JSON for caching and fingerprints, and to a
+    pipe-separated table for prompts, which spells out each key once rather
+    than on every item.
+    """
+
+    __slots__ = ("events",)
+
+    def __init__(self, events: Iterable[Event] = ()):
+        self.events = list(events)
+
+    @classmethod
+    def from_items(cls, items: Iterable, default_type: str = "") -> "EventTable":
+        """Build from extracted dicts (or Events); non-mapping items are dropped."""
+        events = []
+        for item in items:
+            if isinstance(item, Event):
+                events.append(item)
+                continue
+            if not isinstance(item, Mapping):
+                continue
+            provenance = tuple(
+                (origin.get("chunk"), _intern(_text(origin.get("source"))) if origin.get("source") else None)
+                for origin in item.get("provenance") or () if isinstance(origin, Mapping)
+            )
+            if not provenance and item.get("source"):
+                provenance = ((None, _intern(_text(item.get("source")))),)
+            events.append(Event(
+                _intern(_text(item.get("time"))),
+                _intern(_text(item.get("entity"))),
+                _text(item.get("action")),
+                _intern(_text(item.get("location"))),
+                _intern(_text(item.get("type") or default_type).upper()),
+                provenance,
+            ))
+        return cls(events)
+
+    @classmethod
+    def from_json(cls, text: str) -> "EventTable":
+        """Load from to_json output, or from a JSON list of extracted dicts."""
+        data = json.loads(text) if text else []
+        if isinstance(data, dict):
+            columns = data.get("columns", [])
+            data = [dict(zip(columns, row)) for row in data.get("rows", [])]
+            for item in data:
+                item["provenance"] = [dict(zip(("chunk", "source"), origin)) for origin in item.get("provenance", ())]
+        return cls.from_items(data)
+
+    @classmethod
+    def coerce(cls, value: Union["EventTable", str, list]) -> "EventTable":
+        """Accept an EventTable, a JSON string or a list of dicts."""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, str):
+            return cls.from_json(value)
+        return cls.from_items(value or [])
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def __getitem__(self, index):
+        return self.events[index]
+
+    def __add__(self, other: "EventTable") -> "EventTable":
+        return EventTable(self.events + list(other))
+
+    def to_dicts(self) -> List[dict]:
+        """Plain dicts, e.g. for code that mutates items."""
+        return [dict(event) for event in self.events]
+
+    def to_json(self) -> str:
+        """Minified columnar JSON: {"columns": [...], "rows": [[...], ...]}."""
+        rows = []
+        for e in self.events:
+            row = [e.time, e.entity, e.action, e.location, e.type]
+            if e.provenance:
+                row.append([[c, s] if s else [c] for c, s in e.provenance])
+            rows.append(row)
+        return json.dumps({"columns": list(FIELDS) + ["provenance"], "rows": rows},
+                          separators=(",", ":"), ensure_ascii=False)
+
+    def to_prompt(self, with_index: bool = False, with_source: bool = False) -> str:
+        """
+        Pipe-separated table for prompts: one header line, then one line per event.
+
+        Args:
+            with_index: Prefix each row with its position, so answers can cite rows
+            with_source: Add a column naming the source record(s) of each event
+        """
+        header = list(FIELDS)
+        if with_source:
+            header.append("source")
+        if with_index:
+            header.insert(0, "#")
+        lines = ["|".join(header)]
+        for n, e in enumerate(self.events):
+            cells = [e.time, e.entity, e.action, e.location, e.type]
+            if with_source:
+                cells.append("; ".join(dict.fromkeys(s for _, s in e.provenance if s)))
+            if with_index:
+                cells.insert(0, str(n))
+            lines.append("|".join(cell.replace("|", "/").replace("\n", " ") for cell in cells))
+        return "\n".join(lines)
+
+    def fingerprint(self) -> str:
+        """Stable hash of the table's content, for artifact-store keys."""
+        return hashlib.sha256(self.to_json().encode("utf-8")).hexdigest()
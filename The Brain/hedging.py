@@ -0,0 +1,268 @@
+"""Per-call deadlines and hedged (duplicate) requests to cut the latency tail of chunk calls."""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Set in the thread of each attempt started by call_with_deadline, and set once
+# the attempt is abandoned; RateLimiter.call checks it before sending
+CALL_CANCELLED = contextvars.ContextVar("call_cancelled", default=None)
+
+
+class CallDeadlineExceeded(TimeoutError):
+    """An LLM call (with any hedge) did not finish within its deadline."""
+
+
+class CallCancelled(Exception):
+    """An abandoned attempt was dropped before its request was sent."""
+
+
+class HedgePolicy:
+    """
+    When to send a duplicate of a slow call, within a spending budget.
+
+    Latencies of completed calls are kept in a rolling window. Once
+    `min_samples` are known, a call still running after the `percentile`
+    latency gets one hedge. At most `budget` extra calls are sent per call
+    started (0.1 = 10% more requests), so a slow provider cannot double the spend.
+    """
+
+    def __init__(self, percentile: float = 95, budget: float = 0.1, min_samples: int = 10,
+                 window: int = 200):
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self.calls = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        """Add the latency of a call that completed."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def started(self) -> None:
+        """Count a primary call towards the hedging budget."""
+        with self._lock:
+            self.calls += 1
+
+    def delay(self) -> Optional[float]:
+        """Seconds after which a running call should be hedged, or None while too few samples are known."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(self.percentile / 100.0 * len(ordered)))]
+
+    def try_spend(self) -> bool:
+        """Take one hedge from the budget; False if it is used up."""
+        with self._lock:
+            if self.hedges + 1 > self.budget * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+
+class ThreadSlots:
+    """
+    Calls in flight across worker threads, for call_with_deadline.
+
+    Primary calls always take a slot (the thread pool already bounds them);
+    a hedge only gets one while fewer than `size` calls are in flight.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.size:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+
+def _in_thread(fn, slots: Optional[ThreadSlots] = None) -> Tuple[Future, threading.Event]:
+    # Daemon thread, so a call abandoned at its deadline cannot block exit. The
+    # event is its CALL_CANCELLED flag; its slot (already taken) is freed when it ends.
+    future = Future()
+    cancelled = threading.Event()
+    context = contextvars.copy_context()
+    context.run(CALL_CANCELLED.set, cancelled)
+
+    def _run():
+        try:
+            future.set_result(context.run(fn))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            if slots is not None:
+                slots.release()
+
+    threading.Thread(target=_run, name="llm-call", daemon=True).start()
+    return future, cancelled
+
+
+def call_with_deadline(call, deadline: Optional[float] = None, hedge: Optional[HedgePolicy] = None,
+                       span=None, slots: Optional[ThreadSlots] = None):
+    """
+    Run the blocking `call()` with a deadline, hedging it if it runs slow.
+
+    Attempts run in their own threads with the synchronous client, so no
+    async client is shared across event loops. A thread cannot be killed:
+    an attempt that misses the deadline or loses to its hedge is flagged
+    through CALL_CANCELLED, so the rate limiter drops it if it has not been
+    sent yet, and a request already sent ends at the client's timeout
+    (config sets it to EXTRACTION_CONFIG["call_timeout"]).
+
+    Args:
+        call: Zero-argument function making the LLM call
+        deadline: Seconds before giving up on the call (None: no deadline)
+        hedge: Optional HedgePolicy deciding when to send a duplicate
+        span: Trace span on which "hedges" and "deadline_exceeded" are counted
+        slots: Optional ThreadSlots; a hedge is only sent while one is free
+
+    Returns:
+        The result of whichever attempt finished first
+
+    Raises:
+        CallDeadlineExceeded: if no attempt finished in time
+    """
+    if deadline is None and hedge is None:
+        return call()
+    if hedge is not None:
+        hedge.started()
+    start = time.monotonic()
+    if slots is not None:
+        slots.acquire()
+    future, cancelled = _in_thread(call, slots)
+    pending = {future: (start, cancelled)}
+    hedge_at = hedge.delay() if hedge is not None else None
+    failure = None
+    try:
+        while pending:
+            waits = [t for t in (deadline, hedge_at) if t is not None]
+            timeout = max(0.0, min(waits) - (time.monotonic() - start)) if waits else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                started, _ = pending.pop(future)
+                if future.exception() is None:
+                    if hedge is not None:
+                        hedge.record(time.monotonic() - started)
+                    return future.result()
+                failure = future.exception()
+            elapsed = time.monotonic() - start
+            if deadline is not None and elapsed >= deadline:
+                break
+            if hedge_at is not None and elapsed >= hedge_at:
+                hedge_at = None
+                # No free slot means the pool is saturated: a hedge would only queue
+                if slots is None or slots.try_acquire():
+                    if hedge.try_spend():
+                        logger.debug("Hedging a call still running after %.2fs", elapsed)
+                        if span is not None:
+                            span.add("hedges")
+                        future, cancelled = _in_thread(call, slots)
+                        pending[future] = (time.monotonic(), cancelled)
+                    elif slots is not None:
+                        slots.release()
+    finally:
+        for _, cancelled in pending.values():
+            cancelled.set()
+    if failure is not None and not pending:
+        raise failure
+    if span is not None:
+        span.add("deadline_exceeded")
+    raise CallDeadlineExceeded(f"LLM call exceeded its {deadline:g}s deadline")
+
+
+async def _in_slot(semaphore, call):
+    async with semaphore:
+        return await call()
+
+
+async def acall_with_deadline(call, deadline: Optional[float] = None, hedge: Optional[HedgePolicy] = None,
+                              span=None, semaphore=None):
+    """
+    Await `call()` with a deadline, hedging it if it runs slow.
+
+    The caller holds one `semaphore` slot for the call; a hedge takes a slot
+    of its own and is only sent when one is free at once, so hedges count
+    against the concurrency limit instead of doubling up inside a slot. The
+    losing attempt, and every attempt at the deadline, is cancelled.
+
+    Args:
+        call: Zero-argument function returning an awaitable LLM call
+        deadline: Seconds before giving up on the call (None: no deadline)
+        hedge: Optional HedgePolicy deciding when to send a duplicate
+        span: Trace span on which "hedges" and "deadline_exceeded" are counted
+        semaphore: The limit the caller's slot was taken from (e.g. a PrioritySemaphore)
+
+    Returns:
+        The result of whichever attempt finished first
+
+    Raises:
+        CallDeadlineExceeded: if no attempt finished in time
+    """
+    if deadline is None and hedge is None:
+        return await call()
+    if hedge is not None:
+        hedge.started()
+    start = time.monotonic()
+    pending = {asyncio.ensure_future(call()): start}
+    hedge_at = hedge.delay() if hedge is not None else None
+    failure = None
+    try:
+        while pending:
+            waits = [t for t in (deadline, hedge_at) if t is not None]
+            timeout = max(0.0, min(waits) - (time.monotonic() - start)) if waits else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                started = pending.pop(task)
+                if task.exception() is None:
+                    if hedge is not None:
+                        hedge.record(time.monotonic() - started)
+                    return task.result()
+                failure = task.exception()
+            elapsed = time.monotonic() - start
+            if deadline is not None and elapsed >= deadline:
+                break
+            if hedge_at is not None and elapsed >= hedge_at:
+                hedge_at = None
+                # No free slot means the limit is saturated: a hedge would only queue
+                if (semaphore is None or not semaphore.locked()) and hedge.try_spend():
+                    logger.debug("Hedging a call still running after %.2fs", elapsed)
+                    if span is not None:
+                        span.add("hedges")
+                    attempt = call if semaphore is None else (lambda: _in_slot(semaphore, call))
+                    pending[asyncio.ensure_future(attempt())] = time.monotonic()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            # Let the cancelled attempts unwind, so their rate-limiter and semaphore slots are free on return
+            await asyncio.wait(pending)
+    if failure is not None and not pending:
+        raise failure
+    if span is not None:
+        span.add("deadline_exceeded")
+    raise CallDeadlineExceeded(f"LLM call exceeded its {deadline:g}s deadline")
@@ -0,0 +1,130 @@
+"""Cross-chunk de-duplication of extracted items, with provenance."""
+
+import re
+from typing import List, Optional
+
+from contradictions import normalise_entity, normalise_location
+from timeline import parse_time
+
+# Record headers written by detective_data_loader ("DOCUMENT: ...", "INTERVIEW: ...")
+_SOURCE_RE = re.compile(r"^(?:DOCUMENT|INTERVIEW|CLUE|EVIDENCE):\s*(.+?)\s*$", re.MULTILINE)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({"a", "an", "the", "to", "at", "in", "on", "of", "into", "from", "by", "with",
+                        "his", "her", "their", "was", "is", "has", "had"})
+
+
+def chunk_sources(chunk_text: str) -> List[str]:
+    """Names of the records (documents, interviews) contained in a chunk, in order."""
+    sources = []
+    for name in _SOURCE_RE.findall(chunk_text):
+        if name not in sources:
+            sources.append(name)
+    return sources
+
+
+def _action_words(action) -> frozenset:
+    return frozenset(w for w in _WORD_RE.findall(str(action or "").lower()) if w not in _STOPWORDS)
+
+
+def _time_key(raw_time) -> tuple:
+    # Equal parsed times share a bucket even when written differently ("9 PM" / "21:00 (Approx)")
+    pt = parse_time(str(raw_time or ""))
+    if pt is None:
+        return ("raw", " ".join(str(raw_time or "").lower().split()))
+    return (pt.start, pt.end, pt.day, pt.tz_offset)
+
+
+def _similar(a: frozenset, b: frozenset, threshold: float) -> bool:
+    if a == b:
+        return True
+    if not a or not b:
+        return False
+    # "swiped keycard" vs "swiped keycard at lab door": containment counts as a match
+    if a <= b or b <= a:
+        return True
+    return len(a & b) / len(a | b) >= threshold
+
+
+def _compatible_places(a: str, b: str) -> bool:
+    return not a or not b or a == b or a in b or b in a
+
+
+class ItemMerger:
+    """
+    Incrementally merges extracted items from successive chunks.
+
+    Items are bucketed in a dict keyed by (normalised time, normalised entity);
+    within a bucket, an item is a duplicate of an earlier one if their actions
+    are similar (equal or contained word sets, or Jaccard similarity at least
+    `action_similarity`) and their locations do not disagree. The first
+    occurrence is kept, in chunk order, and gains any fields it was missing
+    plus a provenance entry for every chunk that reported it.
+    """
+
+    def __init__(self, action_similarity: float = 0.6, provenance: bool = True):
+        self.action_similarity = action_similarity
+        self.provenance = provenance
+        self.items = []
+        self._buckets = {}
+        self.duplicates = 0
+
+    def add_chunk(self, chunk_id: int, items: list, sources: Optional[List[str]] = None) -> None:
+        """Merge one chunk's items; `sources` are the records the chunk was cut from."""
+        default_source = "; ".join(sources) if sources else None
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            origin = {"chunk": chunk_id}
+            source = item.get("source") or default_source
+            if source:
+                origin["source"] = source
+
+            key = (_time_key(item.get("time")), normalise_entity(item.get("entity")))
+            words = _action_words(item.get("action"))
+            location = normalise_location(item.get("location"))
+
+            bucket = self._buckets.setdefault(key, [])
+            match = None
+            for entry in bucket:
+                if _similar(words, entry[1], self.action_similarity) and _compatible_places(location, entry[2]):
+                    match = entry
+                    break
+
+            if match is None:
+                merged = dict(item)
+                if self.provenance:
+                    merged["provenance"] = [origin]
+                self.items.append(merged)
+                bucket.append([merged, words, location])
+                continue
+
+            self.duplicates += 1
+            merged = match[0]
+            for field, value in item.items():
+                if value and not merged.get(field):
+                    merged[field] = value
+            if not match[2] and location:
+                match[2] = location
+            if self.provenance and origin not in merged["provenance"]:
+                merged["provenance"].append(origin)
+
+
+def merge_chunk_items(chunk_results: list, chunks: list = None, action_similarity: float = 0.6,
+                      provenance: bool = True) -> list:
+    """
+    De-duplicate items extracted from overlapping chunks.
+
+    Args:
+        chunk_results: One list of extracted items per chunk, in chunk order
+        chunks: The chunk texts, used to name each item's source record
+        action_similarity: Jaccard threshold above which two actions are the same event
+        provenance: Attach [{"chunk", "source"}, ...] to every item
+
+    Returns:
+        Merged items in order of first appearance (chunk order, then item order)
+    """
+    merger = ItemMerger(action_similarity, provenance)
+    for idx, items in enumerate(chunk_results):
+        sources = chunk_sources(chunks[idx]) if chunks is not None else None
+        merger.add_chunk(idx + 1, items or [], sources)
+    return merger.items
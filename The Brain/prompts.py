@@ -30,26 +30,29 @@ RAW TEXT:
 Extract the JSON list now. Return ONLY the JSON.
 """
 
+# Appended to the chunk text when an extraction answer was cut off, so the
+# re-ask returns only the missing tail rather than the whole list again
+EXTRACTION_CONTINUE_NOTE = """
+
+YOUR PREVIOUS ANSWER WAS CUT OFF. You already returned {count} items; the last one was:
+{last}
+Return ONLY the items that come AFTER it in the text, as a JSON list (or [] if there are none).
+"""
+
 TIMELINE_SYSTEM_PROMPT = """
 You are a Timeline Architect.
 
-INPUTS:
-1. FACTS (Verified Logs)
-2. CLAIMS (Witness Statements)
+INPUT:
+A Master Timeline that has already been merged, sorted, de-duplicated and checked for gaps.
 
 YOUR TASK:
-1. Merge both lists into a single Chronological Timeline (Earliest to Latest), make sure exact times are preserved (add ranges if needed for ambiguous times).
-2. Convert ALL times to 24-hour format (19:00, not 7 PM)
-3. Remove duplicate events (same time, entity, action)
-4. Align events: If a Claim happens at the same time as a Fact, list them side-by-side
-5. FLAG GAPS: Identify any period > 30 mins where a suspect is unaccounted for, account the gap according to severity of the timing.
+1. Rewrite each event as a clear one-line description. Do NOT change, add or drop any time, entity or location.
+2. Align events: If a Claim happens at the same time as a Fact, list them side-by-side
+3. Mark conflicting events at same time
+4. Keep the [GAPS DETECTED] section exactly as given:
    - Flag gaps during CRITICAL PERIODS
-   - Ignore gaps during normal daily activity
+   - Note gaps during normal daily activity as low importance
    - Ignore gaps for deceased after time of death
-6. VALIDATION: 
-   - Times must move forward
-   - No duplicate entries
-   - Mark conflicting events at same time
 
 OUTPUT FORMAT:
 [HH:MM] [TYPE] [Entity] - [Description] - [Location]
@@ -59,13 +62,17 @@ OUTPUT FORMAT:
 """
 
 TIMELINE_TEMPLATE = """
-LIST 1 (FACTS):
-{facts}
+MASTER TIMELINE:
+{timeline}
 
-LIST 2 (CLAIMS):
-{claims}
+Rewrite the Master Timeline.
+"""
 
-Build the Master Timeline.
+TIMELINE_WINDOW_TEMPLATE = """
+MASTER TIMELINE, PART {part} OF {parts} (consecutive time window; gaps are reported separately):
+{timeline}
+
+Rewrite this part of the Master Timeline. Output only its events; do NOT add a [GAPS DETECTED] section.
 """
 
 CONTRADICTION_SYSTEM_PROMPT = """
@@ -95,6 +102,13 @@ MASTER TIMELINE:
 Identify the lies.
 """
 
+CONTRADICTION_CANDIDATES_TEMPLATE = """
+CANDIDATE CONTRADICTIONS (pre-filtered: a CLAIM and a FACT place the same person in different locations at overlapping times):
+{candidates}
+
+Score each real contradiction. Drop candidates that are not a direct conflict (e.g. same place under a different name, or different people). Cite the CLAIMS[i]/FACTS[j] references.
+"""
+
 VERDICT_SYSTEM_PROMPT = """
 You are the Lead Investigator. It is time to name the killer backed by proof and irrefutable evidence.
 
@@ -145,3 +159,114 @@ OTHER CLUES:
 
 Who is the killer? Provide the name and the definitive "Smoking Gun" proof, and the confidence score.
 """
+
+SUSPECT_VERDICT_SYSTEM_PROMPT = """
+You are the Lead Investigator assessing ONE suspect from their evidence packet.
+
+METHODOLOGY (MMO):
+1. MEANS: Did they have access to do the murder?
+2. MOTIVE: Do they benefit from the victim's death?
+3. OPPORTUNITY: Did they have access to the victim during the murder window?
+
+RULES:
+- Score MEANS, MOTIVE, OPPORTUNITY (0-10) - If alibi verified, score = 0
+- A verified alibi for the time of death means RULED OUT (state this explicitly)
+- A lie that directly links to the murder (like location during the murder) makes them a prime suspect
+- Use only the packet; if no physical evidence links them, note this
+
+OUTPUT FORMAT:
+[Name]:
+- Means: [score] - [explanation]
+- Motive: [score] - [explanation]
+- Opportunity: [score] - [explanation]
+- Physical Evidence: [list or "None"]
+- Contradictions: [list or "None"]
+- Final Score: [0-10]
+- VERDICT: [GUILTY/RULED OUT/INSUFFICIENT]
+"""
+
+SUSPECT_VERDICT_TEMPLATE = """
+CASE: {case}
+
+SUSPECT UNDER REVIEW:
+{packet}
+
+Assess this suspect.
+"""
+
+VERDICT_MERGE_SYSTEM_PROMPT = """
+You are the Lead Investigator. Each suspect has already been assessed from their own evidence.
+Compare the assessments and name the killer backed by proof and irrefutable evidence.
+
+RULES:
+- Prefer the suspect with the highest Final Score whose assessment cites physical evidence or a murder-linked lie
+- Never name a suspect whose assessment is RULED OUT by a verified alibi
+- Check the assessments against the case clues; a clue that implicates or clears a suspect outweighs their score
+
+OUTPUT FORMAT:
+CASE SUMMARY:
+[Brief overview]
+
+KILLER: [Name]
+Smoking Gun Proof: [4-5 pieces of irrefutable evidence]
+Confidence Score: [X]%
+"""
+
+VERDICT_MERGE_TEMPLATE = """
+CASE: {case}
+
+SUSPECT ASSESSMENTS:
+{assessments}
+
+OTHER CLUES:
+{clues}
+
+Who is the killer? Provide the name and the definitive "Smoking Gun" proof, and the confidence score.
+"""
+
+VERDICT_DRAFT_TEMPLATE = """
+TIMELINE SUMMARY:
+{timeline}
+
+OTHER CLUES:
+{clues}
+
+The contradiction analysis is still in progress. Write ONLY the SUSPECT ANALYSIS section, for every suspect.
+"""
+
+VERDICT_RECONCILE_SYSTEM_PROMPT = """
+You are the Lead Investigator. A draft suspect analysis was written before the contradiction analysis was finished.
+Reconcile the two and name the killer backed by proof and irrefutable evidence.
+
+RULES:
+- A lie that directly links to the murder (like location during the murder) makes that suspect a prime suspect
+- A contradiction can break an alibi the draft accepted; re-score that suspect
+- Keep the draft's scores where the contradictions change nothing
+- Check the final pick against the case clues; a clue that implicates or clears a suspect outweighs their score
+
+OUTPUT FORMAT:
+ADJUSTMENTS:
+- [Name]: [changed scores/verdict and why, or "No change"]
+
+CASE SUMMARY:
+[Brief overview]
+
+KILLER: [Name]
+Smoking Gun Proof: [4-5 pieces of irrefutable evidence]
+Confidence Score: [X]%
+"""
+
+VERDICT_RECONCILE_TEMPLATE = """
+CASE: {case}
+
+DRAFT SUSPECT ANALYSIS:
+{draft}
+
+INCONSISTENCIES FOUND:
+{contradictions}
+
+OTHER CLUES:
+{clues}
+
+Who is the killer? Provide the name and the definitive "Smoking Gun" proof, and the confidence score.
+"""
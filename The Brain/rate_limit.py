@@ -0,0 +1,309 @@
+"""Token-aware rate limiting and adaptive (AIMD) concurrency for the LLM clients."""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+from langchain_core.runnables import Runnable
+
+from hedging import CALL_CANCELLED, CallCancelled
+from utils import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """True if `exc` looks like an HTTP 429 / provider rate-limit error."""
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    message = str(exc).lower()
+    return "429" in message or "rate limit" in message or "rate_limit" in message
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute` units per minute.
+
+    `reserve` never blocks: it debits the bucket (possibly below zero) and
+    returns how long the caller must wait before the reservation is honoured,
+    so the same bucket serves both threads and coroutines.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Debit `amount` units and return the seconds to wait before using them."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+            self._updated = now
+            self._level -= amount
+            return 0.0 if self._level >= 0 else -self._level / self.rate
+
+    def refund(self, amount: float) -> None:
+        """Return units to the bucket (negative `amount` charges extra)."""
+        with self._lock:
+            self._level = min(self.capacity, self._level + amount)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit: grows by ~1 slot per window of successful calls,
+    shrinks multiplicatively on rate-limit errors or latency spikes.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 backoff: float = 0.5, spike_factor: float = 3.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.spike_factor = spike_factor
+        self.in_flight = 0
+        self._latency_ewma = None
+        self._samples = 0
+        self._cond = threading.Condition()
+        # Coroutines waiting for a slot, FIFO, as (loop, future); woken as slots free up
+        self._async_waiters = deque()
+
+    def _try_acquire(self) -> bool:
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        """Block the calling thread until a slot is free."""
+        with self._cond:
+            while not self._try_acquire():
+                self._cond.wait()
+
+    async def aacquire(self) -> None:
+        """Wait on the event loop until a slot is free; woken by `release`, never polling."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                # Queued coroutines go first, so a newcomer cannot overtake them
+                if not self._async_waiters and self._try_acquire():
+                    return
+                future = loop.create_future()
+                self._async_waiters.append((loop, future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._cond:
+                    try:
+                        self._async_waiters.remove((loop, future))
+                    except ValueError:
+                        # Already woken: pass the wake-up on instead of losing it
+                        self._wake_waiters()
+                raise
+            with self._cond:
+                if self._try_acquire():
+                    return
+                # A thread took the slot first: queue again
+
+    def _wake_waiters(self) -> None:
+        # Called with self._cond held: wake one queued coroutine per free slot
+        for _ in range(min(len(self._async_waiters), int(self.limit) - self.in_flight)):
+            loop, future = self._async_waiters.popleft()
+            loop.call_soon_threadsafe(self._resolve, future)
+
+    def _resolve(self, future) -> None:
+        if future.done():
+            # Cancelled before it could be woken: wake the next waiter instead
+            with self._cond:
+                self._wake_waiters()
+        else:
+            future.set_result(None)
+
+    def release(self, latency: Optional[float] = None, rate_limited: bool = False) -> None:
+        """Free a slot and feed the outcome of the call back into the limit."""
+        with self._cond:
+            self.in_flight -= 1
+            if rate_limited:
+                self._decrease("rate limited")
+            elif latency is not None:
+                spike = (
+                    self._samples >= 5
+                    and latency > self.spike_factor * self._latency_ewma
+                )
+                self._latency_ewma = latency if self._latency_ewma is None else (
+                    0.8 * self._latency_ewma + 0.2 * latency
+                )
+                self._samples += 1
+                if spike:
+                    self._decrease("latency spike %.1fs" % latency)
+                else:
+                    self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+            self._wake_waiters()
+
+    def _decrease(self, reason: str) -> None:
+        previous = self.limit
+        self.limit = max(float(self.minimum), self.limit * self.backoff)
+        logger.warning("Concurrency limit %.1f -> %.1f (%s)", previous, self.limit, reason)
+
+
+class RateLimiter:
+    """Requests/minute and tokens/minute buckets plus an adaptive concurrency limit."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float,
+                 completion_tokens: int = 1024, concurrency: AdaptiveConcurrency = None):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.completion_tokens = completion_tokens
+        self.concurrency = concurrency or AdaptiveConcurrency()
+
+    def _reserve(self, prompt_text: str):
+        estimate = count_tokens(prompt_text) + self.completion_tokens
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimate))
+        return estimate, wait
+
+    def _settle(self, estimate: int, result: Any) -> None:
+        usage = getattr(result, "usage_metadata", None)
+        if usage and usage.get("total_tokens"):
+            self.tokens.refund(estimate - usage["total_tokens"])
+
+    def call(self, fn, prompt_text: str):
+        """
+        Run `fn()` once the buckets and concurrency limit allow it.
+
+        An attempt abandoned by hedging.call_with_deadline while it waits
+        (its CALL_CANCELLED flag is set) is dropped unsent, with its quota
+        and slot given back.
+        """
+        cancelled = CALL_CANCELLED.get()
+        estimate, wait = self._reserve(prompt_text)
+        if wait > 0:
+            logger.debug("Rate limiter: waiting %.2fs", wait)
+            if cancelled is not None:
+                cancelled.wait(wait)
+            else:
+                time.sleep(wait)
+        self.concurrency.acquire()
+        if cancelled is not None and cancelled.is_set():
+            self.concurrency.release()
+            self.requests.refund(1)
+            self.tokens.refund(estimate)
+            raise CallCancelled("LLM call abandoned before it was sent")
+        start = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            self.concurrency.release(rate_limited=is_rate_limit_error(e))
+            raise
+        self.concurrency.release(latency=time.monotonic() - start)
+        self._settle(estimate, result)
+        return result
+
+    async def acall(self, coro_fn, prompt_text: str):
+        """Async counterpart of `call`; `coro_fn()` must return an awaitable."""
+        estimate, wait = self._reserve(prompt_text)
+        if wait > 0:
+            logger.debug("Rate limiter: waiting %.2fs", wait)
+            await asyncio.sleep(wait)
+        await self.concurrency.aacquire()
+        start = time.monotonic()
+        try:
+            result = await coro_fn()
+        except BaseException as e:
+            # Includes cancellation, e.g. of the losing half of a hedged call
+            self.concurrency.release(rate_limited=is_rate_limit_error(e))
+            raise
+        self.concurrency.release(latency=time.monotonic() - start)
+        self._settle(estimate, result)
+        return result
+
+    def stream(self, gen_fn, prompt_text: str):
+        """Like `call`, for a generator: the slot is held until the stream is exhausted."""
+        estimate, wait = self._reserve(prompt_text)
+        if wait > 0:
+            logger.debug("Rate limiter: waiting %.2fs", wait)
+            time.sleep(wait)
+        self.concurrency.acquire()
+        start = time.monotonic()
+        last = None
+        failure = None
+        try:
+            for chunk in gen_fn():
+                last = chunk
+                yield chunk
+        except Exception as e:
+            failure = e
+            raise
+        finally:
+            # Also runs if the consumer abandons the stream early
+            if failure is not None:
+                self.concurrency.release(rate_limited=is_rate_limit_error(failure))
+            else:
+                self.concurrency.release(latency=time.monotonic() - start)
+        self._settle(estimate, last)
+
+    async def astream(self, agen_fn, prompt_text: str):
+        """Async counterpart of `stream`; `agen_fn()` must return an async iterator."""
+        estimate, wait = self._reserve(prompt_text)
+        if wait > 0:
+            logger.debug("Rate limiter: waiting %.2fs", wait)
+            await asyncio.sleep(wait)
+        await self.concurrency.aacquire()
+        start = time.monotonic()
+        last = None
+        failure = None
+        try:
+            async for chunk in agen_fn():
+                last = chunk
+                yield chunk
+        except Exception as e:
+            failure = e
+            raise
+        finally:
+            # Also runs if the consumer abandons the stream early
+            if failure is not None:
+                self.concurrency.release(rate_limited=is_rate_limit_error(failure))
+            else:
+                self.concurrency.release(latency=time.monotonic() - start)
+        self._settle(estimate, last)
+
+
+class RateLimitedLLM(Runnable):
+    """Runnable wrapper that routes every call of a chat model through a RateLimiter."""
+
+    def __init__(self, llm, limiter: RateLimiter):
+        self.llm = llm
+        self.limiter = limiter
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.llm, "model_name", None) or type(self.llm).__name__
+
+    @staticmethod
+    def _prompt_text(input: Any) -> str:
+        if hasattr(input, "to_string"):
+            return input.to_string()
+        return str(input)
+
+    def invoke(self, input: Any, config=None, **kwargs):
+        return self.limiter.call(lambda: self.llm.invoke(input, config, **kwargs), self._prompt_text(input))
+
+    async def ainvoke(self, input: Any, config=None, **kwargs):
+        return await self.limiter.acall(lambda: self.llm.ainvoke(input, config, **kwargs),
+                                        self._prompt_text(input))
+
+    def stream(self, input: Any, config=None, **kwargs):
+        yield from self.limiter.stream(lambda: self.llm.stream(input, config, **kwargs),
+                                       self._prompt_text(input))
+
+    async def astream(self, input: Any, config=None, **kwargs):
+        async for chunk in self.limiter.astream(lambda: self.llm.astream(input, config, **kwargs),
+                                                self._prompt_text(input)):
+            yield chunk
@@ -8,22 +8,70 @@ This is a Langchain-based forensic analysis tool that:
 4. Identifies the killer with confidence scoring
 """
 
+import argparse
 import logging
-from detective_data_loader import get_audio_text, get_documents_text, get_clues_text
-from engine import solve_mystery
+from detective_data_loader import get_audio_text, get_documents_text, get_clues_text, get_case_metadata
 
 logger = logging.getLogger(__name__)
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Solve a mystery case with the forensic LLM pipeline.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the on-disk extraction cache and artifact store for this run")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="Empty the extraction cache and artifact store before solving")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream timeline, contradiction and verdict output to stdout as it is generated")
+    parser.add_argument("--stream-file", metavar="PATH",
+                        help="Stream phase output to a file instead of stdout")
+    parser.add_argument("--trace", metavar="PREFIX",
+                        help="Write PREFIX.jsonl and PREFIX.trace.json (Chrome trace events) for this run")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Load data and solve the mystery."""
+    args = parse_args(argv)
+
+    # Deferred so that --help returns without loading the pipeline
+    from engine import solve_mystery, open_extraction_cache, open_artifact_store
+    from streaming import StdoutSink, FileSink
+    from tracing import TRACER
+
+    if args.clear_cache:
+        for opener in (open_extraction_cache, open_artifact_store):
+            cache = opener()
+            cache.clear()
+            cache.close()
+
     logger.info("Loading case data...")
     audio_input = get_audio_text()
     document_input = get_documents_text()
     clue_input = get_clues_text()
+    metadata = get_case_metadata()
+    time_of_death = metadata.get("time_of_death")
+
+    sink = None
+    if args.stream_file:
+        sink = FileSink(args.stream_file)
+    elif args.stream:
+        sink = StdoutSink()
 
     logger.info("Starting mystery solver...")
-    result = solve_mystery(audio_input, document_input, clue_input)
+    try:
+        result = solve_mystery(audio_input, document_input, clue_input, use_cache=not args.no_cache,
+                               critical_window=time_of_death, sink=sink, victim=metadata.get("victim"))
+    finally:
+        if sink is not None:
+            sink.log_metrics()
+            sink.close()
+        if args.trace:
+            TRACER.export_jsonl(f"{args.trace}.jsonl")
+            TRACER.export_chrome(f"{args.trace}.trace.json")
+            logger.info("Trace written to %s.jsonl and %s.trace.json", args.trace, args.trace)
+        print(TRACER.summary())
     
     logger.info("=== CASE CLOSED ===\n%s", result)
     return result
@@ -0,0 +1,241 @@
+"""Offline BM25 retrieval over case evidence, used to build per-suspect verdict packets."""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional
+
+from contradictions import normalise_entity
+from events import EventTable
+from merge import chunk_sources
+from timeline import TimeAxis, parse_time
+from utils import count_tokens, split_records
+
+logger = logging.getLogger(__name__)
+
+_QUERY_TOKEN_RE = re.compile(r"\w+")
+_BLOCK_RE = re.compile(r"\n\s*\n")
+_RULE_RE = re.compile(r"^[-=]{20,}\s*$")
+# Extracted entities that are devices, places, records or organisations rather than people
+_NON_PERSON_RE = re.compile(
+    r"\b(?:system|systems|camera|cameras|cctv|door|doors|keycard|card|badge|reader|scanner|log|logs|"
+    r"alarm|sensor|server|computer|laptop|terminal|database|phone|email|emails|vehicle|car|lab|"
+    r"laboratory|room|office|building|security|account|bank|company|corporation|inc|ltd|department|"
+    r"police|hospital|report|records|inventory|unknown|someone|somebody|everyone|staff|team)\b|\d"
+)
+
+
+class Passage(NamedTuple):
+    """One retrievable piece of evidence."""
+    kind: str   # "document", "transcript", "clue", "contradiction" or "event"
+    ref: str    # Record name or event reference shown to the model
+    text: str
+
+
+def _split_passages(kind: str, text: str, max_tokens: int) -> List[Passage]:
+    """Cut formatted case text into record-aligned passages of at most about `max_tokens`."""
+    passages = []
+    for record in split_records(text or ""):
+        names = chunk_sources(record)
+        ref = names[0] if names else kind
+        current = []
+        size = 0
+        for block in _BLOCK_RE.split(record):
+            block = "\n".join(line for line in block.strip().splitlines() if not _RULE_RE.match(line))
+            if not block:
+                continue
+            tokens = count_tokens(block)
+            if current and size + tokens > max_tokens:
+                passages.append(Passage(kind, ref, "\n".join(current)))
+                current, size = [], 0
+            current.append(block)
+            size += tokens
+        if current:
+            passages.append(Passage(kind, ref, "\n".join(current)))
+    return passages
+
+
+def evidence_passages(documents: str = "", transcripts: str = "", clues: str = "",
+                      contradictions: str = "", events: Optional[EventTable] = None,
+                      max_tokens: int = 300) -> List[Passage]:
+    """
+    Collect the passages of one case for indexing.
+
+    Args:
+        documents: Formatted documents text
+        transcripts: Formatted audio transcripts text
+        clues: Formatted clues text
+        contradictions: Output of the contradiction phase
+        events: Extracted FACTS and CLAIMS; each event is one passage
+        max_tokens: Approximate passage size for the text sources
+
+    Returns:
+        Passages in source order
+    """
+    passages = []
+    passages += _split_passages("document", documents, max_tokens)
+    passages += _split_passages("transcript", transcripts, max_tokens)
+    passages += _split_passages("clue", clues, max_tokens)
+    for n, block in enumerate(b.strip() for b in _BLOCK_RE.split(contradictions or "")):
+        if block:
+            passages.append(Passage("contradiction", f"contradiction {n + 1}", block))
+    for n, event in enumerate(events or ()):
+        passages.append(Passage("event", f"{event.type or 'EVENT'} {n + 1}",
+                                f"{event.time} {event.entity}: {event.action} @ {event.location}"))
+    return passages
+
+
+class EvidenceIndex:
+    """
+    BM25 index over case passages in a SQLite FTS5 table.
+
+    Built locally with no network. Each case is stored under a corpus key
+    (a fingerprint of its passages), so re-running an unchanged case reuses
+    the index; only the `max_corpora` most recently used cases are kept.
+    """
+
+    def __init__(self, path=None, max_corpora: int = 20):
+        self.path = Path(path) if path else None
+        self.max_corpora = max_corpora
+        self._lock = threading.Lock()
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path) if self.path else ":memory:", check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS corpora ("
+            " key TEXT PRIMARY KEY,"
+            " passages INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5("
+            " text, corpus UNINDEXED, kind UNINDEXED, ref UNINDEXED, tokenize = 'porter unicode61')"
+        )
+        self._conn.commit()
+
+    def build(self, corpus: str, passages: Iterable[Passage]) -> bool:
+        """
+        Index `passages` under `corpus` unless it is already indexed.
+
+        Returns:
+            True if the corpus was built now, False if it was reused
+        """
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM corpora WHERE key = ?", (corpus,)).fetchone():
+                self._conn.execute("UPDATE corpora SET last_access = ? WHERE key = ?", (time.time(), corpus))
+                self._conn.commit()
+                return False
+            rows = [(p.text, corpus, p.kind, p.ref) for p in passages]
+            self._conn.executemany("INSERT INTO passages (text, corpus, kind, ref) VALUES (?, ?, ?, ?)", rows)
+            self._conn.execute("INSERT INTO corpora (key, passages, last_access) VALUES (?, ?, ?)",
+                               (corpus, len(rows), time.time()))
+            stale = [key for (key,) in self._conn.execute(
+                "SELECT key FROM corpora ORDER BY last_access DESC LIMIT -1 OFFSET ?", (self.max_corpora,))]
+            for key in stale:
+                self._conn.execute("DELETE FROM passages WHERE corpus = ?", (key,))
+                self._conn.execute("DELETE FROM corpora WHERE key = ?", (key,))
+            self._conn.commit()
+        logger.info("Evidence index: %d passages indexed (%s)", len(rows), corpus[:12])
+        return True
+
+    def search(self, corpus: str, query: str, kinds: Iterable[str] = None, limit: int = 6) -> List[Passage]:
+        """
+        Best-matching passages of `corpus` for `query`, by BM25.
+
+        Args:
+            corpus: Corpus key given to `build`
+            query: Free text; any of its words may match
+            kinds: Restrict to these passage kinds
+            limit: Maximum passages returned
+        """
+        words = dict.fromkeys(w.lower() for w in _QUERY_TOKEN_RE.findall(query) if len(w) > 1)
+        if not words:
+            return []
+        match = " OR ".join(f'"{w}"' for w in words)
+        sql = "SELECT kind, ref, text FROM passages WHERE passages MATCH ? AND corpus = ?"
+        params = [match, corpus]
+        if kinds:
+            kinds = list(kinds)
+            sql += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params += kinds
+        sql += " ORDER BY bm25(passages) LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [Passage(*row) for row in self._conn.execute(sql, params)]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def identify_suspects(events: EventTable, victim: str = None, max_suspects: int = 8) -> List[str]:
+    """
+    Name the people to assess: entities of the extracted events, excluding the victim.
+
+    Entities that name a device, place, record or organisation ("Security
+    System", "Lab 3", "Keycard Reader") are not people and are dropped before
+    the `max_suspects` cap. People who gave testimony (CLAIMS) come first,
+    then by number of events.
+
+    Returns:
+        Display names (the most common spelling of each entity)
+    """
+    victim_key = normalise_entity(victim) if victim else None
+    counts = Counter()
+    claimed = set()
+    spellings = {}
+    for event in events:
+        key = normalise_entity(event.entity)
+        # "Richard" or "Castellano, Richard" still refer to the victim
+        if not key or _NON_PERSON_RE.search(key) or (victim_key and set(key.split()) <= set(victim_key.split())):
+            continue
+        counts[key] += 1
+        spellings.setdefault(key, Counter())[event.entity] += 1
+        if event.type == "CLAIMS":
+            claimed.add(key)
+    ranked = sorted(counts, key=lambda k: (k not in claimed, -counts[k], k))
+    return [spellings[key].most_common(1)[0][0] for key in ranked[:max_suspects]]
+
+
+def _chronological(events: list) -> list:
+    """`events` sorted by time on a common axis (see timeline.TimeAxis); untimed events keep their order, last."""
+    parsed = [parse_time(str(e.time or "")) for e in events]
+    axis = TimeAxis([pt for pt in parsed if pt is not None])
+    order = sorted(range(len(events)),
+                   key=lambda n: (parsed[n] is None, axis.place(parsed[n]) if parsed[n] is not None else (0, 0), n))
+    return [events[n] for n in order]
+
+
+def suspect_packet(index: EvidenceIndex, corpus: str, suspect: str, events: EventTable,
+                   max_events: int = 40, max_passages: int = 6) -> str:
+    """
+    Render the evidence packet for one suspect.
+
+    The packet holds the suspect's own events in chronological order (events
+    without a readable time last, as extracted) followed by the passages that
+    best match their name among documents, transcripts, clues, contradictions
+    and other people's events.
+    """
+    key = normalise_entity(suspect)
+    own = EventTable(_chronological([e for e in events if normalise_entity(e.entity) == key]))
+    hits = index.search(corpus, key, limit=max_passages + max_events)
+    own_refs = {f"{e.type or 'EVENT'} {n + 1}" for n, e in enumerate(events)
+                if normalise_entity(e.entity) == key}
+    passages = [p for p in hits if not (p.kind == "event" and p.ref in own_refs)][:max_passages]
+
+    lines = [f"SUSPECT: {suspect}", "", f"EVENTS INVOLVING {suspect.upper()}:"]
+    lines.append(EventTable(own.events[:max_events]).to_prompt() if len(own) else "None extracted")
+    if len(own) > max_events:
+        lines.append(f"... {len(own) - max_events} more events omitted")
+    lines += ["", "RELATED EVIDENCE:"]
+    if not passages:
+        lines.append("None found")
+    for p in passages:
+        lines.append(f"[{p.kind.upper()}: {p.ref}]")
+        lines.append(p.text)
+    return "\n".join(lines)
@@ -0,0 +1,97 @@
+"""
+Cold-import budget check for the Brain.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+fails (exit code 1) if the best cumulative import time of a module exceeds
+its budget. LangChain, the Groq SDK and .env are loaded lazily by the client
+factories in config.py, so importing the engine should stay cheap; this
+catches a heavy import creeping back in at module level.
+
+Usage:
+    python startup_benchmark.py                  # default budgets
+    python startup_benchmark.py --runs 10 --budget engine=150
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Budgets in milliseconds (best of --runs, cumulative import time of the module)
+IMPORT_BUDGETS_MS = {
+    "engine": 250,
+    "detective_data_loader": 100,
+}
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def measure_import(module: str) -> Tuple[float, List[Tuple[float, str]]]:
+    """
+    Import `module` in a fresh interpreter with -X importtime.
+
+    Returns:
+        (cumulative milliseconds for the module, [(self ms, name), ...] for every import)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).parent, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    total = None
+    self_times = []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        self_times.append((int(self_us) / 1000.0, name))
+        if name == module and not indent:
+            total = int(cumulative_us) / 1000.0
+    if total is None:
+        raise RuntimeError(f"No importtime entry for {module}")
+    return total, self_times
+
+
+def check_budgets(budgets: Dict[str, float], runs: int = 5, top: int = 10) -> bool:
+    """Measure every module in `budgets`; print a report and return True if all are within budget."""
+    ok = True
+    for module, budget in budgets.items():
+        samples = [measure_import(module) for _ in range(runs)]
+        best, self_times = min(samples, key=lambda s: s[0])
+        worst = max(s[0] for s in samples)
+        within = best <= budget
+        ok = ok and within
+        print(f"{module:<24} best {best:7.1f} ms  worst {worst:7.1f} ms  budget {budget:6.0f} ms  "
+              f"{'OK' if within else 'OVER BUDGET'}")
+        if not within:
+            print("  Heaviest imports (self time):")
+            for ms, name in sorted(self_times, reverse=True)[:top]:
+                print(f"    {ms:7.1f} ms  {name}")
+    return ok
+
+
+def parse_args(argv: Optional[list] = None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Fail if cold imports exceed their time budget.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module (best run counts)")
+    parser.add_argument("--budget", action="append", metavar="MODULE=MS",
+                        help="Override or add a module budget (repeatable)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = parse_args(argv)
+    budgets = dict(IMPORT_BUDGETS_MS)
+    for spec in args.budget or []:
+        module, ms = spec.split("=", 1)
+        budgets[module] = float(ms)
+    return 0 if check_budgets(budgets, args.runs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
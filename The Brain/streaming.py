@@ -0,0 +1,177 @@
+"""Token streaming sinks and time-to-first-byte metrics for the LLM phases, and
+the transcript segment queue that feeds live audio into extraction."""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+
+class StreamSink(ABC):
+    """
+    Receives phase output as it is generated.
+
+    Subclasses implement `write`; `begin`/`end` bracket each phase. The base
+    class records time-to-first-byte and total duration per phase in `metrics`.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self._started = {}
+
+    def begin(self, phase: str) -> None:
+        self._started[phase] = time.perf_counter()
+        self.metrics[phase] = {"ttfb": None, "total": None, "chars": 0}
+
+    def feed(self, phase: str, text: str) -> None:
+        """Record and forward one piece of output."""
+        if not text:
+            return
+        stats = self.metrics[phase]
+        if stats["ttfb"] is None:
+            stats["ttfb"] = time.perf_counter() - self._started[phase]
+        stats["chars"] += len(text)
+        self.write(phase, text)
+
+    def end(self, phase: str) -> None:
+        self.metrics[phase]["total"] = time.perf_counter() - self._started.pop(phase)
+
+    @abstractmethod
+    def write(self, phase: str, text: str) -> None:
+        """Deliver one piece of output for `phase`."""
+
+    def close(self) -> None:
+        pass
+
+    def log_metrics(self) -> None:
+        """Log a one-line TTFB / duration summary per phase."""
+        for phase, stats in self.metrics.items():
+            ttfb = "n/a" if stats["ttfb"] is None else "%.2fs" % stats["ttfb"]
+            total = "n/a" if stats["total"] is None else "%.2fs" % stats["total"]
+            logger.info("Stream %-15s ttfb=%s total=%s chars=%d", phase, ttfb, total, stats["chars"])
+
+
+class StdoutSink(StreamSink):
+    """Print tokens to stdout as they arrive, with a header per phase."""
+
+    def __init__(self, stream=None):
+        super().__init__()
+        self.stream = stream or sys.stdout
+
+    def begin(self, phase: str) -> None:
+        super().begin(phase)
+        self.stream.write(f"\n--- {phase.upper()} ---\n")
+        self.stream.flush()
+
+    def write(self, phase: str, text: str) -> None:
+        self.stream.write(text)
+        self.stream.flush()
+
+    def end(self, phase: str) -> None:
+        super().end(phase)
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+class FileSink(StdoutSink):
+    """Append streamed output to a file."""
+
+    def __init__(self, path):
+        super().__init__(open(path, "a", encoding="utf-8"))
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+class CallbackSink(StreamSink):
+    """Forward every piece of output to `callback(phase, text)`."""
+
+    def __init__(self, callback):
+        super().__init__()
+        self.callback = callback
+
+    def write(self, phase: str, text: str) -> None:
+        self.callback(phase, text)
+
+
+async def astream_chain(chain, inputs: dict, phase: str, sink: StreamSink, config: dict = None) -> str:
+    """
+    Stream a chain's output into `sink` and return the full text once complete.
+
+    Args:
+        chain: LangChain chain from `build_chain` (ends in StrOutputParser)
+        inputs: Chain input dict
+        phase: Phase name used for the sink header and metrics
+        sink: Destination for tokens
+        config: Optional runnable config (e.g. callbacks) passed to `astream`
+
+    Returns:
+        The complete output string
+    """
+    parts = []
+    sink.begin(phase)
+    try:
+        async for token in chain.astream(inputs, config=config):
+            parts.append(token)
+            sink.feed(phase, token)
+    finally:
+        sink.end(phase)
+    return "".join(parts)
+
+
+def emit_text(text: str, phase: str, sink: StreamSink) -> str:
+    """Send an already-complete phase output (cached or computed locally) through `sink`."""
+    sink.begin(phase)
+    sink.feed(phase, text)
+    sink.end(phase)
+    return text
+
+
+class SegmentQueue:
+    """
+    Thread-safe hand-off of transcript segments to the event loop.
+
+    A producer in any thread (e.g. THE EAR's `analyse(path, on_segment=q.put)`)
+    calls `put` per segment and `close` when done; the Brain consumes it with
+    `async for segment in q`, e.g. via `asolve_mystery(..., audio_stream=q)`.
+    """
+
+    _CLOSED = object()
+
+    def __init__(self):
+        # Segments put before the consumer starts wait here; after that they go
+        # straight onto an asyncio.Queue of the consumer's loop
+        self._lock = threading.Lock()
+        self._pending = []
+        self._loop = None
+        self._queue = None
+
+    def put(self, segment) -> None:
+        """Add a segment (a string, or a dict with "text" and optional "start"/"end")."""
+        with self._lock:
+            if self._loop is None:
+                self._pending.append(segment)
+                return
+            loop = self._loop
+        loop.call_soon_threadsafe(self._queue.put_nowait, segment)
+
+    def close(self) -> None:
+        """Mark the end of the stream."""
+        self.put(self._CLOSED)
+
+    async def __aiter__(self):
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue()
+            for segment in self._pending:
+                self._queue.put_nowait(segment)
+            self._pending = []
+        while True:
+            segment = await self._queue.get()
+            if segment is self._CLOSED:
+                return
+            yield segment
@@ -0,0 +1,205 @@
+"""Typed extraction items and a tolerant parser that salvages them from imperfect LLM output."""
+
+import json
+import re
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?")
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_DECODER = json.JSONDecoder()
+# Where a JSON answer may start inside prose
+_CANDIDATE_RE = re.compile(r"[\[{]")
+
+
+class ExtractedItem(BaseModel):
+    """One extracted forensic item, as the extraction prompt asks for it."""
+
+    model_config = ConfigDict(extra="allow", str_strip_whitespace=True)
+
+    time: str = ""
+    entity: str = "Unknown"
+    action: str
+    location: str = ""
+    type: str = ""
+    source: Optional[str] = None
+
+    @field_validator("time", "entity", "action", "location", "type", "source", mode="before")
+    @classmethod
+    def _as_text(cls, value, info):
+        # Models sometimes emit 2115 or null for a field; keep the item, not the type error
+        if value is None:
+            default = cls.model_fields[info.field_name].default
+            return default if default is None or isinstance(default, str) else ""
+        return value if isinstance(value, str) else str(value)
+
+    @field_validator("action")
+    @classmethod
+    def _not_empty(cls, value: str) -> str:
+        if not value:
+            raise ValueError("an item needs an action")
+        return value
+
+
+def _object_end(text: str, start: int) -> int:
+    """Index just past the object opening at `start`, or -1 if the text ends first."""
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
+
+
+def _loads(fragment: str):
+    """Decode one JSON value, forgiving trailing commas; None if it still does not parse."""
+    try:
+        return _DECODER.raw_decode(fragment)[0]
+    except ValueError:
+        pass
+    try:
+        return json.loads(_TRAILING_COMMA_RE.sub(r"\1", fragment))
+    except ValueError:
+        return None
+
+
+def _wrapped_items(data: dict) -> Optional[List[dict]]:
+    """Items of an {"items": [...]} wrapper, or None when `data` is itself a single item."""
+    lists = [v for v in data.values() if isinstance(v, list)]
+    # A wrapper holds a list of objects (or is nothing but a list); an item may have a list-valued field
+    if len(lists) == 1 and (any(isinstance(v, dict) for v in lists[0]) or len(data) == 1):
+        return [item for item in lists[0] if isinstance(item, dict)]
+    return None
+
+
+def _scan_objects(text: str, pos: int) -> Tuple[List[dict], str]:
+    """
+    Collect the objects of a list body starting at `pos`.
+
+    Returns:
+        (objects, how the scan stopped: "closed" at a "]", "end" when the text
+        ran out between objects, "truncated" inside an unterminated object)
+    """
+    items = []
+    while pos < len(text):
+        ch = text[pos]
+        if ch in " \t\r\n,":
+            pos += 1
+            continue
+        if ch == "]":
+            return items, "closed"
+        if ch != "{":
+            # Stray text between objects (comments, ellipses): skip to the next object or the end
+            nxt = min((i for i in (text.find("{", pos), text.find("]", pos)) if i >= 0), default=-1)
+            if nxt < 0:
+                break
+            pos = nxt
+            continue
+        end = _object_end(text, pos)
+        if end < 0:
+            return items, "truncated"
+        obj = _loads(text[pos:end])
+        if isinstance(obj, dict):
+            items.append(obj)
+        pos = end
+    return items, "end"
+
+
+def salvage_json_items(text: str) -> Tuple[List[dict], bool]:
+    """
+    Recover every complete JSON object from a (possibly broken) JSON list.
+
+    Handles markdown fences, prose around the list (brackets in it included),
+    trailing commas, a single object or a run of objects instead of a list,
+    {"items": [...]} wrappers and output cut off mid-item. Objects that still
+    do not parse are skipped.
+
+    Each "[" or "{" is tried in turn as the start of the answer; one that
+    yields no objects (e.g. "[see below]") is passed over.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        (objects in order, True if the list was closed; False means the output
+        was truncated or held no list, and items may be missing)
+    """
+    if not isinstance(text, str):
+        return [], False
+    text = _FENCE_RE.sub("", text).strip()
+    if not text:
+        return [], True
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if isinstance(data, list):
+        return [item for item in data if isinstance(item, dict)], True
+    if isinstance(data, dict):
+        items = _wrapped_items(data)
+        return (items if items is not None else [data]), True
+
+    for match in _CANDIDATE_RE.finditer(text):
+        start = match.start()
+        end = _object_end(text, start)
+        data = _loads(text[start:end]) if end >= 0 else None
+        if isinstance(data, list) and (not data or any(isinstance(item, dict) for item in data)):
+            return [item for item in data if isinstance(item, dict)], True
+        if isinstance(data, dict) and _wrapped_items(data) is not None:
+            return _wrapped_items(data), True
+        # Broken or cut-off list, or bare objects with no list: keep what parses
+        is_list = text[start] == "["
+        items, stop = _scan_objects(text, start + 1 if is_list else start)
+        if items:
+            return items, is_list and stop == "closed"
+    return [], False
+
+
+def validate_items(raw_items: List[dict], default_type: str = "") -> Tuple[List[dict], int]:
+    """
+    Validate salvaged objects against ExtractedItem.
+
+    Returns:
+        (valid items as plain dicts, number of objects rejected)
+    """
+    valid = []
+    rejected = 0
+    for raw in raw_items:
+        try:
+            item = ExtractedItem.model_validate(raw)
+        except ValidationError:
+            rejected += 1
+            continue
+        data = item.model_dump(exclude_none=True)
+        if not data["type"] and default_type:
+            data["type"] = default_type
+        valid.append(data)
+    return valid, rejected
+
+
+def parse_extraction(text: str, default_type: str = "") -> Tuple[List[dict], bool, int]:
+    """
+    Parse one extraction response.
+
+    Returns:
+        (valid items, True if the response was complete, objects rejected by validation)
+    """
+    raw_items, complete = salvage_json_items(text)
+    items, rejected = validate_items(raw_items, default_type)
+    return items, complete, rejected
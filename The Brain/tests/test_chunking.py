@@ -0,0 +1,29 @@
+from utils import count_tokens, split_into_record_chunks
+
+RULE = "-" * 80
+BANNER = "=" * 80 + "\nDOCUMENTS AND EVIDENCE\n" + "=" * 80
+
+
+def _record(name, sentences):
+    body = "\n".join(f"{name} sentence {i} about the keycard log and the lab door." for i in range(sentences))
+    return f"{RULE}\nDOCUMENT: {name}\nType: report\n{RULE}\n{body}"
+
+
+def test_oversized_first_record_carries_the_banner_in_its_first_piece():
+    text = "\n".join([BANNER, _record("SECURITY LOGS", 120), _record("EMAIL THREAD", 10)])
+
+    chunks = split_into_record_chunks(text, 300, 20)
+
+    assert chunks[0].startswith(BANNER)
+    assert "SECURITY LOGS sentence 0 " in chunks[0]
+    assert sum("DOCUMENTS AND EVIDENCE" in chunk for chunk in chunks) == 1
+    assert all(count_tokens(chunk) <= 300 for chunk in chunks)
+    assert all("DOCUMENT: SECURITY LOGS" in chunk for chunk in chunks[:-1])
+
+
+def test_chunks_are_balanced_without_a_small_tail():
+    text = "\n".join(_record(f"DOC {n}", size) for n, size in enumerate((40, 36, 35, 21, 10)))
+    sizes = [count_tokens(chunk) for chunk in split_into_record_chunks(text, 1000)]
+
+    assert len(sizes) == 4
+    assert min(sizes) > max(sizes) / 2
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from hedging import CALL_CANCELLED, CallCancelled, HedgePolicy
+from rate_limit import RateLimiter
+from utils import process_chunk_in_parallel
+
+
+class LoopBoundClient:
+    """Like httpx.AsyncClient: its connection pool belongs to the first event loop that uses it."""
+
+    def __init__(self):
+        self.loop = None
+        self.errors = 0
+
+    async def post(self, text):
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        elif self.loop is not loop:
+            self.errors += 1
+            raise RuntimeError("Event loop is closed")
+        await asyncio.sleep(0.01)
+        return text
+
+
+class SharedClientChain:
+    """A chat-model chain whose sync and async paths share one client per model, as ChatGroq does."""
+
+    def __init__(self, slow_every=0):
+        self.client = LoopBoundClient()
+        self.slow_every = slow_every
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _response(self, input_data):
+        with self._lock:
+            self.calls += 1
+            slow = self.slow_every and self.calls % self.slow_every == 0
+        time.sleep(0.5 if slow else 0.01)
+        return '[{"action": "%s"}]' % input_data["text"]
+
+    def invoke(self, input_data, config=None):
+        return self._response(input_data)
+
+    async def ainvoke(self, input_data, config=None):
+        return await self.client.post(self._response(input_data))
+
+
+def test_sync_chunks_with_deadline_and_hedge_share_one_client():
+    chain = SharedClientChain(slow_every=5)
+    hedge = HedgePolicy(percentile=50, budget=1.0, min_samples=1)
+    chunks = [f"chunk {i}" for i in range(30)]
+
+    items = process_chunk_in_parallel(chunks, chain, {"text": lambda chunk: chunk}, max_workers=8,
+                                      retries=1, deadline=5, hedge=hedge)
+
+    assert [item["action"] for item in items] == chunks
+    assert chain.client.errors == 0
+    assert hedge.hedges > 0
+
+
+def test_abandoned_call_is_dropped_before_it_is_sent():
+    limiter = RateLimiter(600, 100000)
+    cancelled = threading.Event()
+    cancelled.set()
+    sent = []
+
+    def attempt():
+        CALL_CANCELLED.set(cancelled)
+        return limiter.call(lambda: sent.append(1), "prompt")
+
+    with pytest.raises(CallCancelled):
+        attempt()
+    assert not sent
+    assert limiter.concurrency.in_flight == 0
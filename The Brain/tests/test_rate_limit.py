@@ -0,0 +1,35 @@
+import asyncio
+import time
+
+from rate_limit import AdaptiveConcurrency, RateLimiter
+from utils import count_tokens
+
+
+def test_async_waiters_are_woken_on_release_and_survive_cancellation():
+    async def run():
+        limit = AdaptiveConcurrency(initial=2, maximum=2)
+
+        async def job():
+            await limit.aacquire()
+            await asyncio.sleep(0.01)
+            limit.release(latency=0.01)
+
+        start = time.monotonic()
+        tasks = [asyncio.create_task(job()) for _ in range(40)]
+        await asyncio.sleep(0.005)
+        for task in tasks[10:15]:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return time.monotonic() - start, limit
+
+    elapsed, limit = asyncio.run(run())
+    # 35 jobs of 10ms, two at a time; polling every 50ms took ~0.9s
+    assert elapsed < 0.5
+    assert limit.in_flight == 0
+
+
+def test_reservations_use_the_chunkers_token_count():
+    limiter = RateLimiter(600, 100000, completion_tokens=0)
+    prompt = "Marcus Reid swiped his keycard at 21:45 ---------------- " * 20
+    estimate, _ = limiter._reserve(prompt)
+    assert estimate == count_tokens(prompt)
@@ -0,0 +1,403 @@
+"""Deterministic, LLM-free timeline construction from extracted forensic items."""
+
+import math
+import re
+from collections.abc import Mapping
+from datetime import date
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+
+# Offsets in minutes east of UTC for the abbreviations that show up in case files
+TIMEZONE_OFFSETS = {
+    "UTC": 0, "GMT": 0, "Z": 0,
+    "EST": -300, "EDT": -240, "CST": -360, "CDT": -300,
+    "MST": -420, "MDT": -360, "PST": -480, "PDT": -420,
+    "BST": 60, "CET": 60, "CEST": 120, "IST": 330, "PKT": 300, "JST": 540,
+}
+
+_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+_CLOCK_RE = re.compile(
+    r"(?<![\d:])(\d{1,2})(?::(\d{2}))?(?::\d{2})?(?:\s*([ap])\.?(?:m\.?)?(?![a-z]))?",
+    re.IGNORECASE
+)
+# "UTC+5", "GMT-03:30" or a bare "+05:30"; a bare "-HH:MM" is read as a range, not an offset
+_OFFSET_RE = re.compile(
+    r"\b(?:UTC|GMT)\s*([+-])(\d{1,2})(?::?(\d{2}))?|(?<!\S)(\+)(\d{2}):?(\d{2})\b",
+    re.IGNORECASE
+)
+_TZ_NAME_RE = re.compile(r"\b(" + "|".join(sorted(TIMEZONE_OFFSETS, key=len, reverse=True)) + r")\b")
+# ISO "21:00:00Z": "Z" straight after the digits, where \b never matches
+_ZULU_RE = re.compile(r"(?<=\d)Z\b")
+_MERIDIEM_RE = re.compile(r"\d\s*[ap]\.?m\b", re.IGNORECASE)
+# Context that makes a bare number ("around 9", "9 to 10 PM", "9 (approx)") an hour, unlike "Room 12"
+_BARE_BEFORE_RE = re.compile(
+    r"(?:\b(?:at|around|about|circa|approx\.?|approximately|roughly|by|from|between|until|till|before|after)|~)\s*$",
+    re.IGNORECASE
+)
+_BARE_AFTER_RE = re.compile(r"^\s*(?:(?:-|\u2013|to|and|until|till)\s*\d|\(?\s*(?:approx|ish|\?))", re.IGNORECASE)
+_APPROX_RE = re.compile(r"approx|around|about|circa|~|roughly|\?", re.IGNORECASE)
+_WS_RE = re.compile(r"\s+")
+
+
+class ParsedTime(NamedTuple):
+    """A normalised time: [start, end] in minutes, plus parsing metadata."""
+    start: int
+    end: int
+    day: Optional[int]       # proleptic ordinal of the date, if one was given
+    tz_offset: Optional[int]  # minutes east of UTC, if a timezone was given
+    approx: bool
+
+
+class TimelineEvent(NamedTuple):
+    """One extracted item placed on the timeline."""
+    start: int
+    end: int
+    approx: bool
+    entity: str
+    action: str
+    location: str
+    type: str
+    raw_time: str
+
+
+class Gap(NamedTuple):
+    """A period with no recorded activity for an entity."""
+    entity: str
+    start: int
+    end: int
+    severity: str
+
+
+def _clock_minutes(hour: int, minute: int, meridiem: Optional[str]) -> Optional[int]:
+    if meridiem:
+        meridiem = meridiem.lower()
+        if not 1 <= hour <= 12:
+            return None
+        if meridiem == "p" and hour != 12:
+            hour += 12
+        elif meridiem == "a" and hour == 12:
+            hour = 0
+    if hour > 24 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+@lru_cache(maxsize=8192)
+def parse_time(text: str) -> Optional[ParsedTime]:
+    """
+    Normalise an extracted time string into a sortable interval.
+
+    Handles "21:00", "9:15 PM", "21:00 (Approx)", "around 9 pm", ranges such as
+    "21:45-22:15" or "between 21:45 and 22:15", ISO dates ("2024-01-15 21:00")
+    and timezones ("21:00 EST", "21:00 UTC+5", "21:00 +05:30").
+
+    Args:
+        text: Time string as produced by the extraction prompt
+
+    Returns:
+        ParsedTime, or None if no clock time could be found
+    """
+    if not text:
+        return None
+    text = str(text)
+
+    day = None
+    date_match = _DATE_RE.search(text)
+    if date_match:
+        try:
+            day = date(*map(int, date_match.groups())).toordinal()
+        except ValueError:
+            day = None
+        text_wo_date = text[:date_match.start()] + " " + text[date_match.end():]
+    else:
+        text_wo_date = text
+
+    tz_offset = None
+    offset_match = _OFFSET_RE.search(text_wo_date)
+    if offset_match:
+        sign, hours, minutes = offset_match.group(1, 2, 3) if offset_match.group(1) else offset_match.group(4, 5, 6)
+        tz_offset = (-1 if sign == "-" else 1) * (int(hours) * 60 + int(minutes or 0))
+        text_wo_date = text_wo_date[:offset_match.start()] + " " + text_wo_date[offset_match.end():]
+    else:
+        tz_name = _TZ_NAME_RE.search(text_wo_date)
+        if tz_name:
+            tz_offset = TIMEZONE_OFFSETS[tz_name.group(1)]
+        elif _ZULU_RE.search(text_wo_date):
+            tz_offset = 0
+
+    approx = bool(_APPROX_RE.search(text_wo_date))
+    # A bare number ("9") only counts as a time alongside am/pm or "around",
+    # and only where the words next to it make it an hour
+    allow_bare = approx or bool(_MERIDIEM_RE.search(text_wo_date))
+    clocks = []
+    for match in _CLOCK_RE.finditer(text_wo_date):
+        hour, minute, meridiem = match.group(1), match.group(2), match.group(3)
+        if minute is None and meridiem is None and not (
+            allow_bare
+            and (_BARE_BEFORE_RE.search(text_wo_date, 0, match.start())
+                 or _BARE_AFTER_RE.match(text_wo_date[match.end():]))
+        ):
+            continue
+        minutes = _clock_minutes(int(hour), int(minute or 0), meridiem)
+        if minutes is not None:
+            clocks.append((minutes, meridiem))
+        if len(clocks) == 2:
+            break
+    if not clocks:
+        return None
+
+    # "9 to 10 PM": a trailing meridiem applies to an unqualified first clock
+    if len(clocks) == 2 and clocks[0][1] is None and clocks[1][1] and clocks[1][1].lower() == "p":
+        first = clocks[0][0]
+        if first < 12 * 60 and first + 12 * 60 <= clocks[1][0]:
+            clocks[0] = (first + 12 * 60, "p")
+
+    start = clocks[0][0]
+    end = clocks[1][0] if len(clocks) == 2 else start
+    if end < start:
+        end += MINUTES_PER_DAY
+    return ParsedTime(start, end, day, tz_offset, approx)
+
+
+@lru_cache(maxsize=65536)
+def _normalise_key(value: str) -> str:
+    return _WS_RE.sub(" ", value).strip().lower()
+
+
+class TimeAxis:
+    """
+    Common minute axis for a set of parsed times.
+
+    Dated times are laid out across days relative to the earliest date; undated
+    times are assumed to share the most common date. If any time carries a
+    timezone, everything is converted to UTC, with untagged times assumed to be
+    in the most common timezone.
+    """
+
+    def __init__(self, parsed_times: list):
+        days = {}
+        zones = {}
+        for pt in parsed_times:
+            if pt.day is not None:
+                days[pt.day] = days.get(pt.day, 0) + 1
+            if pt.tz_offset is not None:
+                zones[pt.tz_offset] = zones.get(pt.tz_offset, 0) + 1
+        self.base_day = min(days) if days else None
+        self.default_day = max(days, key=days.get) if days else None
+        self.default_tz = max(zones, key=zones.get) if zones else None
+
+    def place(self, pt: ParsedTime) -> Tuple[int, int]:
+        """Return (start, end) of `pt` on this axis."""
+        shift = 0
+        if self.base_day is not None:
+            shift += ((pt.day if pt.day is not None else self.default_day) - self.base_day) * MINUTES_PER_DAY
+        if self.default_tz is not None:
+            shift -= pt.tz_offset if pt.tz_offset is not None else self.default_tz
+        return pt.start + shift, pt.end + shift
+
+
+def normalise_events(items: list) -> Tuple[List[TimelineEvent], list, TimeAxis]:
+    """
+    Place extracted items on a common minute axis (see TimeAxis).
+
+    Args:
+        items: Dicts with time/entity/action/location/type keys
+
+    Returns:
+        (sorted timed events, items whose time could not be parsed, the axis used)
+    """
+    parsed = []
+    untimed = []
+    for item in items:
+        if not isinstance(item, Mapping):
+            continue
+        pt = parse_time(str(item.get("time") or ""))
+        if pt is None:
+            untimed.append(item)
+        else:
+            parsed.append((pt, item))
+
+    axis = TimeAxis([pt for pt, _ in parsed])
+    placed = {}
+    events = []
+    new_event = tuple.__new__  # skips NamedTuple.__new__ overhead on large cases
+    for pt, item in parsed:
+        span = placed.get(pt)
+        if span is None:
+            span = placed[pt] = axis.place(pt)
+        events.append(new_event(TimelineEvent, (
+            span[0], span[1], pt.approx,
+            str(item.get("entity", "Unknown")).strip(),
+            str(item.get("action", "")).strip(),
+            str(item.get("location", "")).strip(),
+            str(item.get("type", "")).strip().upper(),
+            str(item.get("time", "")),
+        )))
+
+    events.sort(key=lambda e: (e[0], e[1], e[6] != "FACTS", _normalise_key(e[3])))
+    return events, untimed, axis
+
+
+def dedupe_events(events: List[TimelineEvent]) -> List[TimelineEvent]:
+    """Drop repeated (time, entity, action) events, keeping the first (FACTS sort first)."""
+    seen = set()
+    unique = []
+    for event in events:
+        key = (event[0], event[1], _normalise_key(event[3]), _normalise_key(event[4]))
+        if key not in seen:
+            seen.add(key)
+            unique.append(event)
+    return unique
+
+
+def _gap_severity(start: int, end: int, critical: Optional[Tuple[int, int]]) -> str:
+    if critical is not None and start < critical[1] and end > critical[0]:
+        return "EXTREME"
+    length = end - start
+    if length >= 240:
+        return "HIGH"
+    if length >= 90:
+        return "MEDIUM"
+    return "LOW"
+
+
+def find_gaps(events: List[TimelineEvent], gap_minutes: int = 30,
+              critical_window: Optional[Tuple[int, int]] = None) -> List[Gap]:
+    """
+    Find per-entity periods longer than `gap_minutes` with no recorded activity.
+
+    Events are swept in start order per entity while tracking the furthest end
+    seen so far, so overlapping and nested intervals never produce false gaps.
+
+    Args:
+        events: Events sorted by start
+        gap_minutes: Minimum silence to report
+        critical_window: Optional (start, end) minutes; gaps overlapping it are EXTREME
+
+    Returns:
+        Gaps ordered by entity, then time
+    """
+    covered_until = {}
+    gaps = []
+    for event in events:
+        key = _normalise_key(event.entity)
+        if key in ("", "unknown"):
+            continue
+        until = covered_until.get(key)
+        if until is not None and event.start - until > gap_minutes:
+            gaps.append(Gap(event.entity, until, event.start,
+                            _gap_severity(until, event.start, critical_window)))
+            until = None
+        covered_until[key] = event.end if until is None or event.end > until else until
+    gaps.sort(key=lambda g: (g.entity.lower(), g.start))
+    return gaps
+
+
+def format_minutes(minutes: int, with_day: bool = False) -> str:
+    """Render minutes on the timeline axis as HH:MM, prefixed with a day offset if needed."""
+    day, minute_of_day = divmod(minutes, MINUTES_PER_DAY)
+    clock = f"{minute_of_day // 60:02d}:{minute_of_day % 60:02d}"
+    if with_day and day:
+        return f"D{day:+d} {clock}"
+    return clock
+
+
+def render_timeline(events: List[TimelineEvent], gaps: List[Gap], untimed: list = ()) -> str:
+    """Render the timeline in the same layout the Timeline Architect prompt asks for."""
+    with_day = any(e.end >= MINUTES_PER_DAY or e.start < 0 for e in events)
+    lines = []
+    for e in events:
+        stamp = format_minutes(e.start, with_day)
+        if e.end != e.start:
+            stamp += "-" + format_minutes(e.end, with_day)
+        if e.approx:
+            stamp += " approx"
+        lines.append(f"[{stamp}] [{e.type or 'UNKNOWN'}] [{e.entity}] - {e.action} - {e.location or 'Unknown'}")
+
+    for item in untimed:
+        lines.append(
+            f"[??:??] [{str(item.get('type', 'UNKNOWN')).upper()}] [{item.get('entity', 'Unknown')}]"
+            f" - {item.get('action', '')} - {item.get('location') or 'Unknown'} (time: {item.get('time', 'N/A')})"
+        )
+
+    lines.append("")
+    lines.append("[GAPS DETECTED]:")
+    if not gaps:
+        lines.append("- None")
+    for g in gaps:
+        lines.append(
+            f"- {g.entity}: No activity between {format_minutes(g.start, with_day)} and "
+            f"{format_minutes(g.end, with_day)}. Severity: {g.severity}"
+        )
+    return "\n".join(lines)
+
+
+def build_timeline(facts: list, claims: list, gap_minutes: int = 30,
+                   critical_window: Optional[str] = None) -> str:
+    """
+    Merge FACTS and CLAIMS into a sorted, de-duplicated timeline with gap flags.
+
+    Args:
+        facts: Extracted FACT items
+        claims: Extracted CLAIM items
+        gap_minutes: Minimum per-entity silence to flag
+        critical_window: Optional time string (e.g. time of death) whose interval marks gaps EXTREME
+
+    Returns:
+        Timeline text in "[HH:MM] [TYPE] [Entity] - [Action] - [Location]" form
+    """
+    events, untimed, axis = normalise_events(list(facts) + list(claims))
+    events = dedupe_events(events)
+
+    window = None
+    if critical_window:
+        pt = parse_time(critical_window)
+        if pt is not None:
+            window = axis.place(pt)
+
+    return render_timeline(events, find_gaps(events, gap_minutes, window), untimed)
+
+
+def split_timeline_windows(timeline: str, max_tokens: int, length_function=len) -> Tuple[List[str], str]:
+    """
+    Partition a rendered timeline into consecutive time windows for parallel phrasing.
+
+    Windows are cut only where the timestamp changes, so events at the same
+    time (a CLAIM next to the FACT it conflicts with) always share a window.
+    The number of windows is derived from the total size, and lines are
+    spread evenly across them.
+
+    Args:
+        timeline: Output of build_timeline
+        max_tokens: Size budget per window, measured by `length_function`
+        length_function: e.g. utils.count_tokens; characters by default
+
+    Returns:
+        (window texts in time order, the "[GAPS DETECTED]:" section)
+    """
+    body, marker, gaps = timeline.partition("[GAPS DETECTED]:")
+    groups = []
+    for line in body.strip("\n").split("\n") if body.strip() else []:
+        stamp = line.split("]", 1)[0]
+        if groups and groups[-1][0] == stamp:
+            groups[-1][1].append(line)
+        else:
+            groups.append((stamp, [line]))
+
+    sized = [(lines, sum(length_function(line) + 1 for line in lines)) for _, lines in groups]
+    total = sum(size for _, size in sized)
+    target = total / max(1, math.ceil(total / max_tokens))
+    windows = []
+    current = []
+    size = 0
+    for lines, group_size in sized:
+        if current and (size + group_size > max_tokens or size >= target):
+            windows.append("\n".join(current))
+            current, size = [], 0
+        current.extend(lines)
+        size += group_size
+    if current:
+        windows.append("\n".join(current))
+    return windows, marker + gaps
@@ -0,0 +1,178 @@
+"""Per-phase and per-chunk tracing with JSON-lines and Chrome trace-event export."""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """One timed operation: a pipeline phase or a single chunk call."""
+
+    def __init__(self, name: str, category: str, tid=None, **attrs):
+        self.name = name
+        self.category = category
+        self.tid = tid if tid is not None else threading.get_ident()
+        self.start = time.perf_counter()
+        self.end = None
+        self.attrs = dict(attrs)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def add(self, key: str, amount=1) -> None:
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    def callbacks(self) -> list:
+        """LangChain callbacks that attach token usage and model name to this span."""
+        return [_usage_handler_class()(self)]
+
+
+@lru_cache(maxsize=None)
+def _usage_handler_class():
+    # Defined on first use so that importing tracing does not load LangChain
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class _UsageHandler(BaseCallbackHandler):
+        """Copies token usage from LLM results onto a span."""
+
+        def __init__(self, span: Span):
+            self.span = span
+
+        def on_llm_end(self, response, **kwargs) -> None:
+            prompt = completion = 0
+            model = None
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    usage = getattr(message, "usage_metadata", None) or {}
+                    prompt += usage.get("input_tokens", 0)
+                    completion += usage.get("output_tokens", 0)
+                    metadata = getattr(message, "response_metadata", None) or {}
+                    model = model or metadata.get("model_name")
+            llm_output = response.llm_output or {}
+            if not (prompt or completion):
+                token_usage = llm_output.get("token_usage") or {}
+                prompt = token_usage.get("prompt_tokens", 0)
+                completion = token_usage.get("completion_tokens", 0)
+            self.span.add("prompt_tokens", prompt)
+            self.span.add("completion_tokens", completion)
+            model = model or llm_output.get("model_name")
+            if model:
+                self.span.set(model=model)
+
+    return _UsageHandler
+
+
+class Tracer:
+    """Collects spans from all threads and coroutines of a run."""
+
+    def __init__(self):
+        self.spans = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans = []
+            self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, category: str = "phase", tid=None, **attrs):
+        """Time the enclosed block; exceptions are recorded on the span and re-raised."""
+        span = Span(name, category, tid, **attrs)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            span.end = time.perf_counter()
+            with self._lock:
+                self.spans.append(span)
+
+    def records(self) -> list:
+        """Finished spans as plain dicts (name, category, start, duration, tid and attributes), by start time."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        return [{
+            "name": s.name,
+            "category": s.category,
+            "start": round(s.start - self._origin, 6),
+            "duration": round(s.duration, 6),
+            "tid": s.tid,
+            **s.attrs,
+        } for s in spans]
+
+    def export_jsonl(self, path) -> None:
+        """Write one JSON object per span."""
+        with open(path, "w", encoding="utf-8") as f:
+            for record in self.records():
+                f.write(json.dumps(record) + "\n")
+
+    def export_chrome(self, path) -> None:
+        """Write a Chrome trace-event file (chrome://tracing, Perfetto, speedscope)."""
+        pid = os.getpid()
+        events = []
+        lanes = {}
+        for record in self.records():
+            # Trace viewers want integer thread ids; named lanes get a metadata event
+            tid = lanes.get(record["tid"])
+            if tid is None:
+                tid = lanes[record["tid"]] = len(lanes) + 1
+                events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                               "args": {"name": str(record["tid"])}})
+            args = {k: v for k, v in record.items() if k not in ("name", "category", "start", "duration", "tid")}
+            events.append({
+                "name": record["name"],
+                "cat": record["category"],
+                "ph": "X",
+                "ts": record["start"] * 1e6,
+                "dur": record["duration"] * 1e6,
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            })
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def summary(self) -> str:
+        """Plain-text table: one row per phase, plus chunk-call aggregates per phase."""
+        records = self.records()
+        phases = [r for r in records if r["category"] == "phase"]
+        calls = [r for r in records if r["category"] in ("chunk", "llm")]
+
+        lines = [
+            f"{'PHASE':<24}{'WALL':>9}{'CALLS':>7}{'P50':>8}{'MAX':>8}{'WAIT':>8}"
+            f"{'RETRY':>7}{'BACKOFF':>9}{'TOK IN':>9}{'TOK OUT':>9}",
+            "-" * 98,
+        ]
+        for phase in phases:
+            end = phase["start"] + phase["duration"]
+            phase_calls = [c for c in calls
+                           if c.get("phase") == phase["name"] and phase["start"] <= c["start"] <= end]
+            durations = sorted(c["duration"] for c in phase_calls)
+            p50 = durations[len(durations) // 2] if durations else 0.0
+            lines.append(
+                f"{phase['name']:<24}{phase['duration']:>8.2f}s{len(phase_calls):>7}"
+                f"{p50:>7.2f}s{(durations[-1] if durations else 0.0):>7.2f}s"
+                f"{sum(c.get('queue_wait', 0.0) for c in phase_calls):>7.2f}s"
+                f"{sum(c.get('retries', 0) for c in phase_calls):>7}"
+                f"{sum(c.get('backoff', 0.0) for c in phase_calls):>8.1f}s"
+                f"{phase.get('prompt_tokens', 0) + sum(c.get('prompt_tokens', 0) for c in phase_calls):>9}"
+                f"{phase.get('completion_tokens', 0) + sum(c.get('completion_tokens', 0) for c in phase_calls):>9}"
+            )
+        return "\n".join(lines)
+
+
+# Process-wide tracer used by engine.py and utils.py
+TRACER = Tracer()
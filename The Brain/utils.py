@@ -1,20 +1,47 @@
 """Utility functions for LangChain operations and text processing."""
 
+import asyncio
+import contextvars
+import heapq
+import itertools
 import json
 import logging
+import math
+import os
+import re
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import os
+from functools import lru_cache
 
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from cache import make_cache_key
+from hedging import ThreadSlots, acall_with_deadline, call_with_deadline
+from tracing import TRACER
 
 logger = logging.getLogger(__name__)
 
+# Scheduling keys read by PrioritySemaphore (lower is served first). The engine
+# sets CALL_STAGE per pipeline phase so later phases of started cases jump ahead
+# of new extraction work; batch runs set CASE_PRIORITY per case.
+CALL_STAGE = contextvars.ContextVar("call_stage", default=3)
+CASE_PRIORITY = contextvars.ContextVar("case_priority", default=0)
+
+# Offline token estimate: short words, 3-digit groups and punctuation marks are
+# about one token each, as with the Llama 3 / tiktoken-style tokenizers, which
+# also merge a run of one repeated mark (a "-----" rule) into ~16-character tokens
+_TOKEN_ESTIMATE_RE = re.compile(r"[A-Za-z]{1,6}|\d{1,3}|([^\sA-Za-z\d])\1{0,15}")
+# Section rule drawn by detective_data_loader around each document/interview header
+_RECORD_RULE_RE = re.compile(r"^-{20,}\s*$")
+_RECORD_HEADER_MAX_LINES = 8
+# Largest share of a chunk's budget a header repeated on every piece may take
+_RECORD_HEADER_MAX_SHARE = 0.25
+
 
 def build_chain(system_prompt: str, template: str, llm):
     """Build a LangChain chain from system prompt and template."""
+    # Imported here so that importing the engine stays cheap
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
     prompt = ChatPromptTemplate.from_messages([
         ("system", system_prompt),
         ("human", template)
@@ -31,6 +58,8 @@ def clean_llm_output(text: str) -> str:
 
 def split_text_into_chunks(text: str, chunk_size: int, chunk_overlap: int, separators: list) -> list:
     """Split text into chunks using RecursiveCharacterTextSplitter."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
@@ -39,6 +68,169 @@ def split_text_into_chunks(text: str, chunk_size: int, chunk_overlap: int, separ
     return splitter.split_text(text)
 
 
+@lru_cache(maxsize=1)
+def _token_encoder():
+    # Optional: tiktoken's cl100k_base is close to the Llama 3 tokenizer; it may be
+    # missing or unable to fetch its vocabulary offline, so fall back to an estimate
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Number of model tokens in `text` (tiktoken when available, otherwise a close estimate)."""
+    encoder = _token_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return len(_TOKEN_ESTIMATE_RE.findall(text))
+
+
+def split_records(text: str) -> list:
+    """
+    Split formatted case text into records (one document or interview each).
+
+    A record starts at a header block (a dashed rule, a few header lines and
+    another rule, as written by detective_data_loader) and runs until the next
+    one. Any preamble is kept with the first record. Text without header
+    blocks is a single record.
+    """
+    lines = text.split("\n")
+    rules = [i for i, line in enumerate(lines) if _RECORD_RULE_RE.match(line)]
+    starts = []
+    k = 0
+    while k < len(rules) - 1:
+        if rules[k + 1] - rules[k] <= _RECORD_HEADER_MAX_LINES:
+            starts.append(rules[k])
+            k += 2
+        else:
+            k += 1
+    if not starts:
+        return [text] if text.strip() else []
+
+    bounds = starts + [len(lines)]
+    records = ["\n".join(lines[a:b]) for a, b in zip(bounds, bounds[1:])]
+    preamble = "\n".join(lines[:starts[0]])
+    if preamble.strip():
+        records[0] = preamble + "\n" + records[0]
+    return records
+
+
+def _split_record_header(record: str) -> tuple:
+    """
+    Split a record into (preamble, header, body).
+
+    The header is the header block through its closing rule; the preamble is
+    anything before it (the "====" section banner kept with the first
+    record). Without a header block, the whole record is the body.
+    """
+    lines = record.split("\n")
+    rules = [i for i, line in enumerate(lines) if _RECORD_RULE_RE.match(line)]
+    if len(rules) >= 2 and rules[1] - rules[0] <= _RECORD_HEADER_MAX_LINES:
+        return ("\n".join(lines[:rules[0]]), "\n".join(lines[rules[0]:rules[1] + 1]) + "\n",
+                "\n".join(lines[rules[1] + 1:]))
+    return "", "", record
+
+
+def _repeated_header(header: str, limit: int) -> str:
+    """`header` to repeat on continuation pieces: whole, cut to its title line, or "" if even that exceeds `limit` tokens."""
+    if count_tokens(header) <= limit:
+        return header
+    lines = header.split("\n")
+    title = f"{lines[0]}\n{lines[1]}\n{lines[0]}\n" if len(lines) > 2 else ""
+    return title if title and count_tokens(title) <= limit else ""
+
+
+def split_into_record_chunks(text: str, chunk_tokens: int, overlap_tokens: int = 0,
+                             separators: list = None) -> list:
+    """
+    Pack whole records into chunks of at most `chunk_tokens` tokens.
+
+    Records are never split unless a single record exceeds the budget; such a
+    record is cut at `separators` (with `overlap_tokens` of overlap) and every
+    piece repeats the record's header, so each chunk knows which document or
+    interview it is reading. A header taking more than a quarter of the budget
+    is cut to its title line (or not repeated), and a section banner before
+    it is never repeated (it opens the first piece). Chunks are balanced: as
+    few as the budget allows, with the largest as small as possible, so the
+    spare room is spread over the chunks instead of left as a small tail.
+
+    Args:
+        text: Formatted case text (e.g. get_documents_text())
+        chunk_tokens: Token budget per chunk
+        overlap_tokens: Overlap between the pieces of an oversized record
+        separators: Split points for oversized records, coarsest first
+
+    Returns:
+        List of chunk strings in document order
+    """
+    pieces = []
+    for record in split_records(text):
+        tokens = count_tokens(record)
+        if tokens <= chunk_tokens:
+            pieces.append((record, tokens))
+            continue
+
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        preamble, header, body = _split_record_header(record)
+        # The banner rides on the first piece rather than costing a call of its own
+        preamble = f"{preamble}\n" if preamble.strip() else ""
+        repeated = _repeated_header(header, int(chunk_tokens * _RECORD_HEADER_MAX_SHARE))
+        budget = max(1, chunk_tokens - count_tokens(repeated) - count_tokens(preamble) - 4)
+        # The first piece carries the full header; a header too long to repeat is split with the body
+        lead, body = (header, body) if repeated == header else ("", header + body)
+        # Aim for even pieces (with some slack for separators) rather than full ones and a
+        # scrap, unless separators fall so that this takes more pieces than filling them
+        overlap = min(overlap_tokens, budget // 2)
+        body_tokens = count_tokens(body)
+        parts = math.ceil(body_tokens / max(1, budget - overlap))
+        splits = None
+        for size in (min(budget, math.ceil(body_tokens / parts * 1.1) + overlap), budget):
+            splitter = RecursiveCharacterTextSplitter(
+                chunk_size=size,
+                chunk_overlap=overlap,
+                separators=separators or ["\n\n", "\n", ".", " ", ""],
+                length_function=count_tokens,
+            )
+            candidate = splitter.split_text(body)
+            if splits is None or len(candidate) < len(splits):
+                splits = candidate
+        for n, part in enumerate(splits):
+            piece = f"{repeated}(continued)\n{part}" if n else f"{preamble}{lead}{part}"
+            pieces.append((piece, count_tokens(piece)))
+
+    sizes = [tokens for _, tokens in pieces]
+    # Fewest chunks the budget allows, then the smallest cap that still fits them in that many
+    low = max(sizes, default=0)
+    high = max(chunk_tokens, low)
+    count = len(_pack_sizes(sizes, high))
+    while low < high:
+        cap = (low + high) // 2
+        if len(_pack_sizes(sizes, cap)) <= count:
+            high = cap
+        else:
+            low = cap + 1
+    return ["\n".join(piece for piece, _ in pieces[a:b]) for a, b in _pack_sizes(sizes, high)]
+
+
+def _pack_sizes(sizes: list, cap: int) -> list:
+    """Greedy (start, end) ranges of consecutive `sizes`, each summing to at most `cap`."""
+    ranges = []
+    start = 0
+    total = 0
+    for n, size in enumerate(sizes):
+        if n > start and total + size > cap:
+            ranges.append((start, n))
+            start, total = n, 0
+        total += size
+    if start < len(sizes):
+        ranges.append((start, len(sizes)))
+    return ranges
+    return chunks
+
+
 def invoke_chain_with_retry(chain, input_data: dict, max_retries: int = 3) -> str:
     """Invoke a chain with exponential backoff retry logic."""
     attempt = 0
@@ -54,12 +246,133 @@ def invoke_chain_with_retry(chain, input_data: dict, max_retries: int = 3) -> st
     return "[]"
 
 
+async def aretry(call, retries: int = 3, span=None, can_retry=None):
+    """
+    Await `call()` with up to `retries` attempts and exponential backoff between them.
+
+    Args:
+        call: Zero-argument function returning an awaitable
+        retries: Maximum number of attempts
+        span: Optional trace span on which "retries" and "backoff" are counted
+        can_retry: Optional callable(); when it returns False the failure is
+            re-raised at once (e.g. part of a streamed answer was already shown)
+
+    Raises:
+        The last error once the attempts are used up
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return await call()
+        except Exception as e:
+            if attempt >= retries or (can_retry is not None and not can_retry()):
+                raise
+            backoff = 1.5 ** attempt
+            logger.warning("Attempt %d failed: %s. Backing off %.1fs", attempt, e, backoff)
+            if span is not None:
+                span.add("retries")
+                span.add("backoff", backoff)
+            await asyncio.sleep(backoff)
+
+
+def build_chunk_input(input_key_mapping: dict, chunk_text: str) -> dict:
+    """Build chain input for one chunk from a mapping of keys to values (or functions of the chunk)."""
+    input_data = {}
+    for key, value in input_key_mapping.items():
+        if callable(value):
+            input_data[key] = value(chunk_text)
+        else:
+            input_data[key] = value
+    return input_data
+
+
+def parse_json_list(text: str):
+    """
+    Strict chunk parser: the whole response must be a JSON list.
+
+    Returns:
+        (items, complete, rejected) like structured.parse_extraction; raises
+        on malformed JSON so the chunk is retried
+    """
+    cleaned = clean_llm_output(text)
+    parsed = json.loads(cleaned) if cleaned else []
+    if not isinstance(parsed, list):
+        logger.warning("Parsed non-list result")
+        return [], True, 0
+    return parsed, True, 0
+
+
+class _ChunkAttempts:
+    """
+    Parse state of one chunk across its LLM calls.
+
+    Items salvaged from a truncated answer are kept; when `reask` is given the
+    next call asks only for the items after them instead of the whole chunk
+    again. An answer with nothing usable in it is retried in full.
+    """
+
+    def __init__(self, idx, chunk_text, input_key_mapping, parse, reask, span):
+        self.idx = idx
+        self.chunk_text = chunk_text
+        self.input_key_mapping = input_key_mapping
+        self.parse = parse or parse_json_list
+        self.reask = reask
+        self.span = span
+        self.items = []
+        self.complete = False
+        self._tail = False
+
+    def request(self) -> dict:
+        text = self.reask(self.chunk_text, self.items) if self._tail else self.chunk_text
+        return build_chunk_input(self.input_key_mapping, text)
+
+    def accept(self, result, attempt: int) -> bool:
+        """Take one response; True when the chunk is done. Parse errors propagate."""
+        items, complete, rejected = self.parse(result)
+        if rejected:
+            self.span.add("rejected", rejected)
+        if not items and not complete:
+            logger.warning("Chunk %d: no usable items in response, attempt %d", self.idx + 1, attempt)
+            self.span.add("retries")
+            return False
+        self.items.extend(items)
+        if complete:
+            self.complete = True
+            logger.debug("Chunk %d: parsed %d items (attempt %d)", self.idx + 1, len(self.items), attempt)
+            return True
+        self.span.add("salvaged", len(items))
+        if self.reask is None:
+            logger.warning("Chunk %d: truncated response, kept %d items", self.idx + 1, len(self.items))
+            return True
+        logger.info("Chunk %d: truncated after %d items, asking for the rest", self.idx + 1, len(self.items))
+        self.span.add("reasks")
+        self._tail = True
+        return False
+
+    def result(self, cache, cache_key) -> list:
+        # Partial results are returned but never cached, so a later run tries again
+        if self.complete and cache_key is not None:
+            cache.put(cache_key, self.items)
+        elif not self.complete and not self.items:
+            logger.error("Chunk %d: failed after all attempts", self.idx + 1)
+        return self.items
+
+
 def process_chunk_in_parallel(
     chunks: list,
     chain,
     input_key_mapping: dict,
     max_workers: int = 6,
-    retries: int = 3
+    retries: int = 3,
+    cache=None,
+    cache_namespace: tuple = (),
+    trace_phase: str = "extract",
+    merge=None,
+    parse=None,
+    reask=None,
+    deadline=None,
+    hedge=None
 ) -> list:
     """
     Process multiple chunks in parallel using ThreadPoolExecutor.
@@ -70,54 +383,369 @@ def process_chunk_in_parallel(
         input_key_mapping: Dict mapping chain input keys to values (or functions that take chunk)
         max_workers: Max concurrent workers
         retries: Number of retries per chunk
+        cache: Optional ExtractionCache; chunks with a cached result skip the LLM call
+        cache_namespace: Strings (data type, prompt, model) hashed with each chunk into its cache key
+        trace_phase: Phase name recorded on each chunk's trace span
+        merge: Optional callable(per-chunk results, chunks) -> list, e.g.
+            merge.merge_chunk_items; by default results are concatenated
+        parse: Optional callable(response) -> (items, complete, rejected), e.g.
+            structured.parse_extraction; by default the response must be a JSON list
+        reask: Optional callable(chunk_text, items so far) -> text sent instead of
+            the chunk when a response was cut off; without it partial items are kept
+        deadline: Seconds before a single call is abandoned and retried (None: no limit)
+        hedge: Optional hedging.HedgePolicy; a call slower than its percentile
+            latency gets a duplicate request, if fewer than `max_workers` calls
+            are in flight, and the first answer wins
     
     Returns:
-        List of parsed JSON results from all chunks
+        List of parsed JSON results from all chunks, in chunk order
     """
-    def _process_chunk(idx, chunk_text):
+    def _process_chunk(idx, chunk_text, submitted):
+        with TRACER.span(f"{trace_phase} chunk {idx + 1}", "chunk", phase=trace_phase,
+                         queue_wait=time.perf_counter() - submitted) as span:
+            return _attempt_chunk(idx, chunk_text, span)
+
+    def _attempt_chunk(idx, chunk_text, span):
+        cache_key = None
+        if cache is not None:
+            cache_key = make_cache_key(chunk_text, *cache_namespace)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Chunk %d: cache hit", idx + 1)
+                span.set(cache_hit=True)
+                return cached
+
+        state = _ChunkAttempts(idx, chunk_text, input_key_mapping, parse, reask, span)
         attempt = 0
         while attempt < retries:
             attempt += 1
             try:
-                # Build input data from mapping
-                input_data = {}
-                for key, value in input_key_mapping.items():
-                    if callable(value):
-                        input_data[key] = value(chunk_text)
-                    else:
-                        input_data[key] = value
-                
-                result = chain.invoke(input_data)
-                cleaned = clean_llm_output(result)
-                parsed = json.loads(cleaned) if cleaned else []
-                
-                if isinstance(parsed, list):
-                    logger.debug("Chunk %d: parsed %d items (attempt %d)", idx + 1, len(parsed), attempt)
-                    return parsed
-                else:
-                    logger.warning("Chunk %d: parsed non-list result, attempt %d", idx + 1, attempt)
-                    return []
+                input_data = state.request()
+                result = call_with_deadline(
+                    lambda: chain.invoke(input_data, config={"callbacks": span.callbacks()}),
+                    deadline, hedge, span, slots
+                )
+                if state.accept(result, attempt):
+                    break
             except Exception as e:
                 backoff = 1.5 ** attempt
                 logger.warning("Chunk %d: attempt %d failed: %s. Backing off %.1fs", idx + 1, attempt, e, backoff)
+                span.add("retries")
+                span.add("backoff", backoff)
                 time.sleep(backoff)
-        
-        logger.error("Chunk %d: failed after %d attempts", idx + 1, retries)
-        return []
+        return state.result(cache, cache_key)
 
-    all_results = []
-    max_workers = min(max_workers, max(1, (os.cpu_count() or 4)))
+    # Hedges count against the same max_workers budget as the chunk calls
+    slots = ThreadSlots(max(1, max_workers))
+    # Results are kept per chunk and combined in chunk order, not completion order
+    outcomes = [None] * len(chunks)
+    # LLM calls are I/O bound: the pool is not capped by CPU count. Callers pass
+    # rate-limited clients, which throttle to the provider quota themselves.
+    max_workers = max(1, min(max_workers, len(chunks)))
     
     with ThreadPoolExecutor(max_workers=max_workers) as exe:
-        futures = {exe.submit(_process_chunk, i, c): i for i, c in enumerate(chunks)}
+        futures = {exe.submit(_process_chunk, i, c, time.perf_counter()): i for i, c in enumerate(chunks)}
         for fut in as_completed(futures):
             idx = futures[fut]
             try:
-                data = fut.result()
-                if data:
-                    all_results.extend(data)
-                    logger.info("Chunk %d/%d: Found %d items", idx + 1, len(chunks), len(data))
+                outcomes[idx] = fut.result()
             except Exception as e:
-                logger.exception("Unhandled error processing chunk %d: %s", idx + 1, e)
+                outcomes[idx] = e
+
+    return _collect_chunk_results(outcomes, chunks, merge)
+
+
+async def ainvoke_chain_with_retry(chain, input_data: dict, semaphore: asyncio.Semaphore = None,
+                                   max_retries: int = 3) -> str:
+    """Async counterpart of invoke_chain_with_retry; holds `semaphore` only while a call is in flight."""
+    attempt = 0
+    while attempt < max_retries:
+        attempt += 1
+        try:
+            if semaphore is None:
+                return await chain.ainvoke(input_data)
+            async with semaphore:
+                return await chain.ainvoke(input_data)
+        except Exception as e:
+            backoff = 1.5 ** attempt
+            logger.warning("Attempt %d failed: %s. Backing off %.1fs", attempt, e, backoff)
+            await asyncio.sleep(backoff)
+    logger.error("Failed after %d attempts", max_retries)
+    return "[]"
+
+
+async def _aprocess_chunk(idx: int, chunk_text: str, chain, input_key_mapping: dict,
+                          semaphore: asyncio.Semaphore, retries: int, cache, cache_namespace: tuple,
+                          trace_phase: str, parse=None, reask=None, deadline=None, hedge=None) -> list:
+    """Extract one chunk (cache lookup, rate-limited call, retries) inside its own trace span."""
+    # Coroutines share one thread, so each chunk gets its own trace lane
+    with TRACER.span(f"{trace_phase} chunk {idx + 1}", "chunk", tid=f"{trace_phase} {idx + 1}",
+                     phase=trace_phase, queue_wait=0.0) as span:
+        cache_key = None
+        if cache is not None:
+            cache_key = make_cache_key(chunk_text, *cache_namespace)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Chunk %d: cache hit", idx + 1)
+                span.set(cache_hit=True)
+                return cached
+
+        state = _ChunkAttempts(idx, chunk_text, input_key_mapping, parse, reask, span)
+        attempt = 0
+        while attempt < retries:
+            attempt += 1
+            try:
+                input_data = state.request()
+                waiting = time.perf_counter()
+                async with semaphore:
+                    span.add("queue_wait", time.perf_counter() - waiting)
+                    result = await acall_with_deadline(
+                        lambda: chain.ainvoke(input_data, config={"callbacks": span.callbacks()}),
+                        deadline, hedge, span, semaphore
+                    )
+                if state.accept(result, attempt):
+                    break
+            except Exception as e:
+                backoff = 1.5 ** attempt
+                logger.warning("Chunk %d: attempt %d failed: %s. Backing off %.1fs", idx + 1, attempt, e, backoff)
+                span.add("retries")
+                span.add("backoff", backoff)
+                await asyncio.sleep(backoff)
+        return state.result(cache, cache_key)
+
+
+def _collect_chunk_results(outcomes: list, chunks: list, merge=None) -> list:
+    per_chunk = []
+    for idx, data in enumerate(outcomes):
+        if isinstance(data, BaseException):
+            logger.error("Unhandled error processing chunk %d: %s", idx + 1, data)
+            data = []
+        elif data:
+            logger.info("Chunk %d/%d: Found %d items", idx + 1, len(outcomes), len(data))
+        per_chunk.append(data or [])
+    if merge is not None:
+        return merge(per_chunk, chunks)
+    return [item for data in per_chunk for item in data]
+
+
+async def aprocess_chunks(
+    chunks: list,
+    chain,
+    input_key_mapping: dict,
+    semaphore: asyncio.Semaphore,
+    retries: int = 3,
+    cache=None,
+    cache_namespace: tuple = (),
+    trace_phase: str = "extract",
+    merge=None,
+    parse=None,
+    reask=None,
+    deadline=None,
+    hedge=None
+) -> list:
+    """
+    Process chunks concurrently on the running event loop using `chain.ainvoke`.
+
+    Several calls (e.g. FACTS and CLAIMS extraction) can share one semaphore so
+    that a single global concurrency limit applies across all of them.
+
+    Args:
+        chunks: List of text chunks
+        chain: LangChain chain to invoke
+        input_key_mapping: Dict mapping chain input keys to values (or functions that take chunk)
+        semaphore: Limits the number of in-flight LLM calls
+        retries: Number of retries per chunk
+        cache: Optional ExtractionCache; chunks with a cached result skip the LLM call
+        cache_namespace: Strings (data type, prompt, model) hashed with each chunk into its cache key
+        trace_phase: Phase name recorded on each chunk's trace span
+        merge: Optional callable(per-chunk results, chunks) -> list; by default
+            results are concatenated
+        parse: Optional callable(response) -> (items, complete, rejected); by
+            default the response must be a JSON list
+        reask: Optional callable(chunk_text, items so far) -> text sent instead
+            of the chunk when a response was cut off
+        deadline: Seconds before a single call is cancelled and retried (None: no limit)
+        hedge: Optional hedging.HedgePolicy for duplicating slow calls; each
+            hedge takes a `semaphore` slot of its own
+
+    Returns:
+        List of parsed JSON results from all chunks, in chunk order
+    """
+    outcomes = await asyncio.gather(
+        *(_aprocess_chunk(i, c, chain, input_key_mapping, semaphore, retries, cache, cache_namespace,
+                          trace_phase, parse, reask, deadline, hedge)
+          for i, c in enumerate(chunks)),
+        return_exceptions=True
+    )
+    return _collect_chunk_results(outcomes, chunks, merge)
+
+
+async def aprocess_chunk_stream(
+    chunks,
+    chain,
+    input_key_mapping: dict,
+    semaphore: asyncio.Semaphore,
+    retries: int = 3,
+    cache=None,
+    cache_namespace: tuple = (),
+    trace_phase: str = "extract",
+    merge=None,
+    parse=None,
+    reask=None,
+    deadline=None,
+    hedge=None
+) -> list:
+    """
+    Like aprocess_chunks, but `chunks` is an async iterable: each chunk is
+    dispatched as soon as it arrives, so extraction overlaps with whatever is
+    still producing the text.
+
+    Returns:
+        List of parsed JSON results from all chunks, in chunk order
+    """
+    tasks = []
+    texts = []
+    async for chunk_text in chunks:
+        logger.debug("Chunk %d: dispatched (%d chars)", len(tasks) + 1, len(chunk_text))
+        texts.append(chunk_text)
+        tasks.append(asyncio.ensure_future(_aprocess_chunk(
+            len(tasks), chunk_text, chain, input_key_mapping, semaphore, retries, cache,
+            cache_namespace, trace_phase, parse, reask, deadline, hedge
+        )))
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    return _collect_chunk_results(outcomes, texts, merge)
+
+
+async def accumulate_chunks(segments, chunk_budget: int, overlap_segments: int = 0,
+                            length_function=len, source: str = None):
+    """
+    Group incrementally arriving text segments into extraction chunks.
+
+    A chunk is yielded as soon as its size, measured by `length_function`
+    (characters by default, or count_tokens), reaches `chunk_budget`. Segments
+    are never split; the next chunk starts with the last `overlap_segments`
+    segments of the previous one. Whatever remains when the stream ends is
+    yielded as the final chunk.
+
+    Segments are laid out like get_transcripts_text: each line is prefixed
+    with its offset into the recording ("[t+MM:SS]") when the segment has a
+    "start", and every chunk opens with the "INTERVIEW: ..." header of its
+    recording (repeated wherever the recording changes), so timestamps and
+    provenance survive chunking.
+
+    Args:
+        segments: Async iterable of strings, or of dicts with a "text" key and
+            optional "start", "end" and "source" (recording file name)
+        chunk_budget: Size to accumulate before dispatching a chunk
+        overlap_segments: Segments carried over between consecutive chunks
+        length_function: Measures a segment's size
+        source: Recording name for segments that do not carry their own
+
+    Yields:
+        Chunk strings, one segment per line
+    """
+    # Imported here: the loader is only needed when audio is streamed
+    from detective_data_loader import format_offset
+
+    def _header(name):
+        return f"INTERVIEW: {os.path.splitext(os.path.basename(name))[0].replace('_', ' ').upper()}"
+
+    def _render(entries):
+        lines = []
+        current = None
+        for name, line in entries:
+            if name and name != current:
+                lines.append(_header(name))
+            current = name
+            lines.append(line)
+        return "\n".join(lines)
+
+    entries = []
+    sizes = []
+    carried = 0
+    async for segment in segments:
+        if isinstance(segment, dict):
+            text = str(segment.get("text", "")).strip()
+            name = segment.get("source") or source
+            if text and segment.get("start") is not None:
+                text = f"[{format_offset(segment['start'])}] {text}"
+        else:
+            text, name = str(segment).strip(), source
+        if not text:
+            continue
+        entries.append((name, text))
+        sizes.append(length_function(text) + 1)
+        header_size = length_function(_header(entries[0][0])) + 1 if entries[0][0] else 0
+        if header_size + sum(sizes) >= chunk_budget:
+            yield _render(entries)
+            carried = min(overlap_segments, len(entries) - 1)
+            entries = entries[len(entries) - carried:]
+            sizes = sizes[len(sizes) - carried:]
+    if len(entries) > carried:
+        yield _render(entries)
+
+
+def run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Uses `asyncio.run` normally; if an event loop is already running in this
+    thread (e.g. a notebook), the coroutine runs on a fresh loop in a helper thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as exe:
+        return exe.submit(asyncio.run, coro).result()
+
+
+class PrioritySemaphore:
+    """
+    asyncio semaphore that hands free slots to the highest-priority waiter.
+
+    A drop-in replacement for `asyncio.Semaphore` in `async with` blocks; the
+    priority of each acquire is (CALL_STAGE, CASE_PRIORITY) from the calling
+    task's context, FIFO among equals.
+    """
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: tuple = None) -> None:
+        if priority is None:
+            priority = (CALL_STAGE.get(), CASE_PRIORITY.get())
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the cancellation
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        # Hand the slot straight to the next live waiter
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+
+    def locked(self) -> bool:
+        """True if an acquire would have to wait."""
+        return self._value <= 0 or bool(self._waiters)
+
+    async def __aenter__(self):
+        await self.acquire()
 
-    return all_results
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()